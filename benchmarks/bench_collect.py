@@ -0,0 +1,161 @@
+# benchmarks/bench_collect.py
+"""
+수집기 부하 벤치마크: 로컬 모의 API(별도 프로세스)를 띄우고 run_collect_async를 실행해
+처리량(요청/초), 요청 지연 p50/p99, 최대 메모리를 측정합니다. 실제 사이트에는 요청하지 않습니다.
+
+실행: python -m benchmarks.bench_collect --requests 2000 --latency 0.05 --error-rate 0.01
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import logging
+import tempfile
+import tracemalloc
+import urllib.request
+import multiprocessing
+from datetime import date, timedelta
+
+import click
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: tracemalloc(파이썬 할당량)로 대신 측정
+    resource = None
+
+
+# ---------------------------------- 1. 모의 API 프로세스
+def _serve(port: int, options: dict):
+    from aiohttp import web
+    from benchmarks.mock_fare_api import create_app
+    web.run_app(create_app(**options), host="127.0.0.1", port=port, print=None)
+
+def start_mock_server(port: int, options: dict, timeout: float = 10.0) -> multiprocessing.Process:
+    proc = multiprocessing.Process(target=_serve, args=(port, options), daemon=True)
+    proc.start()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            fetch_server_stats(port)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"모의 API가 {timeout}초 안에 시작되지 않았습니다. (port {port})")
+
+def fetch_server_stats(port: int) -> dict:
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stats", timeout=2) as response:
+        return json.loads(response.read())
+
+
+# ---------------------------------- 2. 요청 계획 (노선 맵 기준으로 필요한 만큼 날짜를 늘림)
+def build_bench_plan(n_requests: int, output_dir) -> list:
+    from src.planner import build_request_plan
+    start = date(2025, 10, 1)
+    dep_dates, plan = [], []
+    while len(plan) < n_requests:
+        dep_dates.append((start + timedelta(days=len(dep_dates))).strftime("%Y%m%d"))
+        plan, _ = build_request_plan(dep_dates, output_dir)
+    return plan[:n_requests]
+
+
+# ---------------------------------- 3. 측정
+def peak_memory_mb() -> float:
+    if resource is None:
+        return tracemalloc.get_traced_memory()[1] / 1_000_000
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1_000_000 if sys.platform == "darwin" else peak / 1_000    # macOS는 바이트, 리눅스는 KB
+
+def percentile_ms(values: list, q: float) -> float:
+    return float(np.percentile(values, q) * 1000) if values else float("nan")
+
+async def run_bench(tasks_params: list, output_dir, max_concurrency: int, raw_format: str, verbose: bool = False,
+                    request_log_rate: float = None, iterate: bool = False):
+    import src.collect as collect
+    from src.session import CookieProvider
+
+    if not verbose:
+        for name in ("src.collect", "src.rate_control", "src.raw_writer", "src.session"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+    if request_log_rate is not None:
+        collect.REQUEST_LOG.rate = request_log_rate
+
+    # 요청 지연(동시성 대기 제외)은 AIMD 제어기에 전달되는 값을 그대로 기록
+    latencies = []
+
+    class RecordingLimiter(collect.AdaptiveLimiter):
+        def on_success(self, latency: float):
+            latencies.append(latency)
+            super().on_success(latency)
+
+    collect.AdaptiveLimiter = RecordingLimiter
+    cookie_provider = CookieProvider(cache_path=os.path.join(output_dir, "cookies.json"))
+    started = time.perf_counter()
+    kwargs = {"max_concurrency": max_concurrency, "raw_format": raw_format, "tasks_params": iter(tasks_params),
+              "output_dir": output_dir, "cookie_provider": cookie_provider}
+    if iterate:
+        # 결과를 모으지 않고 하나씩 소비 (메모리가 요청 수가 아니라 동시성에 비례하는지 확인)
+        succeeded = 0
+        async for _ in collect.iter_collect(None, None, **kwargs):
+            succeeded += 1
+    else:
+        succeeded = len(await collect.run_collect_async(None, None, **kwargs) or [])
+    return succeeded, latencies, time.perf_counter() - started
+
+
+@click.command(help="로컬 모의 API로 수집기 처리량/지연/메모리 측정")
+@click.option("--requests", "n_requests", default=2000, show_default=True, help="요청 수")
+@click.option("--concurrency", default=80, show_default=True, help="최대 동시 요청 수 (MAX_CONCURRENCY)")
+@click.option("--raw-format", type=click.Choice(["segment", "files"]), default="segment", show_default=True)
+@click.option("--port", default=8765, show_default=True, help="모의 API 포트")
+@click.option("--latency", default=0.05, show_default=True, help="모의 API 평균 응답 지연(초)")
+@click.option("--jitter", default=0.5, show_default=True, help="지연 변동 비율")
+@click.option("--error-rate", default=0.0, show_default=True, help="500 응답 비율")
+@click.option("--throttle-rate", default=0.0, show_default=True, help="429 + Retry-After 응답 비율")
+@click.option("--html-rate", default=0.0, show_default=True, help="JSON이 아닌 응답 비율")
+@click.option("--max-flights", default=6, show_default=True, help="응답당 최대 항공편 수")
+@click.option("--seed", default=42, show_default=True, help="모의 API 난수 시드")
+@click.option("--verbose", is_flag=True, help="요청별 수집 로그 출력 (LOG_MODE=sync/queue 비교용)")
+@click.option("--request-log-rate", type=click.FloatRange(0, 1), default=None,
+              help="요청 로그 기록 비율 (--verbose와 함께 사용)")
+@click.option("--iterate", is_flag=True, help="결과를 목록으로 모으지 않고 iter_collect로 하나씩 소비")
+def main(n_requests, concurrency, raw_format, port, latency, jitter, error_rate, throttle_rate, html_rate,
+         max_flights, seed, verbose, request_log_rate, iterate):
+    # 수집기가 모의 API를 보도록 모듈을 불러오기 전에 지정
+    os.environ["AIRPORT_BASE_URL"] = f"http://127.0.0.1:{port}"
+    options = {"latency": latency, "jitter": jitter, "error_rate": error_rate, "throttle_rate": throttle_rate,
+               "html_rate": html_rate, "max_flights": max_flights, "seed": seed}
+    proc = start_mock_server(port, options)
+    output_dir = tempfile.mkdtemp(prefix="bench_collect_")
+    try:
+        tasks_params = build_bench_plan(n_requests, output_dir)
+        if resource is None:
+            tracemalloc.start()
+        base_memory = peak_memory_mb()
+        succeeded, latencies, elapsed = asyncio.run(run_bench(tasks_params, output_dir, concurrency, raw_format,
+                                                                verbose, request_log_rate, iterate))
+        peak_memory = peak_memory_mb()
+        server = fetch_server_stats(port)
+    finally:
+        proc.terminate()
+        proc.join()
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    click.echo("=" * 60)
+    click.echo(f"요청 {len(tasks_params):,}건 | 성공 {succeeded:,} | 실패 {len(tasks_params) - succeeded:,} | "
+               f"서버 수신 {server['requests']:,} (재시도 포함)")
+    click.echo(f"서버 응답 상태: {server['statuses']}")
+    click.echo(f"소요 {elapsed:.2f}초 | 처리량 {succeeded / elapsed:,.1f} 요청/초")
+    click.echo(f"요청 지연 p50 {percentile_ms(latencies, 50):.1f}ms | p99 {percentile_ms(latencies, 99):.1f}ms "
+               f"(서버 처리 p50 {percentile_ms(server['service_times'], 50):.1f}ms | "
+               f"p99 {percentile_ms(server['service_times'], 99):.1f}ms)")
+    memory_label = "최대 메모리(파이썬 할당)" if resource is None else "최대 RSS"
+    click.echo(f"{memory_label} {peak_memory:,.1f}MB (시작 시 {base_memory:,.1f}MB)")
+    click.echo("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/bench_dataframe_build.py
+"""
+메모리 경로 데이터프레임 생성 벤치마크: 응답별 DataFrame + pd.concat(기존) vs 단일 패스 컬럼 빌더(현재)
+
+실행: python -m benchmarks.bench_dataframe_build --responses 100000
+"""
+import os
+import gc
+import time
+import random
+import tracemalloc
+
+import click
+import pandas as pd
+
+from src.preprocess import _create_dataframe_from_list
+
+
+# ---------------------------------- 1. 합성 수집 결과
+def make_collected_data(n_responses: int, max_flights: int = 6, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    carriers = ["OZ", "KE", "7C", "LJ", "TW", "BX", "WE"]
+    data = []
+    for i in range(n_responses):
+        agent = rng.choice(["LT", "IP", "JD", "SM", "WT", "YB2", "OT", "JC"])
+        dep_date = f"202510{rng.randint(1, 28):02d}"
+        flights = []
+        for j in range(rng.randint(0, max_flights)):
+            car = rng.choice(carriers)
+            flights.append({
+                "code": f"{car}{1000 + j}", "mainFlt": f"{car}{1000 + j}",
+                "depDesc": "서울/김포", "depCity": "GMP", "depDate": dep_date, "depDay": "", "depTime": "0730",
+                "arrDesc": "제주", "arrCity": "CJU", "arrDate": dep_date, "arrDay": "", "arrTime": "0840",
+                "carCode": car, "carDesc": "", "opCarCode": "", "opCarDesc": "",
+                "classDesc": "할인석", "classCode": "S", "fareOrigin": "50000", "fare": str(rng.randint(2, 9) * 10000),
+                "fuelChg": "7700", "airTax": "4000", "tasf": "0",
+                "fareRecKey": "k", "jejucomId": "", "itinInfo2": "", "seat": str(rng.randint(0, 9)),
+            })
+        filepath = os.path.join("data", "raw", "2025-10-01", dep_date, f"GMP_CJU_{dep_date}_{agent}.json")
+        data.append({"filepath": filepath, "raw_data": {"data": {"header": {"cnt": len(flights)}, "data": flights}}})
+    return data
+
+
+# ---------------------------------- 2. 기존 구현 (비교 기준)
+def legacy_create_dataframe_from_list(data_list: list) -> pd.DataFrame:
+    df_list = []
+    for item in data_list:
+        filepath = item["filepath"]
+        flights = item["raw_data"].get("data", {}).get("data", [])
+        if flights:
+            temp = pd.DataFrame(flights)
+            parts = filepath.split(os.sep)
+            temp["source_file"] = filepath
+            temp["agency_code"] = os.path.splitext(os.path.basename(filepath))[0].split("_")[-1]
+            try:
+                temp["scraped_date"] = parts[parts.index("raw") + 1]
+            except (ValueError, IndexError):
+                temp["scraped_date"] = None
+            df_list.append(temp)
+    if not df_list:
+        return pd.DataFrame()
+    return pd.concat(df_list, ignore_index=True)
+
+
+# ---------------------------------- 3. 측정
+def measure_time(func, data: list):
+    gc.collect()
+    start = time.perf_counter()
+    df = func(data)
+    return df, time.perf_counter() - start
+
+def measure_peak_memory(func, data: list) -> int:
+    """tracemalloc 기준 최대 할당량. (추적 오버헤드가 커서 시간 측정과 분리)"""
+    gc.collect()
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+@click.command(help="응답별 DataFrame + concat(기존) 대비 단일 패스 빌더(현재)의 시간/메모리 비교")
+@click.option("--responses", default=100_000, show_default=True, help="합성 응답 수")
+@click.option("--max-flights", default=6, show_default=True, help="응답당 최대 항공편 수")
+@click.option("--no-memory", is_flag=True, help="메모리 측정 생략 (tracemalloc 측정은 느림)")
+def main(responses, max_flights, no_memory):
+    data = make_collected_data(responses, max_flights)
+    click.echo(f"합성 응답 {responses:,}건 생성 완료")
+
+    results = {}
+    for name, func in [("legacy (DataFrame + concat)", legacy_create_dataframe_from_list),
+                       ("current (single-pass builder)", _create_dataframe_from_list)]:
+        df, elapsed = measure_time(func, data)
+        results[name] = df
+        line = f"{name:32s} | {len(df):>9,}행 | {elapsed:8.2f}초"
+        if not no_memory:
+            line += f" | 최대 메모리 {measure_peak_memory(func, data) / 1_000_000:9.1f}MB"
+        click.echo(line)
+
+    legacy_df, current_df = results.values()
+    pd.testing.assert_frame_equal(legacy_df, current_df[legacy_df.columns], check_dtype=False)
+    click.echo("결과 일치 확인 ✅")
+
+
+if __name__ == "__main__":
+    main()
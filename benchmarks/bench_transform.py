@@ -0,0 +1,137 @@
+# benchmarks/bench_transform.py
+"""
+정제 엔진 비교: pandas(기본) vs arrow(pyarrow.compute, 스레드 병렬)
+1) 동일성 검사: 같은 입력을 두 엔진으로 정제 → _format_final_df 결과가 완전히 같은지 확인 (다르면 종료 코드 1)
+   - 경계값 픽스처: 합성 응답에 WE/공동운항/빈 이름/잘못된 날짜·시간·숫자 등을 섞은 것
+   - 기록된 원본: --raw-dir 아래 세그먼트(실제 수집 응답)가 있으면 함께 검사
+2) 처리 시간: --rows 규모의 합성 데이터로 정제 단계 시간 비교
+고정 픽스처로 하는 동일성 테스트는 tests/test_transform_parity.py (python -m pytest tests)
+
+실행: python -m benchmarks.bench_transform --rows 500000 --raw-dir data/raw
+"""
+import glob
+import os
+import sys
+import time
+import random
+
+import click
+import pandas as pd
+
+from benchmarks.mock_fare_api import make_flight
+from src.common.raw_archive import SEGMENT_DIRNAME, SEGMENT_SUFFIX
+from src.preprocess import (_create_dataframe_from_list, _load_data_from_segments, _clean_and_transform_data,
+                            _format_final_df, DESC_MAP)
+
+ROUTES = [("GMP", "CJU"), ("PUS", "CJU"), ("CJU", "GMP"), ("HIN", "GMP"), ("KPO", "GMP"), ("RSU", "GMP")]
+# 필드별 경계값 (결측, 공백, 잘못된 형식, 다른 타입)
+EDGE_VALUES = {
+    "depDesc": [None, "", "  ", "부산/김해", "서울(김포)", "HIN", "알수없음"],
+    "arrDesc": [None, "", " ", "포항/경주", "여수/순천", "GMP"],
+    "depCity": [None, "", "XXX", "KPO", "RSU"],
+    "arrCity": [None, "", "YNY", "ZZZ"],
+    "depDate": [None, "", "2025101", "20251399", "20251001.0", " 20251001 ", "2025-10-01", 20251001, 20251001.0],
+    "arrDate": [None, "", "abc", "20251002", 20251002],
+    "depTime": [None, "", "7:30", "07:30:00", "073000", "2400", "1260", "930", "0930.0", "ab12", 930],
+    "arrTime": [None, "", "23:59", "0000", "99:99"],
+    "carCode": [None, "", "WE", "OZ", "KE", "ZZ", "we"],
+    "carDesc": [None, "", " ", "nan", "None", "아시아나항공", "대한항공", "에어부산", "진에어", "파라타항공", " 티웨이항공 "],
+    "opCarCode": [None, "", "BX", "LJ", "NaT", " LJ "],
+    "opCarDesc": [None, "", "파라타항공", "에어부산", " "],
+    "fare": [None, "", " 12 ", "1e3", "+5", "-3", "1,000", ".5", "5.", "12a", 7700, 7.9, "99999"],
+    "fuelChg": [None, "", "7700", "x"],
+    "airTax": ["4000", "", None, 4000],
+    "tasf": ["0", "", None, "1000.5"],
+    "seat": [None, "", "9", "-1", "3.7", "a"],
+}
+
+
+# ---------------------------------- 1. 입력 데이터
+def make_collected_data(n_rows: int, edge_rate: float = 0.0, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    data, rows = [], 0
+    while rows < n_rows:
+        dep, arr = rng.choice(ROUTES)
+        dep_date = f"202510{rng.randint(1, 28):02d}"
+        agent = rng.choice(["LT", "IP", "JD", "SM", "WT", "YB2", "OT", "JC"])
+        flights = []
+        for i in range(rng.randint(1, 12)):
+            flight = make_flight(rng, rng.choice([dep, DESC_MAP.get(dep, dep)]), arr, dep_date, i)
+            flight["depCity"], flight["arrCity"] = dep, arr
+            car_desc = rng.choice(["", flight["carDesc"], "아시아나항공", "대한항공"])
+            flight["carDesc"] = car_desc
+            if flight["carCode"] == "WE" or rng.random() < 0.05:
+                flight["carCode"] = "WE"
+                flight["opCarDesc"] = rng.choice(["", "파라타항공"])
+            for field, values in EDGE_VALUES.items():
+                if rng.random() < edge_rate:
+                    flight[field] = rng.choice(values)
+            flights.append(flight)
+        filepath = os.path.join("data", "raw", "2025-10-01", f"segment.ndjson.gz#{dep}_{arr}_{dep_date}_{agent}")
+        data.append({"filepath": filepath, "raw_data": {"data": {"data": flights}}, "agency_code": agent,
+                     "scraped_date": rng.choice(["2025-10-01", "2025-09-30", None, "2025/10/01"])})
+        rows += len(flights)
+    return data
+
+def load_recorded(raw_dir: str) -> pd.DataFrame:
+    segments = sorted(glob.glob(os.path.join(raw_dir, "*", SEGMENT_DIRNAME, f"*{SEGMENT_SUFFIX}")))
+    if not segments:
+        return pd.DataFrame()
+    return _load_data_from_segments(segments, workers=1)
+
+
+# ---------------------------------- 2. 동일성 검사 / 시간 측정
+def run_engine(df_raw: pd.DataFrame, engine: str):
+    started = time.perf_counter()
+    df_clean = _clean_and_transform_data(df_raw.copy(), engine=engine)
+    clean_seconds = time.perf_counter() - started
+    return _format_final_df(df_clean), clean_seconds
+
+def check_parity(name: str, df_raw: pd.DataFrame) -> bool:
+    expected, _ = run_engine(df_raw, "pandas")
+    actual, _ = run_engine(df_raw, "arrow")
+    try:
+        pd.testing.assert_frame_equal(actual, expected)
+    except AssertionError as e:
+        click.echo(f"❌ {name}: 결과가 다릅니다 ({len(df_raw):,}행)\n{e}")
+        for col in expected.columns:
+            diff = ~((actual[col].astype(object) == expected[col].astype(object))
+                     | (actual[col].isna() & expected[col].isna()))
+            if diff.any():
+                sample = pd.DataFrame({"pandas": expected.loc[diff, col], "arrow": actual.loc[diff, col]}).head(5)
+                click.echo(f"  - {col}: {int(diff.sum())}행 다름\n{sample}")
+        return False
+    click.echo(f"✅ {name}: 동일 ({len(df_raw):,}행)")
+    return True
+
+
+@click.command(help="정제 엔진(pandas/arrow) 결과 동일성 검사 + 처리 시간 비교")
+@click.option("--rows", default=300_000, show_default=True, help="시간 측정용 합성 데이터 행 수")
+@click.option("--edge-rows", default=50_000, show_default=True, help="경계값 픽스처 행 수")
+@click.option("--raw-dir", default=None, help="기록된 원본 세그먼트 디렉터리 (예: data/raw)")
+@click.option("--repeat", default=3, show_default=True, help="시간 측정 반복 횟수 (최솟값 사용)")
+def main(rows, edge_rows, raw_dir, repeat):
+    ok = True
+    for seed in (1, 2, 3):
+        df_edge = _create_dataframe_from_list(make_collected_data(edge_rows // 3, edge_rate=0.2, seed=seed))
+        ok &= check_parity(f"경계값 픽스처 (seed {seed})", df_edge)
+    if raw_dir:
+        df_recorded = load_recorded(raw_dir)
+        if df_recorded.empty:
+            click.echo(f"⚠️ {raw_dir}에 기록된 세그먼트가 없습니다.")
+        else:
+            ok &= check_parity(f"기록된 원본 ({raw_dir})", df_recorded)
+
+    df_raw = _create_dataframe_from_list(make_collected_data(rows, edge_rate=0.01))
+    click.echo("=" * 60)
+    click.echo(f"정제 단계 시간 ({len(df_raw):,}행, {repeat}회 중 최솟값)")
+    for engine in ("pandas", "arrow"):
+        seconds = min(run_engine(df_raw, engine)[1] for _ in range(repeat))
+        click.echo(f"  - {engine:<6}: {seconds:.3f}초 ({len(df_raw) / seconds:,.0f}행/초)")
+    click.echo("=" * 60)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
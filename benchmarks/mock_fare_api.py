@@ -0,0 +1,124 @@
+# benchmarks/mock_fare_api.py
+"""
+airport.co.kr 대신 쓰는 로컬 모의 API (aiohttp)
+- POST /booking/ajaxf/frAirticketSvc/getData.do: 합성 data.header / data.data 응답
+- GET  /booking/cms/frCon/index.do: 세션 쿠키 발급 (쿠키 부트스트랩용)
+- GET  /_stats: 받은 요청 수, 상태별 건수, 요청별 처리 시간
+지연(평균 + 지터), 오류 비율(500/429 + Retry-After, HTML 응답), 응답 크기(항공편 수)를 설정할 수 있습니다.
+
+실행: python -m benchmarks.mock_fare_api --port 8765 --latency 0.05 --error-rate 0.01
+수집기 연결: AIRPORT_BASE_URL=http://127.0.0.1:8765 python main.py ...
+"""
+import json
+import time
+import random
+import asyncio
+
+import click
+from aiohttp import web
+
+API_PATH = "/booking/ajaxf/frAirticketSvc/getData.do"
+TARGET_PATH = "/booking/cms/frCon/index.do"
+STATS_PATH = "/_stats"
+
+CARRIERS = [("OZ", "아시아나항공"), ("KE", "대한항공"), ("7C", "제주항공"), ("LJ", "진에어"),
+            ("TW", "티웨이항공"), ("BX", "에어부산"), ("RS", "에어서울")]
+
+
+# ---------------------------------- 1. 합성 응답
+def make_flight(rng: random.Random, dep: str, arr: str, dep_date: str, i: int) -> dict:
+    car, car_desc = rng.choice(CARRIERS)
+    dep_minutes = rng.randint(6 * 60, 21 * 60)
+    arr_minutes = dep_minutes + rng.randint(50, 70)
+    return {
+        "code": f"{car}{1000 + i}", "mainFlt": f"{car}{1000 + i}",
+        "depDesc": dep, "depCity": dep, "depDate": dep_date, "depDay": "",
+        "depTime": f"{dep_minutes // 60:02d}{dep_minutes % 60:02d}",
+        "arrDesc": arr, "arrCity": arr, "arrDate": dep_date, "arrDay": "",
+        "arrTime": f"{arr_minutes // 60 % 24:02d}{arr_minutes % 60:02d}",
+        "carCode": car, "carDesc": car_desc, "opCarCode": "", "opCarDesc": "",
+        "classDesc": "할인석", "classCode": "S",
+        "fareOrigin": str(rng.randint(3, 12) * 10000), "fare": str(rng.randint(2, 12) * 10000),
+        "fuelChg": "7700", "airTax": "4000", "tasf": "0",
+        "fareRecKey": f"{rng.getrandbits(64):016x}", "jejucomId": "", "itinInfo2": "",
+        "seat": str(rng.randint(0, 9)),
+    }
+
+def make_payload(rng: random.Random, form, max_flights: int) -> dict:
+    dep, arr, dep_date = form.get("pDep", ""), form.get("pArr", ""), form.get("pDepDate", "")
+    flights = [make_flight(rng, dep, arr, dep_date, i) for i in range(rng.randint(0, max_flights))]
+    header = {
+        "dep": dep, "arr": arr, "depDate": dep_date, "agentCode": form.get("comp", ""),
+        "adt": form.get("pAdt", "1"), "chd": form.get("pChd", "0"), "inf": form.get("pInf", "0"),
+        "cnt": len(flights), "errorCode": "0", "errorDesc": "",
+    }
+    return {"data": {"header": header, "data": flights}}
+
+
+# ---------------------------------- 2. ✨ 서버
+def create_app(latency: float = 0.05, jitter: float = 0.5, error_rate: float = 0.0, throttle_rate: float = 0.0,
+               html_rate: float = 0.0, max_flights: int = 6, seed: int = None) -> web.Application:
+    """
+    - latency: 평균 응답 지연(초), jitter: 지연 변동 비율 (latency × [1-jitter, 1+jitter])
+    - error_rate: 500 응답 비율, throttle_rate: 429 + Retry-After 비율, html_rate: JSON이 아닌 응답 비율
+    - max_flights: 응답당 최대 항공편 수 (0 ~ max_flights 균등)
+    요청 수/상태별 건수/처리 시간(초) 목록은 app["stats"]와 GET /_stats로 확인합니다.
+    """
+    rng = random.Random(seed)
+    stats = {"requests": 0, "statuses": {}, "service_times": []}
+
+    async def get_data(request: web.Request) -> web.Response:
+        started = time.perf_counter()
+        stats["requests"] += 1
+        form = await request.post()
+        await asyncio.sleep(max(0.0, latency * (1 + rng.uniform(-jitter, jitter))))
+
+        roll = rng.random()
+        if roll < error_rate:
+            response = web.Response(status=500, text="Internal Server Error")
+        elif roll < error_rate + throttle_rate:
+            response = web.Response(status=429, text="Too Many Requests", headers={"Retry-After": "1"})
+        elif roll < error_rate + throttle_rate + html_rate:
+            response = web.Response(status=200, text="<html>session expired</html>", content_type="text/html")
+        else:
+            body = json.dumps(make_payload(rng, form, max_flights), ensure_ascii=False)
+            response = web.Response(body=body.encode("utf-8"), content_type="application/json")
+
+        stats["statuses"][response.status] = stats["statuses"].get(response.status, 0) + 1
+        stats["service_times"].append(time.perf_counter() - started)
+        return response
+
+    async def get_stats(request: web.Request) -> web.Response:
+        return web.json_response({"requests": stats["requests"], "statuses": stats["statuses"],
+                                  "service_times": stats["service_times"]})
+
+    async def index(request: web.Request) -> web.Response:
+        response = web.Response(text="<html>mock</html>", content_type="text/html")
+        response.set_cookie("JSESSIONID", f"{rng.getrandbits(64):016x}")
+        return response
+
+    app = web.Application()
+    app["stats"] = stats
+    app.router.add_post(API_PATH, get_data)
+    app.router.add_get(TARGET_PATH, index)
+    app.router.add_get(STATS_PATH, get_stats)
+    return app
+
+
+@click.command(help="getData.do 로컬 모의 API 서버")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", default=8765, show_default=True)
+@click.option("--latency", default=0.05, show_default=True, help="평균 응답 지연(초)")
+@click.option("--jitter", default=0.5, show_default=True, help="지연 변동 비율")
+@click.option("--error-rate", default=0.0, show_default=True, help="500 응답 비율")
+@click.option("--throttle-rate", default=0.0, show_default=True, help="429 + Retry-After 응답 비율")
+@click.option("--html-rate", default=0.0, show_default=True, help="JSON이 아닌(세션 만료형) 응답 비율")
+@click.option("--max-flights", default=6, show_default=True, help="응답당 최대 항공편 수")
+@click.option("--seed", default=None, type=int, help="난수 시드 (재현용)")
+def main(host, port, latency, jitter, error_rate, throttle_rate, html_rate, max_flights, seed):
+    app = create_app(latency, jitter, error_rate, throttle_rate, html_rate, max_flights, seed)
+    web.run_app(app, host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,376 @@
 # main.py
+import os
 import sys
+import time
 import asyncio
 from datetime import datetime
 import click
+import pandas as pd
 
-from src.collect import run_collect_async as run_collect
-from src.preprocess import run_preprocess
-from src.upload import run_upload
+from src.collect import run_collect_async as run_collect, REQUEST_LOG
+import src.preprocess as preprocess
+from src.preprocess import (run_preprocess, preprocess_batch, save_processed_csv, save_processed_store, sources_of,
+                            mark_ingested)
+from src.change_detect import PriceState, detect_changes
+from src.scheduler import SweepScheduler, HORIZON_DAYS, REQUESTS_PER_HOUR, TICK_SECONDS
+from src.shard import collect_shard, launch_local_shards
+from src.negative_cache import NegativeCache
+from src.upload import run_upload, get_engine, prepare_df_for_upload, upload_prepared, UPLOAD_WORKERS
+from src.common.config import DB_CONFIG
 from src.common.logging_setup import setup_logging
+from src.common.paths import PROCESSED_DIR
+from src.common.schema import to_output_strings
+from src.common.metrics import export_metrics
 
 logger = setup_logging(__name__)
 
+# 스트리밍 모드 설정
+STREAM_QUEUE_SIZE = 2000        # 수집 → 전처리 큐 (응답 수)
+STREAM_UPLOAD_QUEUE_SIZE = 4    # 전처리 → 업로드 큐 (데이터프레임 수)
+STREAM_BATCH_SIZE = 500         # 전처리 micro-batch 크기 (응답 수)
+STREAM_FLUSH_SECONDS = 10       # 응답이 뜸할 때 micro-batch를 강제로 넘기는 간격
+_DONE = object()
+
 def parse_yyyymmdd(value: str):
     try:
         return datetime.strptime(value, "%Y%m%d").date()
     except ValueError:
         raise click.BadParameter("날짜 형식은 YYYYMMDD 이어야 합니다. 예: 20250901")
 
-async def run_pipeline(start_date, end_date, save_csv):
-    click.secho(f"\n🚀 '{start_date}'부터 '{end_date}'까지의 데이터 파이프라인을 시작합니다.", fg="green")
-    collected_data = await run_collect(start_date, end_date)
-    df = run_preprocess(collected_data=collected_data, save_csv=save_csv)
-    if df is not None and not df.empty:
+def _upload_result(df, upload_method, upload_workers, changes_only):
+    if not changes_only:
         logger.info(f"전처리 완료. {len(df)}건의 데이터를 업로드합니다.")
-        run_upload(df)
+        run_upload(df, method=upload_method, workers=upload_workers)
+        return
+    # 변경분만 업로드: 업로드가 실패 없이 끝난 경우에만 상태를 전진시킴 (실패 시 다음 실행에서 다시 변경으로 감지)
+    state = PriceState()
+    df_changes, update = detect_changes(df, state)
+    if not df_changes.empty:
+        logger.info(f"전처리 완료. 변경된 {len(df_changes)}건의 데이터를 업로드합니다.")
+        stats = run_upload(df_changes, method=upload_method, workers=upload_workers)
+        if stats is None or stats["failed"]:
+            logger.error("업로드가 완료되지 않아 가격 상태를 갱신하지 않습니다.")
+            return
+    state.apply(update)
+    state.save()
+
+async def run_pipeline(start_date, end_date, save_csv, use_route_map=True, raw_format="segment", store="csv",
+                       upload_method="insert", upload_workers=UPLOAD_WORKERS, changes_only=False, tasks_params=None,
+                       shard=None, negative_cache=None, transform_engine=None):
+    """
+    tasks_params를 넘기면 날짜 범위 대신 그 요청만 수집합니다. 전처리 결과를 반환합니다.
+    shard=(shard_index, shard_count)면 계획 중 그 조각만 수집합니다. (머신별 샤드 실행)
+    negative_cache(NegativeCache)가 있으면 최근 빈 결과였던 조합은 건너뜁니다.
+    transform_engine: 전처리 정제 엔진 ("pandas" | "arrow", 기본값 TRANSFORM_ENGINE)
+    """
+    click.secho(f"\n🚀 '{start_date}'부터 '{end_date}'까지의 데이터 파이프라인을 시작합니다.", fg="green")
+    if shard is not None:
+        collected_data, _ = await collect_shard(start_date, end_date, shard[0], shard[1], use_route_map=use_route_map,
+                                                raw_format=raw_format, negative_cache=negative_cache)
     else:
+        collected_data = await run_collect(start_date, end_date, use_route_map=use_route_map, raw_format=raw_format,
+                                           tasks_params=tasks_params, negative_cache=negative_cache)
+    df = run_preprocess(collected_data=collected_data, save_csv=save_csv, store=store, engine=transform_engine)
+    if df is None or df.empty:
+        logger.warning("전처리된 데이터가 없어 업로드 단계를 건너뜁니다.")
+        return df
+    _upload_result(df, upload_method, upload_workers, changes_only)
+    return df
+
+# --- 로컬 샤드 모드: N개 프로세스가 나눠 수집 → 부모가 모든 샤드의 원본 파일을 한 번에 전처리/업로드 ---
+def run_pipeline_local_shards(start_date, end_date, save_csv, local_shards, use_route_map=True, raw_format="segment",
+                              store="csv", upload_method="insert", upload_workers=UPLOAD_WORKERS,
+                              changes_only=False, request_log_rate=None, transform_engine=None):
+    # 저장소/매니페스트/가격 상태는 부모 프로세스만 갱신 (샤드끼리 같은 파일에 동시에 쓰지 않도록)
+    click.secho(f"\n🚀 '{start_date}'부터 '{end_date}'까지 로컬 샤드 {local_shards}개로 파이프라인을 시작합니다.",
+                fg="green")
+    merged = launch_local_shards(start_date, end_date, local_shards, use_route_map=use_route_map,
+                                 raw_format=raw_format, request_log_rate=request_log_rate)
+    df = run_preprocess(save_csv=save_csv, store=store, input_files=merged["raw_files"], engine=transform_engine)
+    if df is None or df.empty:
         logger.warning("전처리된 데이터가 없어 업로드 단계를 건너뜁니다.")
+        return df
+    _upload_result(df, upload_method, upload_workers, changes_only)
+    return df
+
+# --- 스트리밍 모드: 수집 → (bounded queue) → micro-batch 전처리 → (bounded queue) → 업로드 ---
+async def _collect_stage(start_date, end_date, raw_queue, use_route_map, raw_format, negative_cache=None):
+    # 종료 신호는 정상 완료 시에만 보냄 (실패/취소 시 다른 단계도 함께 취소되므로, 가득 찬 큐에서 막히지 않도록)
+    await run_collect(start_date, end_date, use_route_map=use_route_map,
+                      raw_format=raw_format, result_queue=raw_queue, negative_cache=negative_cache)
+    await raw_queue.put(_DONE)
+
+def _append_spool(df: pd.DataFrame, spool_path):
+    to_output_strings(df).to_csv(spool_path, mode="a", index=False, header=not os.path.exists(spool_path), encoding="utf-8-sig")
+
+async def _transform_stage(raw_queue, upload_queue, batch_size, spool_path, save_store, transform_engine=None):
+    """
+    micro-batch로 전처리해 저장(저장소 또는 임시 CSV)하고 업로드 큐로 넘깁니다.
+    반환: (전처리 행 수, 저장까지 끝낸 원본 파일 집합). 저장소 모드는 여기서 매니페스트에 기록하고,
+    임시 CSV 모드는 마지막 병합이 끝난 뒤 호출한 쪽에서 기록합니다.
+    """
+    batch = []
+    total_rows = 0
+    consumed = set()
+
+    async def _flush():
+        nonlocal batch, total_rows
+        items, batch = batch, []
+        df = await asyncio.to_thread(preprocess_batch, items, transform_engine)
+        if df.empty:
+            consumed.update(sources_of(items))
+            return
+        if save_store:
+            # 파티션 저장소는 micro-batch가 속한 파티션만 갱신하므로 바로 저장
+            if await asyncio.to_thread(save_processed_store, df):
+                consumed.update(sources_of(items))
+                await asyncio.to_thread(mark_ingested, consumed)
+        elif spool_path is not None:
+            await asyncio.to_thread(_append_spool, df, spool_path)
+            consumed.update(sources_of(items))
+        total_rows += len(df)
+        logger.info(f"micro-batch 전처리 완료: 응답 {len(items)}건 → {len(df)}행 (누적 {total_rows}행)")
+        await upload_queue.put(df)
+
+    # wait_for(queue.get())는 취소와 완료가 겹치면 취소를 삼킬 수 있어, 대기 중인 get을 유지하며 asyncio.wait로 기다림
+    getter = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(raw_queue.get())
+            done, _ = await asyncio.wait({getter}, timeout=STREAM_FLUSH_SECONDS)
+            if not done:
+                if batch:
+                    await _flush()
+                continue
+            item, getter = getter.result(), None
+            if item is _DONE:
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await _flush()
+    finally:
+        if getter is not None:
+            getter.cancel()
+    if batch:
+        await _flush()
+    if save_store and consumed:
+        # 수집 중에 기록한 세그먼트는 그 뒤로도 커졌으므로, 수집이 끝난 지금 크기로 다시 기록
+        await asyncio.to_thread(mark_ingested, consumed)
+    await upload_queue.put(_DONE)
+    return total_rows, consumed
+
+async def _upload_stage(upload_queue, upload_method, upload_workers, changes_only=False):
+    engine = None
+    uploaded = 0
+    state = PriceState() if changes_only else None
+    while True:
+        df = await upload_queue.get()
+        if df is _DONE:
+            break
+        if engine is None:
+            engine = get_engine(DB_CONFIG, pool_size=upload_workers)
+        if state is not None:
+            df, update = await asyncio.to_thread(detect_changes, df, state)
+        if not df.empty:
+            df_prepared = await asyncio.to_thread(prepare_df_for_upload, df)
+            stats = await asyncio.to_thread(upload_prepared, df_prepared, engine, method=upload_method,
+                                            workers=upload_workers)
+            uploaded += len(df_prepared)
+            if state is not None and stats["failed"]:
+                # 실패한 배치의 항공편은 상태를 전진시키지 않아 다음 실행에서 다시 변경으로 감지됨
+                logger.error("업로드가 완료되지 않은 배치가 있어 해당 배치의 가격 상태를 갱신하지 않습니다.")
+                continue
+        if state is not None:
+            state.apply(update)
+            await asyncio.to_thread(state.save)
+    return uploaded
+
+async def run_pipeline_streaming(start_date, end_date, save_csv, use_route_map=True, raw_format="segment",
+                                 batch_size=STREAM_BATCH_SIZE, store="csv", upload_method="insert",
+                                 upload_workers=UPLOAD_WORKERS, changes_only=False, negative_cache=None,
+                                 transform_engine=None):
+    """
+    수집 결과를 모아두지 않고 큐로 흘려보내 전처리/업로드를 겹쳐 실행합니다.
+    메모리는 큐 크기와 micro-batch 크기에만 비례합니다.
+    저장 시 parquet 저장소는 micro-batch마다 바로 병합하고, csv는 임시 파일에 이어 쓴 뒤
+    마지막에 한 번만 기존 CSV와 병합합니다.
+    """
+    click.secho(f"\n🚀 '{start_date}'부터 '{end_date}'까지의 데이터 파이프라인을 스트리밍 모드로 시작합니다.", fg="green")
+    raw_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+    upload_queue = asyncio.Queue(maxsize=STREAM_UPLOAD_QUEUE_SIZE)
+    save_store = save_csv and store == "parquet"
+    if save_store:
+        preprocess.warn_stale_csv()
+    spool_path = PROCESSED_DIR / f"stream_spool_{os.getpid()}.csv" if save_csv and not save_store else None
+    if spool_path is not None:
+        PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+        if spool_path.exists():
+            spool_path.unlink()
+
+    tasks = [
+        asyncio.create_task(_collect_stage(start_date, end_date, raw_queue, use_route_map, raw_format,
+                                           negative_cache)),
+        asyncio.create_task(_transform_stage(raw_queue, upload_queue, batch_size, spool_path, save_store,
+                                             transform_engine)),
+        asyncio.create_task(_upload_stage(upload_queue, upload_method, upload_workers, changes_only)),
+    ]
+    try:
+        _, (total_rows, consumed), uploaded = await asyncio.gather(*tasks)
+    except Exception:
+        for task in tasks:
+            task.cancel()
+        # 취소와 동시에 끝난 단계가 가득 찬 큐에 종료 신호를 넣으려다 막히지 않도록 큐를 비우고 정리를 기다림
+        for queue in (raw_queue, upload_queue):
+            while not queue.empty():
+                queue.get_nowait()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    if spool_path is not None and spool_path.exists():
+        df_spool = pd.read_csv(spool_path, dtype=str, encoding="utf-8-sig")
+        if save_processed_csv(df_spool):
+            mark_ingested(consumed)
+        spool_path.unlink()
+
+    if total_rows:
+        logger.info(f"스트리밍 파이프라인 완료: 전처리 {total_rows}행, 업로드 {uploaded}행")
+    else:
+        logger.warning("전처리된 데이터가 없어 업로드 단계를 건너뜁니다.")
+
+# --- 데몬 모드: 예산 안에서 출발 임박/변동성 높은 슬롯부터 계속 조회 ---
+async def run_daemon(save_csv, use_route_map=True, raw_format="segment", store="csv", upload_method="insert",
+                     upload_workers=UPLOAD_WORKERS, changes_only=False, horizon_days=HORIZON_DAYS,
+                     requests_per_hour=REQUESTS_PER_HOUR, tick_seconds=TICK_SECONDS, skip_empty=False,
+                     transform_engine=None):
+    """
+    TICK_SECONDS마다 스케줄러가 고른 (노선, 출발일) 슬롯만 수집 → 전처리 → 업로드합니다.
+    한 주기가 실패해도 기록만 남기고 다음 주기를 계속합니다. 상태는 주기마다 저장됩니다.
+    skip_empty=True면 최근 빈 결과였던 요청은 예산에서 빼고, TTL이 지나면 다시 확인합니다.
+    """
+    negative_cache = NegativeCache() if skip_empty else None
+    scheduler = SweepScheduler(horizon_days=horizon_days, requests_per_hour=requests_per_hour,
+                               tick_seconds=tick_seconds, use_route_map=use_route_map, negative_cache=negative_cache)
+    click.secho(f"\n🛰️ 데몬 모드 시작: 출발일 {horizon_days}일 범위, 시간당 요청 {requests_per_hour}건, "
+                f"주기 {tick_seconds}초", fg="green")
+    while True:
+        started = time.monotonic()
+        tasks_params, slots = scheduler.select()
+        if tasks_params:
+            dep_dates = sorted({params["pDepDate"] for params in tasks_params})
+            df = None
+            try:
+                df = await run_pipeline(parse_yyyymmdd(dep_dates[0]), parse_yyyymmdd(dep_dates[-1]), save_csv,
+                                        use_route_map=use_route_map, raw_format=raw_format, store=store,
+                                        upload_method=upload_method, upload_workers=upload_workers,
+                                        changes_only=changes_only, tasks_params=tasks_params,
+                                        negative_cache=negative_cache, transform_engine=transform_engine)
+            except Exception as e:
+                logger.exception(f"이번 주기 실행 중 오류, 다음 주기에 계속합니다: {e}")
+            scheduler.record(slots, df)
+            export_metrics("daemon", {"tick_slots": len(slots), "tick_requests": len(tasks_params)})
+        await asyncio.sleep(max(0.0, tick_seconds - (time.monotonic() - started)))
 
 @click.command(help="항공권 데이터 파이프라인 실행 (수집 → 전처리 → 업로드)")
-@click.option("--start-date", "start_date_str", required=True, help="검색 시작 날짜 (YYYYMMDD)")
-@click.option("--end-date", "end_date_str", required=True, help="검색 끝 날짜 (YYYYMMDD)")
-@click.option("--save-csv", is_flag=True, help="전처리 결과를 CSV로 저장")
-def cli_main(start_date_str, end_date_str, save_csv):
+@click.option("--start-date", "start_date_str", help="검색 시작 날짜 (YYYYMMDD, --daemon이 아니면 필수)")
+@click.option("--end-date", "end_date_str", help="검색 끝 날짜 (YYYYMMDD, --daemon이 아니면 필수)")
+@click.option("--save-csv", is_flag=True, help="전처리 결과를 저장 (--store 형식)")
+@click.option("--store", type=click.Choice(["csv", "parquet"]), default="csv", show_default=True,
+              help="전처리 결과 저장 형식 (csv: 누적 CSV, parquet: 출발일 파티션 저장소)")
+@click.option("--all-routes", is_flag=True, help="ROUTE_MAP을 무시하고 전체 공항 조합을 조회")
+@click.option("--raw-format", type=click.Choice(["segment", "files"]), default="segment", show_default=True,
+              help="원본 응답 저장 형식 (segment: 수집 1회당 gzip NDJSON 세그먼트, files: 요청당 JSON 파일)")
+@click.option("--upload-method", type=click.Choice(["copy", "insert"]), default="insert", show_default=True,
+              help="DB 업로드 방식 (copy: COPY로 스테이징 테이블 적재 후 병합, insert: execute_values)")
+@click.option("--upload-workers", default=UPLOAD_WORKERS, show_default=True,
+              help="동시에 업로드할 배치 수 (DB 연결 풀 크기)")
+@click.option("--stream", is_flag=True, help="수집/전처리/업로드를 큐로 연결해 동시에 실행 (메모리 일정)")
+@click.option("--stream-batch-size", default=STREAM_BATCH_SIZE, show_default=True,
+              help="스트리밍 모드 전처리 micro-batch 크기 (응답 수)")
+@click.option("--changes-only", is_flag=True,
+              help="직전 관측과 요금/좌석이 달라진 행(및 신규 항공편)만 업로드 (로컬 저장은 전체 행)")
+@click.option("--request-log-rate", type=click.FloatRange(0, 1), default=None,
+              help="요청마다 남기는 INFO 로그 기록 비율 (1: 전부, 0.01: 100건 중 1건, 0: 주기 요약만, 기본: REQUEST_LOG_RATE 환경 변수 또는 1)")
+@click.option("--daemon", is_flag=True,
+              help="날짜 범위 대신 출발일 범위를 계속 훑는 상주 모드 (가까운 출발일/변동 큰 노선을 더 자주 조회)")
+@click.option("--horizon-days", default=HORIZON_DAYS, show_default=True, help="데몬 모드: 오늘부터 조회할 출발일 수")
+@click.option("--requests-per-hour", default=REQUESTS_PER_HOUR, show_default=True,
+              help="데몬 모드: 시간당 전체 요청 예산")
+@click.option("--shard-index", type=click.IntRange(min=0), default=None,
+              help="이 머신이 맡을 샤드 번호 (0부터, --shard-count와 함께 사용)")
+@click.option("--shard-count", type=click.IntRange(min=1), default=None,
+              help="전체 샤드 수 (머신마다 같은 값, 요청은 노선/출발일/여행사 해시로 나뉨)")
+@click.option("--local-shards", type=click.IntRange(min=1), default=None,
+              help="이 머신에서 N개 프로세스로 나눠 수집한 뒤 한 번에 전처리/업로드")
+@click.option("--skip-empty", is_flag=True,
+              help="최근 빈 결과(정상 응답, 편수 0)였던 노선·출발일·여행사 조합은 건너뜀 (TTL이 지나면 다시 확인)")
+@click.option("--transform-engine", type=click.Choice(preprocess.TRANSFORM_ENGINES), default=None,
+              help="전처리 정제 엔진 (기본값: 환경 변수 TRANSFORM_ENGINE 또는 pandas)")
+def cli_main(start_date_str, end_date_str, save_csv, store, all_routes, raw_format, upload_method, upload_workers,
+             stream, stream_batch_size, changes_only, request_log_rate, daemon, horizon_days, requests_per_hour,
+             shard_index, shard_count, local_shards, skip_empty, transform_engine):
+    if request_log_rate is not None:
+        REQUEST_LOG.rate = request_log_rate
+    if daemon:
+        # 데몬 모드는 자체 스케줄로 한 프로세스에서만 돌므로, 무시될 옵션은 조용히 넘기지 않고 거부합니다.
+        ignored = [name for name, given in (("--stream", stream),
+                                            ("--shard-index/--shard-count", shard_index is not None or shard_count is not None),
+                                            ("--local-shards", local_shards is not None),
+                                            ("--start-date/--end-date", bool(start_date_str or end_date_str)))
+                   if given]
+        if ignored:
+            raise click.UsageError(f"--daemon과 함께 쓸 수 없는 옵션: {', '.join(ignored)}")
+        asyncio.run(run_daemon(save_csv, use_route_map=not all_routes, raw_format=raw_format, store=store,
+                               upload_method=upload_method, upload_workers=upload_workers,
+                               changes_only=changes_only, horizon_days=horizon_days,
+                               requests_per_hour=requests_per_hour, skip_empty=skip_empty,
+                               transform_engine=transform_engine))
+        return
+    if not start_date_str or not end_date_str:
+        raise click.UsageError("--start-date와 --end-date를 지정하세요. (또는 --daemon)")
     start_date = parse_yyyymmdd(start_date_str)
     end_date = parse_yyyymmdd(end_date_str)
     if start_date > end_date:
         raise click.BadParameter("시작 날짜가 끝 날짜보다 늦을 수 없습니다.")
-    asyncio.run(run_pipeline(start_date, end_date, save_csv))
+    shard = None
+    if shard_index is not None or shard_count is not None:
+        if shard_index is None or shard_count is None:
+            raise click.UsageError("--shard-index와 --shard-count는 함께 지정하세요.")
+        if shard_index >= shard_count:
+            raise click.BadParameter("--shard-index는 --shard-count보다 작아야 합니다.")
+        shard = (shard_index, shard_count)
+    if (shard or local_shards) and stream:
+        raise click.UsageError("샤드 실행은 --stream과 함께 쓸 수 없습니다.")
+    if shard and local_shards:
+        raise click.UsageError("--shard-index/--shard-count와 --local-shards는 함께 쓸 수 없습니다.")
+    if local_shards and skip_empty:
+        # 로컬 샤드 프로세스들이 같은 캐시 파일을 동시에 덮어쓰지 않도록
+        raise click.UsageError("--skip-empty는 --local-shards와 함께 쓸 수 없습니다.")
+    negative_cache = NegativeCache() if skip_empty else None
+    try:
+        if local_shards:
+            run_pipeline_local_shards(start_date, end_date, save_csv, local_shards, use_route_map=not all_routes,
+                                      raw_format=raw_format, store=store, upload_method=upload_method,
+                                      upload_workers=upload_workers, changes_only=changes_only,
+                                      request_log_rate=request_log_rate, transform_engine=transform_engine)
+        elif stream:
+            asyncio.run(run_pipeline_streaming(start_date, end_date, save_csv, use_route_map=not all_routes,
+                                               raw_format=raw_format, batch_size=stream_batch_size, store=store,
+                                               upload_method=upload_method, upload_workers=upload_workers,
+                                               changes_only=changes_only, negative_cache=negative_cache,
+                                               transform_engine=transform_engine))
+        else:
+            asyncio.run(run_pipeline(start_date, end_date, save_csv, use_route_map=not all_routes,
+                                     raw_format=raw_format, store=store, upload_method=upload_method,
+                                     upload_workers=upload_workers, changes_only=changes_only, shard=shard,
+                                     negative_cache=negative_cache, transform_engine=transform_engine))
+    finally:
+        # 실패한 실행도 어디까지 진행됐는지 남도록 항상 기록
+        export_metrics("pipeline", {"args": {"start_date": start_date_str, "end_date": end_date_str,
+                                             "stream": stream, "store": store, "upload_method": upload_method,
+                                             "changes_only": changes_only, "shard": shard,
+                                             "local_shards": local_shards, "skip_empty": skip_empty,
+                                             "transform_engine": transform_engine or preprocess.TRANSFORM_ENGINE}})
 
 def manual_run():
     start_date = datetime(2025, 10, 26).date()
@@ -77,4 +77,16 @@ ROUTE_MAP = {
     "TAE": ["CJU"],
     "USN": ["CJU", "GMP"],
     "WJU": ["CJU"]
-}
\ No newline at end of file
+}
+
+# ✨ 노선별 여행사 커버리지 ((출발지, 도착지): [여행사 코드...])
+# 미지정 노선은 AGENT_CODES 전체를 조회합니다.
+ROUTE_AGENTS = {
+    # ("CJJ", "CJU"): ["LT", "IP", "JD", "WT", "OT"],
+}
+
+# ✨ 노선별 조회 날짜 범위 ((출발지, 도착지): ("YYYYMMDD" 시작, "YYYYMMDD" 끝))
+# 시작/끝 중 None 은 제한 없음. 미지정 노선은 전체 날짜를 조회합니다.
+ROUTE_DATE_WINDOWS = {
+    # ("KUV", "CJU"): ("20251026", None),
+}
@@ -54,5 +54,42 @@ HEADER_DESCRIPTIONS = {
     "errorDesc": "결과 호출 메세지"
 }
 
+# --- 전처리 결과 컬럼 타입 (preprocess → 저장소 → upload 공통, 한 번만 파싱) ---
+# category: 코드/도시/이름 등 반복 값, str: 자유 문자열,
+# int16/int32: 좌석/요금, date: 날짜(datetime64), minutes: 자정부터 지난 분(Int16, 결측 허용)
+FIELD_DTYPES = {
+    "agency_code": "category",
+    "code": "str",
+    "depDate": "date",
+    "depDay": "category",
+    "depTime": "minutes",
+    "depCity": "category",
+    "depDesc": "category",
+    "arrDate": "date",
+    "arrDay": "category",
+    "arrTime": "minutes",
+    "arrCity": "category",
+    "arrDesc": "category",
+    "carCode": "category",
+    "carDesc": "category",
+    "opCarCode": "category",
+    "opCarDesc": "category",
+    "mainFlt": "str",
+    "classCode": "category",
+    "classDesc": "str",
+    "seat": "int16",
+    "total_price": "int32",
+    "fare": "int32",
+    "fareOrigin": "int32",
+    "fuelChg": "int32",
+    "airTax": "int32",
+    "tasf": "int32",
+    "scraped_date": "date",
+    "source_file": "str",
+}
+
+# 대문자로 통일하는 코드 컬럼
+UPPER_FIELDS = ["agency_code", "carCode", "opCarCode", "classCode", "mainFlt", "code"]
+
 def calculate_total(fare: int, airTax: int, fuelChg: int, tasf: int) -> int:
     return fare + airTax + fuelChg + tasf
\ No newline at end of file
@@ -0,0 +1,154 @@
+# change_detect.py
+import os
+import numpy as np
+import pandas as pd
+
+from src.common.logging_setup import setup_logging
+from src.common.paths import PROCESSED_DIR
+from src.common.key_index import hash_key_frame
+from src.common.keys import key_hashes, UNIQUE_KEYS
+
+logger = setup_logging(__name__)
+
+# 값이 바뀌었는지 비교하는 컬럼 (요금/세금/좌석)
+CHANGE_COLUMNS = ["seat", "total_price", "fare", "fareOrigin", "fuelChg", "airTax", "tasf"]
+PRICE_STATE_PATH = PROCESSED_DIR / "price_state.npz"
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def _to_days(s: pd.Series) -> np.ndarray:
+    """날짜 컬럼 → 1970-01-01 기준 일수(int32)"""
+    return (pd.to_datetime(s).to_numpy().astype("datetime64[D]") - _EPOCH).astype(np.int32)
+
+
+# ---------------------------------- 1. 항공편별 최신 상태 (정렬된 키 해시 + 값 해시 + 유효 시작일/최근 관측일)
+class PriceState:
+    """
+    항공편 키(UNIQUE_KEYS)별로 마지막으로 올린 값(CHANGE_COLUMNS 해시)과
+    그 값의 유효 시작일(valid_from), 마지막으로 관측한 수집일(last_seen)을 보관합니다. (.npz 파일)
+    """
+
+    def __init__(self, path=PRICE_STATE_PATH):
+        self.path = path
+        if os.path.exists(path):
+            with np.load(path) as data:
+                self.keys = data["keys"]
+                self.values = data["values"]
+                self.valid_from = data["valid_from"]
+                self.last_seen = data["last_seen"]
+        else:
+            self.keys = np.empty(0, dtype=np.uint64)
+            self.values = np.empty(0, dtype=np.uint64)
+            self.valid_from = np.empty(0, dtype=np.int32)
+            self.last_seen = np.empty(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def lookup(self, hashes: np.ndarray):
+        """(위치, 존재 여부) 반환. 존재하지 않는 키의 위치 값은 의미 없음."""
+        if len(self.keys) == 0:
+            return np.zeros(len(hashes), dtype=np.int64), np.zeros(len(hashes), dtype=bool)
+        pos = np.minimum(np.searchsorted(self.keys, hashes), len(self.keys) - 1)
+        return pos, self.keys[pos] == hashes
+
+    def apply(self, update: dict):
+        """detect_changes가 돌려준 갱신분을 반영합니다. (업로드가 성공한 뒤 호출)"""
+        if len(update["keys"]) == 0:
+            return
+        keep = ~np.isin(self.keys, update["keys"])
+        keys = np.concatenate([self.keys[keep], update["keys"]])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.values = np.concatenate([self.values[keep], update["values"]])[order]
+        self.valid_from = np.concatenate([self.valid_from[keep], update["valid_from"]])[order]
+        self.last_seen = np.concatenate([self.last_seen[keep], update["last_seen"]])[order]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, keys=self.keys, values=self.values,
+                 valid_from=self.valid_from, last_seen=self.last_seen)
+        os.replace(tmp_path, self.path)
+
+
+# ---------------------------------- 2. ✨ 변경 감지
+def detect_changes(df_final: pd.DataFrame, state: PriceState):
+    """
+    항공편 키별로 직전 상태(이번 배치 안의 앞선 관측 또는 PriceState)와 요금/좌석이 다른 행만 남깁니다.
+    처음 보는 항공편은 모두 변경으로 취급합니다.
+    반환: (변경 행 DataFrame, 상태 갱신분 dict) — 갱신분은 업로드 성공 후 state.apply로 반영
+    """
+    empty_update = {"keys": np.empty(0, dtype=np.uint64), "values": np.empty(0, dtype=np.uint64),
+                    "valid_from": np.empty(0, dtype=np.int32), "last_seen": np.empty(0, dtype=np.int32)}
+    if df_final is None or df_final.empty:
+        return df_final, empty_update
+
+    k = key_hashes(df_final, UNIQUE_KEYS)
+    v = hash_key_frame(df_final[CHANGE_COLUMNS])
+    day = _to_days(df_final["scraped_date"])
+
+    # 키 → 수집일 순으로 정렬해 같은 항공편의 관측을 연속으로 둠
+    order = np.lexsort((day, k))
+    ks, vs, ds = k[order], v[order], day[order]
+    first = np.r_[True, ks[1:] != ks[:-1]]
+    last = np.r_[ks[1:] != ks[:-1], True]
+
+    pos, found = state.lookup(ks)
+    if len(state):
+        state_v, state_vf, state_ls = state.values[pos], state.valid_from[pos], state.last_seen[pos]
+    else:
+        state_v = np.zeros(len(ks), dtype=np.uint64)
+        state_vf = state_ls = np.zeros(len(ks), dtype=np.int32)
+    prev_v = np.r_[np.uint64(0), vs[:-1]]
+    changed = np.where(first, ~found | (state_v != vs), vs != prev_v)
+
+    # 항공편별 최종 상태: 값/최근 관측일은 마지막 관측, 유효 시작일은 마지막 변경일(없으면 기존 값)
+    starts = np.flatnonzero(first)
+    last_change = np.maximum.reduceat(np.where(changed, ds, -1), starts)
+    update = {
+        "keys": ks[last],
+        "values": vs[last],
+        "valid_from": np.where(last_change >= 0, last_change, state_vf[starts]).astype(np.int32),
+        "last_seen": np.where(found[starts], np.maximum(ds[last], state_ls[starts]), ds[last]).astype(np.int32),
+    }
+
+    df_changes = df_final.iloc[np.sort(order[changed])]
+    new_flights = int((first & ~found).sum())
+    logger.info(f"🔎 변경 감지: 입력 {len(df_final)}행 → 업로드 {len(df_changes)}행 "
+                f"(신규 항공편 {new_flights}, 요금/좌석 변경 {len(df_changes) - new_flights}, "
+                f"동일 값 생략 {len(df_final) - len(df_changes)})")
+    return df_changes, update
+
+
+# ---------------------------------- 3. ✨ 이력 → 스냅샷 복원
+def add_valid_to(history: pd.DataFrame) -> pd.DataFrame:
+    """
+    변경 행 이력(scraped_date = valid_from)에 valid_to(다음 변경의 수집일, 현재 값이면 NaT)를 붙입니다.
+    SQL로는 LEAD("scraped_date") OVER (PARTITION BY <UNIQUE_KEYS> ORDER BY "scraped_date")와 같습니다.
+    """
+    out = history.copy()
+    out["_key"] = key_hashes(out, UNIQUE_KEYS)
+    out = out.sort_values(["_key", "scraped_date"], kind="stable")
+    out["valid_from"] = pd.to_datetime(out["scraped_date"])
+    out["valid_to"] = out.groupby("_key", sort=False)["valid_from"].shift(-1)
+    return out.drop(columns=["_key"])
+
+def rebuild_snapshot(history: pd.DataFrame, as_of, state: PriceState = None) -> pd.DataFrame:
+    """
+    변경 행 이력으로 as_of(수집일) 시점의 전체 스냅샷을 복원합니다.
+    valid_from <= as_of < valid_to 인 행을 고르고, state를 주면 as_of 전에 마지막으로 관측된
+    (이후 목록에서 사라진) 항공편의 열린 구간은 제외합니다.
+    """
+    as_of = pd.Timestamp(as_of)
+    hist = add_valid_to(history)
+    mask = (hist["valid_from"] <= as_of) & (hist["valid_to"].isna() | (hist["valid_to"] > as_of))
+    snap = hist[mask]
+    if state is not None and len(state) and not snap.empty:
+        pos, found = state.lookup(key_hashes(snap, UNIQUE_KEYS))
+        as_of_day = (np.datetime64(as_of.date(), "D") - _EPOCH).astype(np.int32)
+        still_listed = snap["valid_to"].notna().to_numpy() | ~found | (state.last_seen[pos] >= as_of_day)
+        snap = snap[still_listed]
+    snap = snap.assign(scraped_date=as_of)
+    return snap.drop(columns=["valid_from", "valid_to"]).reset_index(drop=True)
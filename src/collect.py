@@ -5,56 +5,42 @@ import json
 import asyncio
 import aiohttp
 from datetime import datetime, timedelta
-from selenium import webdriver
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 
 # requirements.config와 로깅 설정은 기존과 동일하다고 가정합니다.
-from requirements.config import DEPARTURES, ARRIVALS, AGENT_CODES, PASSENGERS, CABIN_CLASS, AGENTS
-from src.common.logging_setup import setup_logging
+from requirements.config import AGENTS
+from src.common.logging_setup import setup_logging, LogSampler
+from src.common.metrics import METRICS, record_throughput
 from src.common.paths import RAW_DIR
+from src.planner import iter_request_plan, iter_full_plan, log_plan_summary, iter_shard
+from src.rate_control import AdaptiveLimiter, RetryQueue, parse_retry_after
+from src.raw_writer import RawWriter
+from src.session import CookieProvider, BASE_URL, TARGET_URL
+from src.negative_cache import NegativeCache
 
 logger = setup_logging(__name__)
+# 요청마다 남기는 INFO 로그는 표본만 기록 (비율: REQUEST_LOG_RATE 환경 변수 또는 --request-log-rate)
+REQUEST_LOG = LogSampler(logger)
 
 # ---------------------------------- 1. 설정 (기존과 동일)
-DRIVER_PATH = r"D:\Users\bin\PycharmProjects\airline_tickets\requirements\edgedriver_win64\msedgedriver.exe"
-BASE_URL = "https://www.airport.co.kr"
 API_URL = f"{BASE_URL}/booking/ajaxf/frAirticketSvc/getData.do"
-TARGET_URL = f"{BASE_URL}/booking/cms/frCon/index.do?MENU_ID=80"
+MAX_RETRIES = 3
+BASE_DELAY = 2
+REQUEST_TIMEOUT = 20
+INITIAL_CONCURRENCY = 20    # 시작 동시 요청 수 (관측 지연/오류에 따라 AIMD로 조절)
+MIN_CONCURRENCY = 4
+MAX_CONCURRENCY = 80
+RAW_FORMAT = "segment"      # 원본 저장 형식: "segment"(gzip NDJSON 세그먼트) | "files"(요청당 JSON 파일)
 ROOT_OUTPUT_DIR = RAW_DIR
 os.makedirs(ROOT_OUTPUT_DIR, exist_ok=True)
 
+# 수집 지표 (노선 "출발-도착", 여행사 코드 라벨)
+REQUEST_LATENCY = METRICS.histogram("airline_request_latency_seconds", "요청 지연(초, 성공 응답)", ("route", "agent"))
+REQUESTS = METRICS.counter("airline_requests_total", "요청 결과 (ok, http_<상태>, timeout, client_error, invalid_json)",
+                           ("route", "agent", "outcome"))
+RESPONSE_BYTES = METRICS.counter("airline_response_bytes_total", "받은 응답 크기(바이트)", ("route", "agent"))
+REQUEST_RETRIES = METRICS.counter("airline_request_retries_total", "재시도 큐에 넣은 요청 수", ("route", "agent"))
+REQUEST_FAILURES = METRICS.counter("airline_request_failures_total", "재시도 후에도 실패한 요청 수", ("route", "agent"))
 
-# ---------------------------------- 2. Selenium 관련 함수 (기존과 동일)
-def create_edge_options():
-    options = Options()
-    options.add_argument("--headless")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/136.0.0.0 Safari/537.36"
-    )
-    return options
-
-def get_cookies():
-    service = Service(DRIVER_PATH)
-    driver = None
-    try:
-        driver = webdriver.Edge(service=service, options=create_edge_options())
-        driver.get(TARGET_URL)
-        time.sleep(3)
-        cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
-        logger.info(f"✅ 쿠키 {len(cookies)}개 획득 완료")
-        return cookies
-    except Exception as e:
-        logger.error(f"❌ 쿠키 획득 실패: {e}")
-        return {}
-    finally:
-        if driver:
-            driver.quit()
 
 # ---------------------------------- 3. 날짜 리스트 생성 (기존과 동일)
 def generate_dates(start_date, end_date):
@@ -66,121 +52,333 @@ def generate_dates(start_date, end_date):
     return dates
 
 # ---------------------------------- 4. ✨ 비동기 항공권 조회 및 저장
-async def search_flight_async(session, semaphore, params):
-    MAX_RETRIES = 3
-    BASE_DELAY = 2
+class RetryableRequestError(Exception):
+    """재시도 큐로 보내야 하는 요청 실패 (타임아웃, 연결 오류, 비정상 상태 코드)."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+SESSION_EXPIRED_STATUSES = (401, 403, 419, 440)
+
+
+async def search_flight_async(session, limiter, writer, params, attempt=0, cookie_provider=None):
+    """
+    요청 1회를 수행합니다. 실패 시 대기하지 않고 RetryableRequestError를 올려
+    호출 측이 재시도 큐에 넣도록 합니다. 원본 저장은 writer(쓰기 스레드)에 맡깁니다.
+    세션 만료로 보이는 응답(인증 상태 코드, JSON이 아닌 응답)은 cookie_provider에 알려 쿠키를 갱신하게 합니다.
+    """
     pDep, pArr, pDepDate, comp = params["pDep"], params["pArr"], params["pDepDate"], params["comp"]
+    route = f"{pDep}-{pArr}"
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
+        "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+        "Referer": TARGET_URL
+    }
+
+    async with limiter:
+        if attempt > 0:
+            logger.warning(f"재시도 ({attempt + 1}/{MAX_RETRIES}): {pDep}→{pArr}, {pDepDate}, {comp}")
+        else:
+            REQUEST_LOG.info("요청 시작", "요청 시작: %s→%s, %s, %s", pDep, pArr, pDepDate, AGENTS.get(comp, comp))
+
+        started = time.monotonic()
+        try:
+            async with session.post(API_URL, data=params, headers=headers, timeout=REQUEST_TIMEOUT) as response:
+                if response.status != 200:
+                    REQUESTS.inc(route=route, agent=comp, outcome=f"http_{response.status}")
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    limiter.on_failure(f"상태 코드 {response.status}")
+                    if retry_after is not None and response.status in (429, 503):
+                        limiter.pause(retry_after)
+                    if cookie_provider is not None and response.status in SESSION_EXPIRED_STATUSES:
+                        cookie_provider.report_failure(f"상태 코드 {response.status}")
+                    logger.error(f"요청 실패 ({response.status}): {pDep}→{pArr}, {pDepDate}, {comp}")
+                    raise RetryableRequestError(f"status {response.status}", retry_after=retry_after)
+                body = await response.read()
+        except asyncio.TimeoutError as e:
+            REQUESTS.inc(route=route, agent=comp, outcome="timeout")
+            limiter.on_failure("타임아웃")
+            logger.error(f"오류 발생 ({pDep}→{pArr}, {pDepDate}, {comp}): 타임아웃")
+            raise RetryableRequestError("timeout") from e
+        except aiohttp.ClientError as e:
+            REQUESTS.inc(route=route, agent=comp, outcome="client_error")
+            limiter.on_failure(type(e).__name__)
+            logger.error(f"오류 발생 ({pDep}→{pArr}, {pDepDate}, {comp}): {e}")
+            raise RetryableRequestError(str(e)) from e
+
+        latency = time.monotonic() - started
+    REQUEST_LATENCY.observe(latency, route=route, agent=comp)
+    RESPONSE_BYTES.inc(len(body), route=route, agent=comp)
+
+    if attempt > 0:
+        REQUEST_LOG.info("재시도 성공", "✅ 재시도 성공: %s→%s, %s, %s", pDep, pArr, pDepDate, comp)
 
-    for attempt in range(MAX_RETRIES):
-        async with semaphore:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/136.0.0.0 Safari/537.36",
-                "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "Referer": TARGET_URL
-            }
+    try:
+        result = json.loads(body)
+    except ValueError as e:
+        REQUESTS.inc(route=route, agent=comp, outcome="invalid_json")
+        limiter.on_failure("JSON이 아닌 응답")
+        if cookie_provider is not None:
+            cookie_provider.report_failure("JSON이 아닌 응답")
+        logger.error(f"JSON 파싱 실패 ({pDep}→{pArr}, {pDepDate}, {comp}): {e}")
+        raise RetryableRequestError("invalid json") from e
+    # 본문이 정상 JSON일 때만 성공으로 보고 한도를 올림 (차단/오류 페이지가 200으로 와도 늘리지 않도록)
+    limiter.on_success(latency)
+    REQUESTS.inc(route=route, agent=comp, outcome="ok")
+    if cookie_provider is not None:
+        cookie_provider.report_success()
+
+    acquisition_date = datetime.now().strftime("%Y-%m-%d")
+    meta = {"dep": pDep, "arr": pArr, "depDate": pDepDate, "agent": comp, "acq_date": acquisition_date}
+
+    # 디스크 쓰기는 쓰기 스레드에서 수행 (받은 바이트 그대로 저장)
+    filepath = await writer.submit(meta, body)
+
+    header = result.get("data", {}).get("header", {})
+    cnt = header.get("cnt", 0)
+
+    REQUEST_LOG.info("저장 완료", "저장 완료: %s→%s, %s, %s | 편수: %s", pDep, pArr, pDepDate, AGENTS.get(comp, comp), cnt)
+    return {"filepath": filepath, "raw_data": result, "agency_code": comp, "scraped_date": acquisition_date}
+
+async def _collect_with_retries(session, limiter, writer, tasks_params, sink, cookie_provider=None,
+                                workers: int = MAX_CONCURRENCY, negative_cache: NegativeCache = None):
+    """
+    고정된 수(workers)의 작업자가 요청 목록/제너레이터에서 하나씩 꺼내 실행합니다.
+    (요청 수와 무관하게 동시에 살아 있는 코루틴/결과는 작업자 수만큼)
+    실패한 요청은 지터가 섞인 예정 시각에 재시도 큐에서 다시 꺼내며, 새 요청보다 먼저 실행합니다.
+    성공한 결과는 sink(비동기 함수)로 넘기고, negative_cache가 있으면 응답 헤더(편수/오류 코드)를 기록합니다.
+    반환: (꺼낸 요청 수, 재시도 횟수)
+    """
+    retry_queue = RetryQueue(base_delay=BASE_DELAY)
+    params_iter = iter(tasks_params)
+    changed = asyncio.Condition()    # 요청 하나가 끝날 때마다 알림 (쉬는 작업자가 재시도 큐를 다시 확인)
+    drawn = retry_count = in_flight = 0
+    exhausted = False
+
+    async def _attempt(params, attempt):
+        nonlocal retry_count
+        try:
+            result = await search_flight_async(session, limiter, writer, params, attempt, cookie_provider)
+        except RetryableRequestError as e:
+            route = f"{params['pDep']}-{params['pArr']}"
+            if attempt + 1 < MAX_RETRIES:
+                REQUEST_RETRIES.inc(route=route, agent=params["comp"])
+                delay = retry_queue.push((params, attempt + 1), attempt, retry_after=e.retry_after)
+                retry_count += 1
+                logger.warning(f"{delay:.1f}초 후 재시도합니다: {params['pDep']}→{params['pArr']}, "
+                               f"{params['pDepDate']}, {params['comp']}")
+            else:
+                REQUEST_FAILURES.inc(route=route, agent=params["comp"])
+                logger.critical(f"최종 실패: {params['pDep']}→{params['pArr']}, {params['pDepDate']}, {params['comp']}")
+            return
+        if negative_cache is not None:
+            data = result["raw_data"].get("data")
+            negative_cache.observe(params, data.get("header") if isinstance(data, dict) else None)
+        await sink(result)
+
+    def _next_item():
+        nonlocal drawn, exhausted
+        item = retry_queue.pop_next_due()
+        if item is None and not exhausted:
+            params = next(params_iter, None)
+            if params is None:
+                exhausted = True
+            else:
+                drawn += 1
+                item = (params, 0)
+        return item
+
+    async def _worker():
+        nonlocal in_flight
+        while True:
+            async with changed:
+                item = _next_item()
+                while item is None:
+                    # 남은 요청도, 재시도 대기도, 실행 중인 요청(재시도를 만들 수 있음)도 없으면 종료
+                    if exhausted and not retry_queue and in_flight == 0:
+                        changed.notify_all()
+                        return
+                    try:
+                        await asyncio.wait_for(changed.wait(), timeout=retry_queue.seconds_until_next())
+                    except asyncio.TimeoutError:
+                        pass
+                    item = _next_item()
+                in_flight += 1
             try:
-                if attempt > 0:
-                    logger.warning(f"재시도 ({attempt + 1}/{MAX_RETRIES}): {pDep}→{pArr}, {pDepDate}, {comp}")
-                else:
-                    logger.info(f"요청 시작: {pDep}→{pArr}, {pDepDate}, {AGENTS.get(comp, comp)}")
-
-                async with session.post(API_URL, data=params, headers=headers, timeout=20) as response:
-                    if response.status == 200:
-                        result = await response.json(content_type=None)
-
-                        if attempt > 0:
-                            logger.info(f"✅ 재시도 성공: {pDep}→{pArr}, {pDepDate}, {comp}")
-
-                        acquisition_date = datetime.now().strftime("%Y-%m-%d")
-                        collection_dir = os.path.join(params["base_output_dir"], acquisition_date)
-                        flight_date_dir = os.path.join(collection_dir, pDepDate)
-                        os.makedirs(flight_date_dir, exist_ok=True)
-
-                        filename = f"{pDep}_{pArr}_{pDepDate}_{comp}.json"
-                        filepath = os.path.join(flight_date_dir, filename)
-
-                        with open(filepath, "w", encoding="utf-8") as f:
-                            json.dump(result, f, ensure_ascii=False, indent=4)
-
-                        header = result.get("data", {}).get("header", {})
-                        cnt = header.get("cnt", 0)
-                        error = header.get("errorDesc", "") if header.get("errorCode") != "0" else "정상"
-
-                        logger.info(f"저장 완료: {pDep}→{pArr}, {pDepDate}, {AGENTS.get(comp, comp)} | 편수: {cnt}")
-                        return {"filepath": filepath, "raw_data": result}
-                    else:
-                        logger.error(f"요청 실패 ({response.status}): {pDep}→{pArr}, {pDepDate}, {comp}")
-            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
-                logger.error(f"오류 발생 ({pDep}→{pArr}, {pDepDate}, {comp}): {e}")
-            if attempt < MAX_RETRIES - 1:
-                delay = BASE_DELAY * (2 ** attempt)
-                logger.warning(f"{delay}초 후 재시도합니다...")
-                await asyncio.sleep(delay)
-
-    logger.critical(f"최종 실패: {pDep}→{pArr}, {pDepDate}, {comp}")
-    return None
+                await _attempt(*item)
+            except Exception as e:
+                logger.error(f"요청 처리 중 예기치 못한 오류: {e!r}")
+            finally:
+                async with changed:
+                    in_flight -= 1
+                    changed.notify_all()
+
+    await asyncio.gather(*(_worker() for _ in range(max(1, workers))))
+    return drawn, retry_count
 
 # ---------------------------------- 5. ✨ 메인 실행 함수 (수정됨)
-async def run_collect_async(start_date, end_date):
+async def run_collect_async(start_date, end_date, use_route_map=True, max_concurrency=MAX_CONCURRENCY,
+                            raw_format=RAW_FORMAT, result_queue: asyncio.Queue = None, tasks_params: list = None,
+                            output_dir=None, cookie_provider: CookieProvider = None, shard: tuple = None,
+                            keep_results: bool = True, summary: dict = None, negative_cache: NegativeCache = None):
+    """
+    result_queue를 넘기면 수집 결과를 메모리에 모으지 않고 큐로 바로 흘려보냅니다. (스트리밍 모드)
+    큐가 가득 차면 수집이 자연스럽게 늦춰집니다. 이 경우 반환값은 빈 리스트입니다.
+    요청은 계획 제너레이터에서 max_concurrency개 작업자가 하나씩 꺼내 실행하므로 메모리는 날짜 범위가 아니라 동시성에 비례합니다.
+    tasks_params(목록 또는 제너레이터)를 넘기면 날짜 범위로 계획을 만들지 않고 그 요청만 실행합니다. (데몬 모드 스케줄러)
+    output_dir/cookie_provider로 원본 저장 위치와 쿠키 캐시를 바꿀 수 있습니다. (벤치마크 등)
+    shard=(shard_index, shard_count)면 계획 중 그 조각만 실행합니다. (샤드 수집)
+    keep_results=False면 결과를 메모리에 모으지 않고 원본 저장만 합니다.
+    summary(dict)를 넘기면 요청/성공/실패/재시도 수와 기록한 원본 파일 목록을 채워 줍니다.
+    negative_cache를 넘기면 최근 빈 결과였던 조합은 건너뛰고(TTL이 지나면 다시 확인), 이번 응답으로 캐시를 갱신해 저장합니다.
+    """
     logger.info("비동기 데이터 수집 시작")
 
-    cookies = get_cookies()
+    if cookie_provider is None:
+        cookie_provider = CookieProvider()
+    cookies = await cookie_provider.get()
     if not cookies:
         logger.error("쿠키 획득 실패, 프로그램 종료")
         return
 
-    base_output_path = os.path.join(ROOT_OUTPUT_DIR)
+    base_output_path = os.path.join(output_dir or ROOT_OUTPUT_DIR)
     os.makedirs(base_output_path, exist_ok=True)
-    dep_dates = generate_dates(start_date, end_date)
-
-    # --- 1. 모든 요청 조합을 미리 생성 ---
-    tasks_params = []
-    for dep in DEPARTURES:
-        for arr in ARRIVALS:
-            if dep == arr: continue
-            for date in dep_dates:
-                for agent in AGENT_CODES:
-                    payload = {
-                        "pDep": dep, "pArr": arr, "pDepDate": date,
-                        "pAdt": str(PASSENGERS["adult"]), "pChd": str(PASSENGERS["child"]),
-                        "pInf": str(PASSENGERS["infant"]), "pSeat": CABIN_CLASS, "comp": agent,
-                        "carCode": "ALL", "base_output_dir": base_output_path, "pArrDate": ""
-                    }
-                    tasks_params.append(payload)
-
-    logger.info(f"총 요청 수: {len(tasks_params)}건")
-
-    # --- 2. 비동기 작업 실행 ---
+    # --- 1. 노선 카탈로그 기반 요청 계획 (실행하면서 하나씩 생성) ---
+    plan_summary = None
+    if tasks_params is None:
+        dep_dates = generate_dates(start_date, end_date)
+        if use_route_map:
+            tasks_params, plan_summary = iter_request_plan(dep_dates, base_output_path)
+        else:
+            tasks_params, plan_summary = iter_full_plan(dep_dates, base_output_path)
+        log_plan_summary(plan_summary)
+        total_count = plan_summary["planned_requests"]
+    else:
+        total_count = len(tasks_params) if hasattr(tasks_params, "__len__") else None
+    if shard is not None:
+        shard_index, shard_count = shard
+        tasks_params = iter_shard(tasks_params, shard_index, shard_count)
+        logger.info(f"🧩 샤드 {shard_index + 1}/{shard_count} 담당 (전체 {total_count}건 중 해시로 나눈 조각)")
+    elif total_count is not None:
+        logger.info(f"총 요청 수: {total_count}건")
+    if negative_cache is not None:
+        tasks_params = negative_cache.filter(tasks_params)
+
+    # --- 2. 비동기 작업 실행 (AIMD 동시성 제어 + 지연 재시도 큐) ---
     start_time = time.time()
 
-    semaphore = asyncio.Semaphore(50)
-    connector = aiohttp.TCPConnector(limit=100, limit_per_host=50, ttl_dns_cache=300)
+    limiter = AdaptiveLimiter(
+        initial=min(INITIAL_CONCURRENCY, max_concurrency),
+        min_limit=min(MIN_CONCURRENCY, max_concurrency),
+        max_limit=max_concurrency,
+    )
+    connector = aiohttp.TCPConnector(limit=max_concurrency * 2, limit_per_host=max_concurrency, ttl_dns_cache=300)
+
+    # 샤드마다(다른 머신이어도) 세그먼트 이름이 겹치지 않도록 run_id에 샤드 번호를 넣음
+    run_id = None
+    if shard is not None:
+        run_id = f"{datetime.now().strftime('%H%M%S')}_{os.getpid()}_s{shard[0]}of{shard[1]}"
+    writer = RawWriter(base_output_path, raw_format=raw_format, run_id=run_id)
+
+    collected_data = []
+    success_count = 0
 
-    async with aiohttp.ClientSession(cookies=cookies, connector=connector) as session:
-        tasks = [search_flight_async(session, semaphore, params) for params in tasks_params]
-        results = await asyncio.gather(*tasks)
+    async def _sink(result):
+        nonlocal success_count
+        success_count += 1
+        if result_queue is not None:
+            await result_queue.put(result)
+        elif keep_results:
+            collected_data.append(result)
+
+    try:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            cookie_provider.attach(session)
+            try:
+                request_count, retry_count = await _collect_with_retries(session, limiter, writer, tasks_params,
+                                                                         _sink, cookie_provider, max_concurrency,
+                                                                         negative_cache)
+            finally:
+                await cookie_provider.aclose()
+    finally:
+        await writer.aclose()
 
     elapsed = time.time() - start_time
+    REQUEST_LOG.flush()
+    record_throughput("collect", "responses", success_count, elapsed)
 
     # --- 👇 [추가] 최종 결과 요약 로그 ---
-    collected_data = [r for r in results if r is not None]
-
-    success_count = len(collected_data)
-    failure_count = len(tasks_params) - success_count
+    failure_count = request_count - success_count
 
-    saved_count = len(collected_data)
+    saved_count = writer.written
 
     logger.info("=" * 50)
     logger.info("📊 전체 수집 결과 요약")
-    logger.info(f"  - 총 요청 수: {len(tasks_params)} 건")
+    logger.info(f"  - 총 요청 수: {request_count} 건")
+    if plan_summary is not None:
+        logger.info(f"  - ✂️ 노선 계획으로 절감한 요청 수: {plan_summary['saved_requests']} 건")
     logger.info(f"  - ✅ 성공: {success_count} 건")
     logger.info(f"  - ❌ 실패: {failure_count} 건")
-    logger.info(f"  - 💾 저장된 JSON 파일 수: {saved_count} 건")
+    logger.info(f"  - 🔁 재시도 횟수: {retry_count} 건")
+    logger.info(f"  - 🎚️ 동시성 한도: 최종 {limiter.current_limit} / 최대 {int(limiter.peak_limit)} (감소 {limiter.decrease_count}회)")
+    logger.info(f"  - 💾 저장된 원본 응답 수: {saved_count} 건 ({raw_format})")
+    bootstrap_note = " (시작 시 쿠키 새로 받음)" if cookie_provider.bootstrapped else ""
+    logger.info(f"  - 🍪 실행 중 쿠키 갱신: {cookie_provider.refresh_count} 회{bootstrap_note}")
+    if negative_cache is not None:
+        negative_cache.log_summary()
     logger.info(f"  - ⏱️ 총 소요 시간: {elapsed:.2f} 초")
     logger.info("=" * 50)
 
+    if negative_cache is not None:
+        try:
+            negative_cache.save()
+        except OSError as e:
+            logger.warning(f"빈 결과 캐시를 저장하지 못했습니다: {e}")
+
+    if summary is not None:
+        summary.update({
+            "requests": request_count, "succeeded": success_count, "failed": failure_count,
+            "retries": retry_count, "saved": saved_count, "raw_format": raw_format, "raw_files": writer.outputs(),
+            "elapsed": elapsed, "cookie_refreshes": cookie_provider.refresh_count,
+        })
     return collected_data
 
+async def iter_collect(start_date, end_date, queue_size: int = None, **kwargs):
+    """
+    run_collect_async 결과를 비동기 이터레이터로 하나씩 내어 줍니다. (kwargs는 run_collect_async와 같음)
+    소비가 늦으면 크기 제한 큐(기본 max_concurrency × 2)가 차서 수집도 함께 늦춰집니다.
+    사용: async for result in iter_collect(start, end): ...
+    끝까지 읽지 않고 멈출 때는 contextlib.aclosing(iter_collect(...))으로 감싸야 수집 작업이 바로 취소됩니다.
+    """
+    queue = asyncio.Queue(maxsize=queue_size or kwargs.get("max_concurrency", MAX_CONCURRENCY) * 2)
+    # 종료/예외는 큐가 아니라 수집 작업 자체로 전달 (가득 찬 큐에 종료 신호를 넣다 막히지 않도록)
+    task = asyncio.create_task(run_collect_async(start_date, end_date, result_queue=queue, **kwargs))
+    getter = None
+    try:
+        while True:
+            if getter is None:
+                getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                result, getter = getter.result(), None
+                yield result
+                continue
+            # 수집이 끝남: 대기 중인 get을 취소하고(꺼내지 않은 값은 큐에 남음) 남은 결과를 내어 준 뒤 종료
+            getter.cancel()
+            getter = None
+            while not queue.empty():
+                yield queue.get_nowait()
+            task.result()     # 수집 중 예외가 있었다면 여기서 다시 발생
+            return
+    finally:
+        if getter is not None:
+            getter.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
 # ---------------------------------- 실행
 if __name__ == "__main__":
     start_dt = datetime(2025, 10, 20).date()
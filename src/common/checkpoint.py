@@ -0,0 +1,117 @@
+# src/common/checkpoint.py
+import os
+import glob
+import json
+from datetime import datetime
+
+import numpy as np
+
+
+class LoadCheckpoint:
+    """
+    업로드 1회(load_id)의 진행 기록. 커밋된 행을 입력 기준 행 번호 구간 [start, end)로 보관합니다.
+    - 배치가 커밋될 때마다 저장하므로 중간에 끊겨도 커밋된 구간은 남습니다.
+    - 재개 시 committed_mask로 이미 커밋된 행을 빼고 나머지만 업로드합니다.
+    - 입력 파일이 바뀌면(크기/수정 시각) 행 번호가 어긋나므로 재개하지 않습니다.
+    """
+
+    def __init__(self, path, load_id: str, source: str = None, fingerprint: dict = None, method: str = None):
+        self.path = path
+        self.load_id = load_id
+        self.source = source
+        self.fingerprint = fingerprint or {}
+        self.method = method
+        self.status = "running"
+        self.ranges = []
+        self.created_at = datetime.now().isoformat(timespec="seconds")
+        self.updated_at = self.created_at
+
+    # ---------------------------------- 생성/불러오기
+    @classmethod
+    def create(cls, checkpoint_dir, source: str = None, fingerprint: dict = None, method: str = None):
+        load_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        cp = cls(os.path.join(checkpoint_dir, f"{load_id}.json"), load_id, source, fingerprint, method)
+        cp.save()
+        return cp
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cp = cls(path, data["load_id"], data.get("source"), data.get("fingerprint"), data.get("method"))
+        cp.status = data.get("status", "running")
+        cp.ranges = [list(r) for r in data.get("ranges", [])]
+        cp.created_at = data.get("created_at", cp.created_at)
+        cp.updated_at = data.get("updated_at", cp.updated_at)
+        return cp
+
+    @classmethod
+    def find_resumable(cls, checkpoint_dir, source: str = None, fingerprint: dict = None, load_id: str = None):
+        """
+        재개할 체크포인트를 찾습니다. load_id를 주면 그 기록을, 아니면 같은 입력의 가장 최근 미완료 기록을 반환합니다.
+        입력 파일이 기록과 다르면 None.
+        """
+        if load_id:
+            paths = [os.path.join(checkpoint_dir, f"{load_id}.json")]
+        else:
+            paths = sorted(glob.glob(os.path.join(checkpoint_dir, "*.json")), reverse=True)
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            cp = cls.load(path)
+            if cp.status == "done" and not load_id:
+                continue
+            if source is not None and cp.source != source:
+                continue
+            if fingerprint is not None and cp.fingerprint != fingerprint:
+                continue
+            return cp
+        return None
+
+    # ---------------------------------- 커밋 구간
+    @property
+    def committed_rows(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+    def committed_mask(self, n: int, offset: int = 0) -> np.ndarray:
+        """행 번호 offset ~ offset+n 중 이미 커밋된 행 마스크"""
+        mask = np.zeros(n, dtype=bool)
+        for start, end in self.ranges:
+            lo, hi = max(start, offset), min(end, offset + n)
+            if lo < hi:
+                mask[lo - offset:hi - offset] = True
+        return mask
+
+    def mark_rows(self, positions: np.ndarray):
+        """커밋된 행 번호들을 구간으로 합쳐 기록하고 저장합니다."""
+        if len(positions) == 0:
+            return
+        positions = np.sort(np.asarray(positions, dtype=np.int64))
+        breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+        starts = positions[np.r_[0, breaks]]
+        ends = positions[np.r_[breaks - 1, len(positions) - 1]] + 1
+        merged = sorted(self.ranges + [[int(s), int(e)] for s, e in zip(starts, ends)])
+        self.ranges = [merged[0]]
+        for start, end in merged[1:]:
+            if start <= self.ranges[-1][1]:
+                self.ranges[-1][1] = max(self.ranges[-1][1], end)
+            else:
+                self.ranges.append([start, end])
+        self.save()
+
+    def finish(self, status: str = "done"):
+        self.status = status
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.updated_at = datetime.now().isoformat(timespec="seconds")
+        data = {
+            "load_id": self.load_id, "source": self.source, "fingerprint": self.fingerprint,
+            "method": self.method, "status": self.status, "ranges": self.ranges,
+            "created_at": self.created_at, "updated_at": self.updated_at,
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
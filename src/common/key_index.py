@@ -0,0 +1,59 @@
+# src/common/key_index.py
+import os
+import numpy as np
+import pandas as pd
+
+
+def hash_key_frame(key_df: pd.DataFrame) -> np.ndarray:
+    """
+    정규화된 키 컬럼들을 행 단위 64비트 해시로 변환합니다. (벡터 연산, 실행 간 동일한 값)
+    모든 값은 문자열로 맞춘 뒤 해시합니다.
+    """
+    if key_df.empty:
+        return np.empty(0, dtype=np.uint64)
+    as_str = key_df.fillna("").astype(str)
+    return pd.util.hash_pandas_object(as_str, index=False).to_numpy(dtype=np.uint64)
+
+
+class KeyIndex:
+    """
+    정렬된 uint64 해시 배열로 보관하는 영속 키 인덱스. (.npy 파일)
+    - contains: searchsorted로 벡터화된 존재 여부 확인
+    - add: 새 해시만 정렬 위치에 끼워 넣어 점진적으로 갱신
+    """
+
+    def __init__(self, path):
+        self.path = path
+        if os.path.exists(path):
+            self.keys = np.load(path)
+        else:
+            self.keys = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        if len(self.keys) == 0 or len(hashes) == 0:
+            return np.zeros(len(hashes), dtype=bool)
+        pos = np.searchsorted(self.keys, hashes)
+        pos = np.minimum(pos, len(self.keys) - 1)
+        return self.keys[pos] == hashes
+
+    def add(self, hashes: np.ndarray) -> int:
+        """새 해시를 추가하고 실제로 추가된 개수를 반환합니다."""
+        new = np.unique(hashes[~self.contains(hashes)])
+        if len(new):
+            self.keys = np.insert(self.keys, np.searchsorted(self.keys, new), new)
+        return len(new)
+
+    def clear(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npy"
+        np.save(tmp_path, self.keys)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,23 @@
+# src/common/keys.py
+import numpy as np
+import pandas as pd
+
+from src.common.key_index import hash_key_frame
+from src.common.schema import ensure_schema, to_output_strings
+
+# 항공편 하나를 가리키는 키 (중복 제거/CSV 누적/Parquet 병합/업로드/변경 감지 공통)
+UNIQUE_KEYS = [
+    "agency_code", "code",
+    "depDate", "depTime", "depCity",
+    "arrDate", "arrTime", "arrCity",
+    "carCode", "opCarCode",
+    "mainFlt", "classCode", "classDesc"
+]
+
+
+def key_hashes(df: pd.DataFrame, keys: list = None, normalized: bool = False) -> np.ndarray:
+    """중복 키(기본값 UNIQUE_KEYS)를 정규화한 뒤 행 단위 64비트 해시로 변환합니다."""
+    if keys is None:
+        keys = UNIQUE_KEYS
+    dfn = df if normalized else to_output_strings(ensure_schema(df), keys)
+    return hash_key_frame(dfn[keys])
@@ -1,12 +1,46 @@
 # src/common/logging_setup.py
+import os
+import time
+import queue
+import atexit
 import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from concurrent_log_handler import ConcurrentRotatingFileHandler
 from .paths import LOG_DIR
 
-def setup_logging(name="airline", log_file="pipeline.log"):
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
+# 로깅 방식: queue(기본) = 메모리 큐에 넣고 백그라운드 스레드 하나가 파일/콘솔에 씀 (호출 측은 파일 잠금/쓰기를 기다리지 않음)
+#           sync = 기존처럼 호출한 곳에서 바로 씀
+LOG_MODE = os.getenv("LOG_MODE", "queue")
+# 요청마다 남기는 INFO 로그(요청 시작/저장 완료)의 기록 비율 (1.0 = 전부, 0.01 = 100건 중 1건, 0 = 요약만)
+REQUEST_LOG_RATE = float(os.getenv("REQUEST_LOG_RATE", "1.0"))
+REQUEST_LOG_INTERVAL = 30.0     # 건너뛴 로그를 요약해 남기는 간격(초)
+
+_HANDLERS = {}                  # log_file → 로거에 붙일 핸들러 목록 (모든 로거가 공유)
+_HANDLERS_LOCK = threading.Lock()
+
+
+class _ProcessLocalQueueHandler(QueueHandler):
+    """
+    큐를 만든 프로세스에서만 큐로 보냅니다. 포크된 자식 프로세스(파싱 워커 등)에는 큐를 비우는 스레드가 없으므로
+    파일/콘솔 핸들러에 바로 씁니다. (ConcurrentRotatingFileHandler는 프로세스 간 잠금을 지원)
+    """
 
+    def __init__(self, log_queue, targets: list):
+        super().__init__(log_queue)
+        self.targets = targets
+        self.owner_pid = os.getpid()
+
+    def emit(self, record):
+        if os.getpid() == self.owner_pid:
+            super().emit(record)
+            return
+        for handler in self.targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+def _make_targets(log_file: str) -> list:
     fmt = logging.Formatter("%(asctime)s - %(levelname)s - %(name)s - %(message)s")
 
     fh = ConcurrentRotatingFileHandler(
@@ -20,9 +54,77 @@ def setup_logging(name="airline", log_file="pipeline.log"):
     # 콘솔 로그
     ch = logging.StreamHandler()
     ch.setFormatter(fmt)
+    return [fh, ch]
+
+def _get_handlers(log_file: str) -> list:
+    with _HANDLERS_LOCK:
+        if log_file not in _HANDLERS:
+            targets = _make_targets(log_file)
+            if LOG_MODE == "sync":
+                _HANDLERS[log_file] = targets
+            else:
+                log_queue = queue.SimpleQueue()
+                listener = QueueListener(log_queue, *targets, respect_handler_level=True)
+                listener.start()
+                atexit.register(listener.stop)     # 종료 시 큐에 남은 로그를 모두 쓰고 멈춤
+                _HANDLERS[log_file] = [_ProcessLocalQueueHandler(log_queue, targets)]
+        return _HANDLERS[log_file]
+
+def setup_logging(name="airline", log_file="pipeline.log"):
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
 
     if not logger.handlers:  # 중복 방지
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+        for handler in _get_handlers(log_file):
+            logger.addHandler(handler)
+
+    return logger
+
+
+class LogSampler:
+    """
+    요청마다 반복되는 INFO 로그를 rate 비율(키별 N건 중 1건)만 남기고,
+    건너뛴 건수는 interval초마다 키별로 한 줄에 요약합니다. 메시지는 기록할 때만 포맷합니다.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: float = REQUEST_LOG_RATE,
+                 interval: float = REQUEST_LOG_INTERVAL):
+        self.logger = logger
+        self.interval = interval
+        self.rate = rate
+        self._counts = {}
+        self._skipped = {}
+        self._last_summary = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: float):
+        self._rate = max(0.0, min(1.0, float(value)))
+        self._period = round(1 / self._rate) if self._rate > 0 else 0
+
+    def info(self, key: str, msg: str, *args):
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            keep = self._period == 1 or (self._period > 1 and count % self._period == 0)
+            if not keep:
+                self._skipped[key] = self._skipped.get(key, 0) + 1
+            due = self._skipped and time.monotonic() - self._last_summary >= self.interval
+        if keep:
+            self.logger.info(msg, *args)
+        if due:
+            self.flush()
 
-    return logger
\ No newline at end of file
+    def flush(self):
+        """건너뛴 로그 요약을 남깁니다. (수집 종료 시 호출)"""
+        with self._lock:
+            skipped, self._skipped = self._skipped, {}
+            elapsed = time.monotonic() - self._last_summary
+            self._last_summary = time.monotonic()
+        if skipped:
+            detail = ", ".join(f"{key} {n}건" for key, n in skipped.items())
+            self.logger.info(f"🧾 최근 {elapsed:.0f}초 동안 생략한 요청 로그: {detail} (기록 비율 {self._rate:g})")
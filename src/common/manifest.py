@@ -0,0 +1,59 @@
+# src/common/manifest.py
+import os
+import json
+import hashlib
+from datetime import datetime
+
+
+class IngestManifest:
+    """
+    이미 전처리한 원본 파일/세그먼트 기록 (경로 → 크기, 수정 시각, 선택적으로 해시).
+    크기/수정 시각(또는 해시)이 바뀐 파일은 새 입력으로 취급합니다.
+    """
+
+    def __init__(self, path, use_hash: bool = False):
+        self.path = path
+        self.use_hash = use_hash
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("files", {})
+
+    def __len__(self):
+        return len(self.entries)
+
+    def fingerprint(self, file_path: str) -> dict:
+        stat = os.stat(file_path)
+        fp = {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+        if self.use_hash:
+            h = hashlib.blake2b(digest_size=16)
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            fp["hash"] = h.hexdigest()
+        return fp
+
+    def is_new(self, file_path: str) -> bool:
+        entry = self.entries.get(os.path.abspath(file_path))
+        if entry is None:
+            return True
+        fp = self.fingerprint(file_path)
+        if self.use_hash and "hash" in entry:
+            return entry["hash"] != fp["hash"]
+        return entry["size"] != fp["size"] or entry["mtime"] != fp["mtime"]
+
+    def filter_new(self, file_paths: list) -> list:
+        return [p for p in file_paths if self.is_new(p)]
+
+    def mark(self, file_paths: list):
+        now = datetime.now().isoformat(timespec="seconds")
+        for p in file_paths:
+            if os.path.exists(p):
+                self.entries[os.path.abspath(p)] = dict(self.fingerprint(p), ingested_at=now)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,258 @@
+# src/common/metrics.py
+import os
+import json
+import math
+import time
+import threading
+from datetime import datetime
+
+from .paths import METRICS_DIR
+from .logging_setup import setup_logging
+
+logger = setup_logging(__name__)
+
+# 요청/배치 지연 히스토그램 구간 (초)
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def bucket_quantile(buckets: tuple, counts: list, q: float) -> float:
+    """히스토그램 구간별 건수로 분위수를 추정합니다. (구간 안은 선형 보간, Prometheus histogram_quantile과 같은 방식)"""
+    total = sum(counts)
+    if total == 0:
+        return float("nan")
+    rank = q * total
+    cumulative, lower = 0, 0.0
+    for upper, count in zip(buckets + (math.inf,), counts):
+        if cumulative + count >= rank and count > 0:
+            if math.isinf(upper):
+                return lower
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+        lower = upper
+    return lower
+
+
+# ---------------------------------- 1. 지표 종류
+class _Metric:
+    kind = ""
+
+    def __init__(self, registry, name: str, help_text: str, labels: tuple = ()):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.samples = {}
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(n, "")) for n in self.labels)
+
+    def _lines(self) -> list:
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in sorted(self.samples.items())]
+
+    def _report(self) -> list:
+        return [{"labels": dict(zip(self.labels, k)), "value": v} for k, v in sorted(self.samples.items())]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, value: float = 1.0, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = self.samples.get(key, 0.0) + value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.samples[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = next((i for i, upper in enumerate(self.buckets) if value <= upper), len(self.buckets))
+        with self.registry.lock:
+            sample = self.samples.get(key)
+            if sample is None:
+                # 구간별 건수(마지막은 +Inf), 합계
+                sample = self.samples[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            sample[0][i] += 1
+            sample[1] += value
+
+    def _lines(self) -> list:
+        lines = []
+        for key, (counts, total) in sorted(self.samples.items()):
+            cumulative = 0
+            for upper, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(upper)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+    def _report(self) -> list:
+        out = []
+        for key, (counts, total) in sorted(self.samples.items()):
+            n = sum(counts)
+            out.append({
+                "labels": dict(zip(self.labels, key)), "count": n, "sum": total,
+                "mean": total / n if n else None,
+                "p50": bucket_quantile(self.buckets, counts, 0.5),
+                "p99": bucket_quantile(self.buckets, counts, 0.99),
+            })
+        return out
+
+    def merged(self, by: str) -> dict:
+        """한 라벨 기준으로 구간별 건수를 합쳐 {라벨 값: {count, p50, p99}}를 만듭니다. (예: 여행사별 지연)"""
+        pos = self.labels.index(by)
+        groups = {}
+        with self.registry.lock:
+            for key, (counts, _) in self.samples.items():
+                acc = groups.setdefault(key[pos], [0] * len(counts))
+                for i, c in enumerate(counts):
+                    acc[i] += c
+        return {value: {"count": sum(counts), "p50": bucket_quantile(self.buckets, counts, 0.5),
+                        "p99": bucket_quantile(self.buckets, counts, 0.99)}
+                for value, counts in sorted(groups.items())}
+
+
+# ---------------------------------- 2. ✨ 레지스트리 + 내보내기 (Prometheus 텍스트 파일 / JSON 실행 리포트)
+class MetricsRegistry:
+    """
+    프로세스 안의 지표 모음. (스레드 안전, 외부 의존성 없음)
+    - write_textfile: node_exporter textfile collector가 읽는 .prom 파일 (원자적 교체)
+    - write_report: 실행 1회의 JSON 리포트 (야간 실행 간 비교용)
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.started_at = time.time()
+
+    def _register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        return self._register(Counter(self, name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: tuple = ()) -> Gauge:
+        return self._register(Gauge(self, name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(self, name, help_text, labels, buckets))
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self.lock:
+            for name, metric in sorted(self.metrics.items()):
+                if not metric.samples:
+                    continue
+                lines.append(f"# HELP {name} {metric.help}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                lines.extend(metric._lines())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {name: {"type": m.kind, "help": m.help, "samples": m._report()}
+                    for name, m in sorted(self.metrics.items()) if m.samples}
+
+    def write_textfile(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def write_report(self, path, extra: dict = None):
+        report = {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "written_at": datetime.now().isoformat(timespec="seconds"),
+            "summary": run_summary(self),
+            "metrics": self.to_dict(),
+        }
+        report.update(extra or {})
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+
+METRICS = MetricsRegistry()
+
+# --- 단계별 처리량 (수집/전처리/업로드 공통) ---
+STAGE_ROWS = METRICS.counter("airline_stage_rows_total", "단계별 처리 행(응답) 수", ("stage", "step"))
+STAGE_SECONDS = METRICS.counter("airline_stage_seconds_total", "단계별 소요 시간(초)", ("stage", "step"))
+STAGE_ROWS_PER_SECOND = METRICS.gauge("airline_stage_rows_per_second", "단계별 마지막 처리 속도(행/초)",
+                                      ("stage", "step"))
+LAST_EXPORT = METRICS.gauge("airline_last_export_timestamp_seconds", "마지막 지표 내보내기 시각 (unix)", ("run",))
+
+
+def record_throughput(stage: str, step: str, rows: int, seconds: float):
+    STAGE_ROWS.inc(rows, stage=stage, step=step)
+    STAGE_SECONDS.inc(seconds, stage=stage, step=step)
+    if seconds > 0:
+        STAGE_ROWS_PER_SECOND.set(rows / seconds, stage=stage, step=step)
+
+def run_summary(registry: MetricsRegistry) -> dict:
+    """리포트 머리말: 단계별 처리 속도와 여행사/노선별 요청 지연 (느린 여행사, 회귀 확인용)"""
+    with registry.lock:
+        rows = dict(STAGE_ROWS.samples)
+        seconds = dict(STAGE_SECONDS.samples)
+    summary = {"throughput": {f"{stage}/{step}": {"rows": rows[(stage, step)], "seconds": seconds.get((stage, step), 0.0),
+                                                  "rows_per_second": rows[(stage, step)] / seconds[(stage, step)]
+                                                  if seconds.get((stage, step)) else None}
+                              for stage, step in sorted(rows)}}
+    latency = registry.metrics.get("airline_request_latency_seconds")
+    if latency is not None and latency.samples:
+        summary["request_latency_by_agent"] = latency.merged("agent")
+        summary["request_latency_by_route"] = latency.merged("route")
+    return summary
+
+def export_metrics(run: str, extra: dict = None, report_path=None):
+    """
+    METRICS_DIR/<run>.prom(덮어쓰기)과 JSON 리포트(기본 METRICS_DIR/reports/<run>_<시작 시각>.json)를 씁니다.
+    같은 프로세스에서 다시 부르면(데몬 주기마다) 같은 리포트 파일을 갱신합니다.
+    """
+    LAST_EXPORT.set(time.time(), run=run)
+    if report_path is None:
+        stamp = datetime.fromtimestamp(METRICS.started_at).strftime("%Y%m%d_%H%M%S")
+        report_path = METRICS_DIR / "reports" / f"{run}_{stamp}_{os.getpid()}.json"
+    try:
+        METRICS.write_textfile(METRICS_DIR / f"{run}.prom")
+        METRICS.write_report(report_path, extra)
+    except OSError as e:
+        logger.warning(f"지표를 저장하지 못했습니다: {e}")
+        return None
+    logger.info(f"📈 지표 저장: {METRICS_DIR / f'{run}.prom'}, {report_path}")
+    return report_path
@@ -4,5 +4,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data"
 RAW_DIR = DATA_DIR / "raw"
 PROCESSED_DIR = DATA_DIR / "processed"
+STORE_DIR = PROCESSED_DIR / "store"
+COOKIE_CACHE_PATH = DATA_DIR / "session" / "cookies.json"
+METRICS_DIR = DATA_DIR / "metrics"
 LOG_DIR = BASE_DIR / "logs"
 LOG_DIR.mkdir(exist_ok=True, parents=True)
\ No newline at end of file
@@ -0,0 +1,157 @@
+# src/common/raw_archive.py
+import os
+import json
+import glob
+import gzip
+import zlib
+from datetime import datetime
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+INDEX_SUFFIX = ".idx"
+SEGMENT_DIRNAME = "segments"
+
+
+# ---------------------------------- 1. 경로/키 규칙
+def record_key(dep: str, arr: str, dep_date: str, agent: str) -> str:
+    """(출발지, 도착지, 출발일, 여행사) 키. 기존 파일명 규칙과 동일합니다."""
+    return f"{dep}_{arr}_{dep_date}_{agent}"
+
+def segment_dir(root, acq_date: str) -> str:
+    """RAW_DIR/<수집일>/segments"""
+    return os.path.join(root, acq_date, SEGMENT_DIRNAME)
+
+def new_segment_path(root, acq_date: str, run_id: str = None) -> str:
+    if run_id is None:
+        run_id = f"{datetime.now().strftime('%H%M%S')}_{os.getpid()}"
+    return os.path.join(segment_dir(root, acq_date), f"{run_id}{SEGMENT_SUFFIX}")
+
+def index_path(segment_path: str) -> str:
+    return segment_path + INDEX_SUFFIX
+
+def record_source(segment_path: str, key: str) -> str:
+    """source_file 컬럼에 남길 세그먼트 내 레코드 위치."""
+    return f"{segment_path}#{key}"
+
+def find_segments(root) -> list:
+    """RAW_DIR/<수집일>/segments/*.ndjson.gz (재귀 탐색 없이 한 단계만 확인)"""
+    return sorted(glob.glob(os.path.join(root, "*", SEGMENT_DIRNAME, f"*{SEGMENT_SUFFIX}")))
+
+
+# ---------------------------------- 2. ✨ 세그먼트 쓰기 (append-only)
+class SegmentWriter:
+    """
+    수집 1회당 하나의 gzip NDJSON 세그먼트를 씁니다.
+    - 레코드 묶음(batch)마다 gzip 멤버 하나를 파일 끝에 덧붙입니다. (이어붙인 gzip도 유효한 gzip)
+    - 인덱스: 키 → [멤버 시작 오프셋, 멤버 내 줄 번호]
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = {}
+        self.records = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(index_path(path)):
+            self.index = load_index(path)
+
+    def append_batch(self, records: list):
+        """records: [(key, meta dict, 응답 바이트), ...]"""
+        if not records:
+            return
+        lines = []
+        for line_no, (key, meta, body) in enumerate(records):
+            # 응답 바이트는 그대로 보존 (잘못된 UTF-8도 surrogateescape로 손실 없이 왕복)
+            record = dict(meta, key=key, body=body.decode("utf-8", errors="surrogateescape"))
+            lines.append(json.dumps(record))
+            self.index[key] = [None, line_no]
+
+        member = gzip.compress(("\n".join(lines) + "\n").encode("utf-8"))
+        with open(self.path, "ab") as f:
+            offset = f.tell()
+            f.write(member)
+
+        for key, _, _ in records:
+            self.index[key][0] = offset
+        self.records += len(records)
+
+    def close(self):
+        with open(index_path(self.path), "w", encoding="utf-8") as f:
+            json.dump({"segment": os.path.basename(self.path), "records": self.index}, f)
+
+
+# ---------------------------------- 3. ✨ 세그먼트 읽기
+def _parse_record(line: str) -> dict:
+    record = json.loads(line)
+    record["body"] = record["body"].encode("utf-8", errors="surrogateescape")
+    return record
+
+def iter_segment(path: str):
+    """세그먼트의 모든 레코드를 순서대로 읽습니다. body는 받은 그대로의 바이트."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield _parse_record(line)
+
+def load_index(path: str) -> dict:
+    idx_path = index_path(path)
+    if not os.path.exists(idx_path):
+        return {}
+    with open(idx_path, "r", encoding="utf-8") as f:
+        return json.load(f).get("records", {})
+
+def read_record(path: str, key: str, index: dict = None):
+    """인덱스로 해당 gzip 멤버만 풀어 레코드 하나를 읽습니다. 없으면 None."""
+    if index is None:
+        index = load_index(path)
+    loc = index.get(key)
+    if loc is None:
+        return None
+    offset, line_no = loc
+
+    decomp = zlib.decompressobj(wbits=31)
+    chunks = []
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while not decomp.eof:
+            data = f.read(64 * 1024)
+            if not data:
+                break
+            chunks.append(decomp.decompress(data))
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    return _parse_record(lines[line_no])
+
+
+# ---------------------------------- 4. 기존 파일 트리 → 세그먼트 변환
+def pack_files(file_paths: list, root, run_id: str = "packed", remove: bool = False) -> list:
+    """
+    RAW_DIR/<수집일>/<출발일>/<키>.json 파일들을 수집일별 세그먼트로 묶습니다.
+    반환: 생성된 세그먼트 경로 목록
+    """
+    by_acq_date = {}
+    for path in file_paths:
+        parts = os.path.normpath(path).split(os.sep)
+        if len(parts) < 3:
+            continue
+        acq_date = parts[-3]
+        by_acq_date.setdefault(acq_date, []).append(path)
+
+    created = []
+    for acq_date, paths in sorted(by_acq_date.items()):
+        writer = SegmentWriter(new_segment_path(root, acq_date, run_id))
+        batch = []
+        for path in paths:
+            key = os.path.splitext(os.path.basename(path))[0]
+            dep, arr, dep_date, agent = key.split("_", 3)
+            with open(path, "rb") as f:
+                body = f.read()
+            meta = {"dep": dep, "arr": arr, "depDate": dep_date, "agent": agent, "acq_date": acq_date}
+            batch.append((key, meta, body))
+            if len(batch) >= 500:
+                writer.append_batch(batch)
+                batch = []
+        writer.append_batch(batch)
+        writer.close()
+        created.append(writer.path)
+        if remove:
+            for path in paths:
+                os.remove(path)
+    return created
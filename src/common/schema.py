@@ -0,0 +1,123 @@
+# src/common/schema.py
+from datetime import time
+
+import numpy as np
+import pandas as pd
+
+from requirements.fields import FIELD_DTYPES, UPPER_FIELDS
+
+# preprocess 최종 컬럼 = upload 대상 컬럼 (FIELD_DTYPES 정의 순서)
+FINAL_COLUMNS = list(FIELD_DTYPES.keys())
+
+DATE_COLUMNS = [c for c, t in FIELD_DTYPES.items() if t == "date"]
+TIME_COLUMNS = [c for c, t in FIELD_DTYPES.items() if t == "minutes"]
+INT_COLUMNS = [c for c, t in FIELD_DTYPES.items() if t in ("int16", "int32")]
+CATEGORY_COLUMNS = [c for c, t in FIELD_DTYPES.items() if t == "category"]
+STR_COLUMNS = [c for c, t in FIELD_DTYPES.items() if t == "str"]
+
+
+# ---------------------------------- 1. 개별 변환
+def clean_strings(s: pd.Series) -> pd.Series:
+    """strip, NaN류 → "" """
+    s = s.astype(object).where(s.notna(), "").astype(str).str.strip()
+    return s.replace({"nan": "", "None": "", "NaT": "", "<NA>": ""})
+
+def parse_minutes(s: pd.Series) -> pd.Series:
+    """
+    시간 값을 자정부터 지난 분(Int16)으로 한 번에 변환합니다.
+    허용: 분(스키마의 Int16), "HH:MM:SS", "HH:MM", "HHMM"/"HMM" (잘못된 값은 <NA>)
+    그 밖의 정수/실수 컬럼은 분이 아니라 숫자로 온 HHMM(예: 730 → 07:30)으로 봅니다.
+    """
+    if isinstance(s.dtype, pd.Int16Dtype):
+        return s
+    digits = s.astype(str).str.strip().str.replace(r"\.0$", "", regex=True).str.replace(":", "", regex=False)
+    digits = digits.where(digits.str.len() != 6, digits.str[:4]).str.zfill(4)
+    valid = digits.str.fullmatch(r"\d{4}")
+    hh = pd.to_numeric(digits.str[:2].where(valid), errors="coerce")
+    mm = pd.to_numeric(digits.str[2:].where(valid), errors="coerce")
+    minutes = (hh * 60 + mm).where((hh < 24) & (mm < 60))
+    return minutes.astype("Int16")
+
+def minutes_to_hms(s: pd.Series) -> pd.Series:
+    """Int16 분 → "HH:MM:SS" 문자열 (결측은 NaN)"""
+    m = s.astype("Int16")
+    out = (m // 60).astype(str).str.zfill(2) + ":" + (m % 60).astype(str).str.zfill(2) + ":00"
+    return out.where(m.notna(), np.nan).astype(object)
+
+def minutes_to_time(s: pd.Series) -> pd.Series:
+    """Int16 분 → datetime.time (DB 전달용, 결측은 None). 최대 1440개의 고유값만 변환합니다."""
+    m = s.astype("Int16")
+    lookup = {int(v): time(int(v) // 60, int(v) % 60) for v in m.dropna().unique()}
+    return m.astype(object).map(lambda v: None if v is pd.NA else lookup[int(v)])
+
+def parse_dates(s: pd.Series) -> pd.Series:
+    if pd.api.types.is_datetime64_any_dtype(s.dtype):
+        return s.astype("datetime64[ns]")
+    return pd.to_datetime(s, errors="coerce")
+
+
+# ---------------------------------- 2. ✨ 스키마 적용
+def is_typed(df: pd.DataFrame) -> bool:
+    """이미 스키마 타입으로 변환된 프레임인지 (대표 컬럼으로 확인)"""
+    return (
+        all(c in df.columns for c in FINAL_COLUMNS)
+        and all(isinstance(df[c].dtype, pd.Int16Dtype) for c in TIME_COLUMNS)
+        and all(pd.api.types.is_datetime64_any_dtype(df[c].dtype) for c in DATE_COLUMNS)
+        and all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in CATEGORY_COLUMNS)
+    )
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    어떤 표현(API 원본 문자열, CSV 문자열, 파이썬 객체, 이미 변환된 타입)이든 FIELD_DTYPES 타입으로 맞춥니다.
+    이미 맞는 타입의 컬럼은 다시 파싱하지 않습니다. 누락 컬럼은 결측으로 추가합니다.
+    """
+    out = {}
+    n = len(df)
+    for col, kind in FIELD_DTYPES.items():
+        s = df[col] if col in df.columns else pd.Series([pd.NA] * n, index=df.index, dtype=object)
+        if kind == "date":
+            s = parse_dates(s)
+        elif kind == "minutes":
+            s = parse_minutes(s) if not isinstance(s.dtype, pd.Int16Dtype) else s
+        elif kind in ("int16", "int32"):
+            if s.dtype != kind:
+                s = pd.to_numeric(s, errors="coerce").fillna(0).astype(kind)
+        elif kind == "category":
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                s = s.cat.remove_unused_categories()
+            else:
+                s = clean_strings(s)
+                if col in UPPER_FIELDS:
+                    s = s.str.upper()
+                s = s.astype("category")
+        else:
+            s = clean_strings(s)
+            if col in UPPER_FIELDS:
+                s = s.str.upper()
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
+
+def ensure_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """타입이 이미 맞으면 그대로, 아니면 한 번 변환합니다."""
+    return df if is_typed(df) else apply_schema(df)
+
+
+# ---------------------------------- 3. 외부 표현 (CSV/키 해시)
+def to_output_strings(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
+    """
+    타입 프레임 → CSV/중복 키에 쓰는 문자열 표현
+    (날짜 YYYY-MM-DD, 시간 HH:MM:SS, 문자열/코드는 그대로, 정수는 정수)
+    """
+    columns = columns or FINAL_COLUMNS
+    out = {}
+    for col in columns:
+        s = df[col]
+        kind = FIELD_DTYPES.get(col)
+        if kind == "date":
+            s = s.dt.strftime("%Y-%m-%d")
+        elif kind == "minutes":
+            s = minutes_to_hms(s)
+        elif kind == "category":
+            s = s.astype(str)
+        out[col] = s
+    return pd.DataFrame(out, index=df.index)
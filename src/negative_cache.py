@@ -0,0 +1,137 @@
+# negative_cache.py
+import os
+import json
+import time
+from datetime import date
+
+from src.common.logging_setup import setup_logging
+from src.common.paths import PROCESSED_DIR
+
+logger = setup_logging(__name__)
+
+# ---------------------------------- 1. 설정
+NEGATIVE_CACHE_PATH = PROCESSED_DIR / "negative_cache.json"
+NEGATIVE_TTL = 24 * 3600            # 처음 빈 결과가 나온 뒤 다시 확인할 때까지 (초)
+NEGATIVE_TTL_MAX = 7 * 24 * 3600    # 연속으로 비어 있을수록 간격을 2배씩 늘리되 이 값까지만
+NEGATIVE_NEAR_DAYS = 3              # 출발이 이만큼 가까운 조합은 캐시를 쓰지 않고 항상 조회 (막판 좌석 공개)
+NO_SERVICE_CODES = frozenset()      # 편수 0과 같이 취급할 "운항/판매 없음" errorCode (확인된 코드만 추가)
+
+
+def cache_key(params: dict) -> str:
+    return f"{params['pDep']}-{params['pArr']}-{params['pDepDate']}-{params['comp']}"
+
+def header_status(header):
+    """
+    응답 헤더로 항공편 유무를 판단합니다.
+    - True: 항공편 없음 확인 (errorCode "0"이고 편수 0, 또는 NO_SERVICE_CODES)
+    - False: 항공편 있음 (errorCode "0"이고 편수 > 0)
+    - None: 판단하지 않음 (헤더 없음, 그 밖의 오류 코드, 편수 형식 오류) → 일시적 오류를 빈 결과로 기억하지 않도록
+    """
+    if not isinstance(header, dict) or not header:
+        return None
+    error_code = str(header.get("errorCode", "")).strip()
+    if error_code in NO_SERVICE_CODES:
+        return True
+    if error_code != "0":
+        return None
+    try:
+        cnt = int(header["cnt"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return cnt == 0
+
+
+# ---------------------------------- 2. ✨ 빈 결과 캐시
+class NegativeCache:
+    """
+    최근 빈 결과(errorCode "0"이고 편수 0)가 확인된 (출발지, 도착지, 출발일, 여행사) 조합을 기억해 계획에서 건너뜁니다.
+    - 조합별로 마지막 확인 시각과 연속으로 비어 있던 횟수(streak)를 보관합니다.
+    - TTL(NEGATIVE_TTL × 2^(streak-1), 최대 NEGATIVE_TTL_MAX)이 지나면 다시 조회해 확인합니다. (재검증)
+    - 다시 조회했을 때 항공편이 있으면 바로 지우고, 여전히 비어 있으면 streak를 늘려 더 드물게 확인합니다.
+    - 출발이 NEGATIVE_NEAR_DAYS일 이내인 조합은 건너뛰지 않습니다.
+    상태는 JSON({키: [마지막 확인 시각, streak]})으로 저장합니다.
+    """
+
+    def __init__(self, path=NEGATIVE_CACHE_PATH, ttl: float = NEGATIVE_TTL, ttl_max: float = NEGATIVE_TTL_MAX,
+                 near_days: int = NEGATIVE_NEAR_DAYS):
+        self.path = path
+        self.ttl = ttl
+        self.ttl_max = ttl_max
+        self.near_days = near_days
+        self.entries = {}
+        self.skipped = 0
+        self.added = 0
+        self.cleared = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"빈 결과 캐시를 읽지 못해 비운 상태로 시작합니다: {self.path} ({e})")
+            return
+        logger.info(f"빈 결과 캐시 불러옴: {len(self.entries)}개 조합")
+
+    def save(self):
+        # 출발일이 지난 조합은 정리
+        today_str = date.today().strftime("%Y%m%d")
+        self.entries = {k: v for k, v in self.entries.items() if k.rsplit("-", 2)[1] >= today_str}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def expires_in(self, streak: int) -> float:
+        return min(self.ttl_max, self.ttl * 2 ** max(0, streak - 1))
+
+    # --- 계획 단계 ---
+    def should_skip(self, params: dict, now: float = None, today: date = None) -> bool:
+        """최근에 빈 결과였고 TTL이 지나지 않은 조합이면 True"""
+        entry = self.entries.get(cache_key(params))
+        if entry is None:
+            return False
+        today = today or date.today()
+        dep_date = params["pDepDate"]
+        days_ahead = (date(int(dep_date[:4]), int(dep_date[4:6]), int(dep_date[6:])) - today).days
+        if days_ahead <= self.near_days:
+            return False
+        now = time.time() if now is None else now
+        checked_at, streak = entry
+        return now - checked_at < self.expires_in(streak)
+
+    def filter(self, plan, now: float = None, count: bool = True):
+        """요청 목록/제너레이터에서 건너뛸 조합을 빼고 하나씩 내어 줍니다. (count=True면 건너뛴 건수를 skipped에 누적)"""
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        for params in plan:
+            if not self.should_skip(params, now, today):
+                yield params
+            elif count:
+                self.skipped += 1
+
+    # --- 수집 결과 반영 ---
+    def observe(self, params: dict, header: dict, now: float = None):
+        """응답 헤더를 반영합니다. 빈 결과가 확인된 경우만 기록하고, 판단할 수 없는 응답은 무시합니다."""
+        status = header_status(header)
+        if status is None:
+            return
+        key = cache_key(params)
+        if status:
+            _, streak = self.entries.get(key, (0.0, 0))
+            self.entries[key] = [time.time() if now is None else now, streak + 1]
+            self.added += streak == 0
+        elif self.entries.pop(key, None) is not None:
+            self.cleared += 1
+
+    def log_summary(self):
+        """이번 실행의 건너뜀/추가/해제 건수를 남기고 0으로 되돌립니다. (데몬은 주기마다 호출)"""
+        logger.info(f"  - 🚫 빈 결과 캐시: 건너뜀 {self.skipped}건, 새로 비어 있음 {self.added}건, "
+                    f"다시 항공편 확인 {self.cleared}건 (보관 {len(self.entries)}개)")
+        self.skipped = self.added = self.cleared = 0
@@ -0,0 +1,139 @@
+# planner.py
+import zlib
+
+from requirements.config import (
+    DEPARTURES, ARRIVALS, AGENT_CODES, PASSENGERS, CABIN_CLASS,
+    ROUTE_MAP, ROUTE_AGENTS, ROUTE_DATE_WINDOWS
+)
+from src.common.logging_setup import setup_logging
+
+logger = setup_logging(__name__)
+
+
+# --- 1. 도우미 함수들 정의 ---
+def make_payload(dep: str, arr: str, date: str, agent: str, base_output_dir) -> dict:
+    """getData.do 요청 한 건의 payload를 만듭니다."""
+    return {
+        "pDep": dep, "pArr": arr, "pDepDate": date,
+        "pAdt": str(PASSENGERS["adult"]), "pChd": str(PASSENGERS["child"]),
+        "pInf": str(PASSENGERS["infant"]), "pSeat": CABIN_CLASS, "comp": agent,
+        "carCode": "ALL", "base_output_dir": base_output_dir, "pArrDate": ""
+    }
+
+def get_routes(route_map: dict = None) -> list:
+    """노선 카탈로그(출발지: [도착지...])를 (출발지, 도착지) 목록으로 펼칩니다."""
+    if route_map is None:
+        route_map = ROUTE_MAP
+
+    routes = []
+    for dep, arrs in route_map.items():
+        for arr in arrs:
+            if dep == arr:
+                logger.warning(f"출발지와 도착지가 같은 노선은 제외합니다: {dep}→{arr}")
+                continue
+            if dep not in DEPARTURES or arr not in ARRIVALS:
+                logger.warning(f"AIRPORTS에 없는 공항이 포함된 노선입니다: {dep}→{arr}")
+            routes.append((dep, arr))
+    return routes
+
+def _dates_in_window(dep_dates: list, window) -> list:
+    """노선별 날짜 범위(시작, 끝)에 들어가는 날짜만 남깁니다. (YYYYMMDD 문자열 비교)"""
+    if not window:
+        return dep_dates
+    start, end = window
+    return [d for d in dep_dates if (start is None or d >= start) and (end is None or d <= end)]
+
+
+# --- 2. 메인 함수 ---
+def _route_plan(dep_dates: list, route_map: dict = None, route_agents: dict = None, route_date_windows: dict = None):
+    """노선별 (출발지, 도착지, 날짜 목록, 여행사 목록)을 만듭니다."""
+    if route_agents is None:
+        route_agents = ROUTE_AGENTS
+    if route_date_windows is None:
+        route_date_windows = ROUTE_DATE_WINDOWS
+    return [
+        (dep, arr, _dates_in_window(dep_dates, route_date_windows.get((dep, arr))),
+         route_agents.get((dep, arr), AGENT_CODES))
+        for dep, arr in get_routes(route_map)
+    ]
+
+def iter_request_plan(dep_dates: list, base_output_dir, route_map: dict = None,
+                      route_agents: dict = None, route_date_windows: dict = None):
+    """
+    build_request_plan과 같은 순서로 payload를 하나씩 만들어 냅니다. (긴 날짜 범위도 목록을 메모리에 만들지 않음)
+    반환: (payload 제너레이터, 요약 dict)
+    """
+    routes = _route_plan(dep_dates, route_map, route_agents, route_date_windows)
+
+    def _generate():
+        for dep, arr, dates, agents in routes:
+            for date in dates:
+                for agent in agents:
+                    yield make_payload(dep, arr, date, agent, base_output_dir)
+
+    # 전체 DEPARTURES × ARRIVALS 조합 대비 절감량
+    planned = sum(len(dates) * len(agents) for _, _, dates, agents in routes)
+    full_pairs = sum(1 for dep in DEPARTURES for arr in ARRIVALS if dep != arr)
+    full_count = full_pairs * len(dep_dates) * len(AGENT_CODES)
+    summary = {
+        "routes": len(routes),
+        "full_pairs": full_pairs,
+        "full_requests": full_count,
+        "planned_requests": planned,
+        "saved_requests": full_count - planned,
+    }
+    return _generate(), summary
+
+def build_request_plan(dep_dates: list, base_output_dir, route_map: dict = None,
+                       route_agents: dict = None, route_date_windows: dict = None):
+    """
+    노선 카탈로그 기반으로 요청 목록을 만듭니다.
+    - route_map: 운항 노선 (기본값 ROUTE_MAP)
+    - route_agents: 노선별 여행사 커버리지 (미지정 시 AGENT_CODES 전체)
+    - route_date_windows: 노선별 조회 날짜 범위 (미지정 시 전체 날짜)
+
+    반환: (payload 목록, 요약 dict)
+    """
+    plan, summary = iter_request_plan(dep_dates, base_output_dir, route_map, route_agents, route_date_windows)
+    return list(plan), summary
+
+def _full_route_map() -> dict:
+    return {dep: [arr for arr in ARRIVALS if arr != dep] for dep in DEPARTURES}
+
+def iter_full_plan(dep_dates: list, base_output_dir):
+    """build_full_plan의 제너레이터 버전. 반환: (payload 제너레이터, 요약 dict)"""
+    return iter_request_plan(dep_dates, base_output_dir, route_map=_full_route_map(),
+                             route_agents={}, route_date_windows={})
+
+def build_full_plan(dep_dates: list, base_output_dir):
+    """노선 맵을 무시하고 DEPARTURES × ARRIVALS 전체 조합으로 요청 목록을 만듭니다."""
+    return build_request_plan(dep_dates, base_output_dir, route_map=_full_route_map(),
+                              route_agents={}, route_date_windows={})
+
+def in_shard(params: dict, shard_index: int, shard_count: int) -> bool:
+    """(출발지, 도착지, 출발일, 여행사)의 crc32로 요청이 shard_index번째 조각에 속하는지 판단합니다."""
+    key = f"{params['pDep']}|{params['pArr']}|{params['pDepDate']}|{params['comp']}".encode()
+    return zlib.crc32(key) % shard_count == shard_index
+
+def iter_shard(plan, shard_index: int, shard_count: int):
+    """요청 목록/제너레이터에서 shard_index번째 조각만 하나씩 꺼냅니다."""
+    if not 0 <= shard_index < shard_count:
+        raise ValueError(f"잘못된 샤드 번호입니다: {shard_index} (샤드 수 {shard_count})")
+    return (p for p in plan if shard_count == 1 or in_shard(p, shard_index, shard_count))
+
+def shard_plan(plan: list, shard_index: int, shard_count: int) -> list:
+    """
+    요청 목록에서 shard_index번째 조각만 남깁니다. (0 <= shard_index < shard_count)
+    (출발지, 도착지, 출발일, 여행사)의 crc32로 나누므로 프로세스/머신이 달라도 같은 요청은 항상 같은 조각에 속하고,
+    조각들을 합치면 원래 계획과 같습니다.
+    """
+    return list(iter_shard(plan, shard_index, shard_count))
+
+def log_plan_summary(summary: dict):
+    saved = summary["saved_requests"]
+    full = summary["full_requests"]
+    ratio = (saved / full * 100) if full else 0.0
+    logger.info(
+        f"요청 계획: 노선 {summary['routes']}개 / 전체 조합 {summary['full_pairs']}개 | "
+        f"요청 {summary['planned_requests']}건 (전체 {full}건 대비 {saved}건, {ratio:.1f}% 절감)"
+    )
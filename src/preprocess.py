@@ -2,72 +2,242 @@
 import os
 import json
 import glob
+import time
+import click
+import numpy as np
 import pandas as pd
 from datetime import datetime, date
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson  # 선택 의존성: 설치되어 있으면 더 빠른 JSON 디코더 사용
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 from src.common.logging_setup import setup_logging
+from src.common.metrics import record_throughput, export_metrics
 from src.common.paths import RAW_DIR, PROCESSED_DIR
+from src.common.raw_archive import SEGMENT_DIRNAME, SEGMENT_SUFFIX, iter_segment, record_source, pack_files
+from src.common.manifest import IngestManifest
+from src.common.key_index import KeyIndex
+from src.common.keys import UNIQUE_KEYS, key_hashes
+from src.common.schema import apply_schema, ensure_schema, parse_minutes, to_output_strings
+from requirements.fields import FIELD_DTYPES
+from src.processed_store import write_partitions
 
 logger = setup_logging(__name__)
 
+INGEST_WORKERS = os.cpu_count() or 1    # 파일/세그먼트 파싱 프로세스 수
+INGEST_CHUNK_SIZE = 200                 # 작업 하나가 처리할 JSON 파일 수
+PROCESSED_STORES = ("csv", "parquet")   # csv: 누적 CSV(기본, upload CLI 기본 입력), parquet: 출발일 파티션 저장소(STORE_DIR)
+_STALE_CSV_WARNED = False
+# 정제 엔진: pandas(기본) | arrow(pyarrow.compute, 행 묶음을 스레드로 나눠 처리, 결과는 pandas와 동일)
+TRANSFORM_ENGINES = ("pandas", "arrow")
+TRANSFORM_ENGINE = os.getenv("TRANSFORM_ENGINE", "pandas")
+
+# 정제 규칙 (두 엔진 공통)
+DESC_MAP = {
+    "부산/김해": "부산", "부산(김해)": "부산", "서울/김포": "김포", "서울(김포)": "김포",
+    "진주/사천": "사천", "진주(사천)": "사천", "진주": "사천", "HIN": "사천",
+    "포항경주": "포항", "포항/경주": "포항", "KPO": "포항",
+    "여수/순천": "여수", "RSU": "여수", "GMP": "김포", "PUS": "부산", "CJU": "제주",
+    "KWJ": "광주", "CJJ": "청주", "TAE": "대구", "USN": "울산", "KUV": "군산",
+    "WJU": "원주", "YNY": "양양"
+}
+CAR_DESC_ALIASES = {"아시아나항공": "아시아나"}
+AIRLINE_MAP = {
+    "OZ": "아시아나", "KE": "대한항공", "BX": "에어부산", "LJ": "진에어",
+    "TW": "티웨이항공", "7C": "제주항공", "ZE": "이스타항공", "RS": "에어서울", "WE": "파라타항공"
+}
+WE_CODE, WE_DESC = "WE", "파라타항공"
+OP_CAR_CODE_MAP = {"OZ": "BX", "KE": "LJ"}      # 표시 항공사 이름이 다를 때 운항 항공사 코드
+OP_CAR_DESC_MAP = {"BX": "에어부산", "LJ": "진에어"}
+CAR_STR_COLUMNS = ["carDesc", "opCarDesc", "opCarCode"]
+NUMERIC_COLUMNS = ["seat", "fare", "fareOrigin", "airTax", "fuelChg", "tasf"]
+
 
 # --- 1. 도우미 함수들 정의 ---
+class _ColumnBuilder:
+    """
+    항공편 레코드를 응답마다 DataFrame을 만들지 않고 컬럼 배열로 바로 펼칩니다.
+    메타데이터(source_file, agency_code, scraped_date)는 응답당 한 번만 기록하고
+    마지막에 행 수만큼 반복해 붙입니다. (프로세스 간 전달 가능한 단순 객체)
+    """
+
+    def __init__(self):
+        self.columns = {}
+        self.n = 0
+        self.sources, self.agencies, self.scraped_dates, self.counts = [], [], [], []
+
+    def add(self, flights: list, source_file: str, agency_code: str, scraped_date):
+        if not flights:
+            return
+        for flight in flights:
+            i = self.n
+            for key, value in flight.items():
+                col = self.columns.get(key)
+                if col is None:
+                    col = self.columns[key] = []
+                if len(col) < i:
+                    col.extend([None] * (i - len(col)))
+                col.append(value)
+            self.n += 1
+        self.sources.append(source_file)
+        self.agencies.append(agency_code)
+        self.scraped_dates.append(scraped_date)
+        self.counts.append(len(flights))
+
+    def _pad(self):
+        for col in self.columns.values():
+            if len(col) < self.n:
+                col.extend([None] * (self.n - len(col)))
+
+    def merge(self, other: "_ColumnBuilder"):
+        self._pad()
+        other._pad()
+        for key in other.columns.keys() - self.columns.keys():
+            self.columns[key] = [None] * self.n
+        for key, col in self.columns.items():
+            col.extend(other.columns.get(key) or [None] * other.n)
+        self.n += other.n
+        self.sources += other.sources
+        self.agencies += other.agencies
+        self.scraped_dates += other.scraped_dates
+        self.counts += other.counts
+
+    def to_frame(self) -> pd.DataFrame:
+        if self.n == 0:
+            return pd.DataFrame()
+        self._pad()
+        df = pd.DataFrame(self.columns)
+        counts = np.asarray(self.counts)
+        df["source_file"] = np.repeat(np.asarray(self.sources, dtype=object), counts)
+        df["agency_code"] = np.repeat(np.asarray(self.agencies, dtype=object), counts)
+        df["scraped_date"] = np.repeat(np.asarray(self.scraped_dates, dtype=object), counts)
+        return df
+
+
+def _file_metadata(file_path: str):
+    """RAW_DIR/<수집일>/<출발일>/<출발>_<도착>_<날짜>_<여행사>.json → (여행사, 수집일)"""
+    agency_code = os.path.splitext(os.path.basename(file_path))[0].split("_")[-1]
+    parts = file_path.split(os.sep)
+    try:
+        scraped_date = parts[parts.index("raw") + 1]
+    except (ValueError, IndexError):
+        scraped_date = None
+    return agency_code, scraped_date
+
 def _create_dataframe_from_list(data_list: list) -> pd.DataFrame:
-    """메모리에 있는 데이터 리스트를 하나의 데이터프레임으로 만듭니다."""
-    df_list = []
+    """
+    메모리에 있는 수집 결과 리스트를 한 번에 훑어 컬럼 배열로 모은 뒤 데이터프레임을 한 번만 만듭니다.
+    메타데이터는 수집 단계에서 넘겨준 값을 쓰고, 없으면 filepath에서 추출합니다.
+    """
+    builder = _ColumnBuilder()
     for item in data_list:
+        flights = item["raw_data"].get("data", {}).get("data", [])
+        if not flights:
+            continue
         filepath = item["filepath"]
-        raw_data = item["raw_data"]
-
-        flights = raw_data.get("data", {}).get("data", [])
-        if flights:
-            temp = pd.DataFrame(flights)
-            # 파일 경로(filepath)에서 필요한 메타데이터 추출
-            parts = filepath.split(os.sep)
-            temp["source_file"] = filepath
-            temp["agency_code"] = os.path.splitext(os.path.basename(filepath))[0].split("_")[-1]
-            try:
-                temp["scraped_date"] = parts[parts.index("raw") + 1]
-            except (ValueError, IndexError):
-                temp["scraped_date"] = None
-            df_list.append(temp)
-
-    if not df_list:
-        return pd.DataFrame()
-    return pd.concat(df_list, ignore_index=True)
-
-def _load_data_from_files(file_paths: list) -> pd.DataFrame:
-    df_list = []
+        if "agency_code" in item:
+            builder.add(flights, filepath, item["agency_code"], item.get("scraped_date"))
+        else:
+            builder.add(flights, filepath, *_file_metadata(filepath))
+    return builder.to_frame()
+
+def _parse_file_chunk(file_paths: list):
+    """(작업 프로세스) JSON 파일 묶음을 읽어 컬럼 배열로 펼칩니다. 반환: (_ColumnBuilder, 실패 목록)"""
+    builder = _ColumnBuilder()
+    failed = []
     for file_path in file_paths:
-        with open(file_path, "r", encoding="utf-8") as f:
+        try:
+            with open(file_path, "rb") as f:
+                raw = _json_loads(f.read())
+        except ValueError as e:
+            failed.append(f"{file_path} ({e})")
+            continue
+        flights = raw.get("data", {}).get("data", [])
+        builder.add(flights, file_path, *_file_metadata(file_path))
+    return builder, failed
+
+def _parse_segment(segment_path: str):
+    """(작업 프로세스) 세그먼트 하나를 읽어 컬럼 배열로 펼칩니다. 반환: (_ColumnBuilder, 실패 목록)"""
+    builder = _ColumnBuilder()
+    failed = []
+    try:
+        for record in iter_segment(segment_path):
             try:
-                raw = json.load(f)
-                flights = raw.get("data", {}).get("data", [])
-                if flights:
-                    temp = pd.DataFrame(flights)
-                    parts = file_path.split(os.sep)
-                    temp["source_file"] = file_path
-                    temp["agency_code"] = os.path.splitext(os.path.basename(file_path))[0].split("_")[-1]
-                    temp["scraped_date"] = parts[parts.index("raw") + 1]
-                    df_list.append(temp)
-            except json.JSONDecodeError as e:
-                logger.warning(f"JSON 파싱 실패: {file_path} ({e})")
-
-    if not df_list:
+                raw = _json_loads(record["body"])
+            except ValueError as e:
+                failed.append(f"{segment_path}#{record.get('key')} ({e})")
+                continue
+            flights = raw.get("data", {}).get("data", [])
+            builder.add(flights, record_source(segment_path, record["key"]), record["agent"], record["acq_date"])
+    except (OSError, EOFError) as e:
+        # 수집 도중 중단된 세그먼트는 읽을 수 있는 데까지만 사용
+        failed.append(f"{segment_path} (읽기 중단: {e})")
+    return builder, failed
+
+def _run_ingest(func, tasks: list, workers: int = None) -> pd.DataFrame:
+    """작업 목록을 프로세스 풀에서 병렬로 파싱해 하나의 데이터프레임으로 합칩니다."""
+    if workers is None:
+        workers = INGEST_WORKERS
+    workers = max(1, min(workers, len(tasks)))
+
+    merged = _ColumnBuilder()
+    if workers == 1:
+        results = map(func, tasks)
+        for builder, failed in results:
+            merged.merge(builder)
+            for msg in failed:
+                logger.warning(f"JSON 파싱 실패: {msg}")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for builder, failed in pool.map(func, tasks):
+                merged.merge(builder)
+                for msg in failed:
+                    logger.warning(f"JSON 파싱 실패: {msg}")
+    return merged.to_frame()
+
+def _load_data_from_files(file_paths: list, workers: int = None) -> pd.DataFrame:
+    """JSON 파일들을 INGEST_CHUNK_SIZE개씩 묶어 병렬로 파싱합니다."""
+    chunks = [file_paths[i:i + INGEST_CHUNK_SIZE] for i in range(0, len(file_paths), INGEST_CHUNK_SIZE)]
+    df = _run_ingest(_parse_file_chunk, chunks, workers)
+    if df.empty:
         logger.warning("로드된 데이터가 없습니다.")
-        return pd.DataFrame()
-
-    return pd.concat(df_list, ignore_index=True)
-
-def _clean_and_transform_data(df: pd.DataFrame) -> pd.DataFrame:
-    desc_map = {
-        "부산/김해": "부산", "부산(김해)": "부산", "서울/김포": "김포", "서울(김포)": "김포",
-        "진주/사천": "사천", "진주(사천)": "사천", "진주": "사천", "HIN": "사천",
-        "포항경주": "포항", "포항/경주": "포항", "KPO": "포항",
-        "여수/순천": "여수", "RSU": "여수", "GMP": "김포", "PUS": "부산", "CJU": "제주",
-        "KWJ": "광주", "CJJ": "청주", "TAE": "대구", "USN": "울산", "KUV": "군산",
-        "WJU": "원주", "YNY": "양양"
-    }
+    return df
+
+def _load_data_from_segments(segment_paths: list, workers: int = None) -> pd.DataFrame:
+    """gzip NDJSON 세그먼트(RAW_DIR/<수집일>/segments/*.ndjson.gz)를 세그먼트 단위로 병렬 파싱합니다."""
+    df = _run_ingest(_parse_segment, segment_paths, workers)
+    if df.empty:
+        logger.warning("세그먼트에서 로드된 데이터가 없습니다.")
+    return df
+
+def pack_legacy_raw_files(remove: bool = False) -> list:
+    """기존 요청당 JSON 파일 트리를 수집일별 세그먼트로 묶습니다. remove=True면 원본 파일 삭제."""
+    json_files = glob.glob(os.path.join(RAW_DIR, "**", "*.json"), recursive=True)
+    if not json_files:
+        logger.info("세그먼트로 묶을 JSON 파일이 없습니다.")
+        return []
+    created = pack_files(json_files, RAW_DIR, remove=remove)
+    logger.info(f"📦 JSON 파일 {len(json_files)}개를 세그먼트 {len(created)}개로 묶었습니다.")
+    return created
+
+def _clean_and_transform_data(df: pd.DataFrame, engine: str = None) -> pd.DataFrame:
+    """engine(기본 TRANSFORM_ENGINE)으로 정제합니다. arrow를 쓸 수 없으면 pandas로 처리합니다."""
+    engine = engine or TRANSFORM_ENGINE
+    if engine == "arrow":
+        from src.transform_arrow import clean_and_transform_arrow, ARROW_AVAILABLE
+        if ARROW_AVAILABLE:
+            return clean_and_transform_arrow(df)
+        logger.warning("pyarrow가 설치되어 있지 않아 pandas 엔진으로 정제합니다.")
+    elif engine != "pandas":
+        raise ValueError(f"알 수 없는 정제 엔진입니다: {engine} (가능: {', '.join(TRANSFORM_ENGINES)})")
+    return _clean_and_transform_pandas(df)
+
+def _clean_and_transform_pandas(df: pd.DataFrame) -> pd.DataFrame:
+    desc_map = DESC_MAP
     df["depDesc"] = df["depDesc"].replace(desc_map)
     df["arrDesc"] = df["arrDesc"].replace(desc_map)
     depDesc_empty = df["depDesc"].str.strip() == ""
@@ -83,203 +253,342 @@ def _clean_and_transform_data(df: pd.DataFrame) -> pd.DataFrame:
     df["depDay"] = df["depDate"].dt.day_name().str[:3].str.upper()
     df["arrDay"] = df["arrDate"].dt.day_name().str[:3].str.upper()
 
+    # 시간은 자정부터 지난 분(Int16)으로 한 번만 변환 (이후 단계는 그대로 사용)
     for col in ["depTime", "arrTime"]:
-        time_str = df[col].astype(str).str.zfill(4)
-        df[col] = pd.to_datetime(time_str, format="%H%M", errors="coerce").dt.time
+        df[col] = parse_minutes(df[col])
 
-    df["carDesc"] = df["carDesc"].replace({"아시아나항공": "아시아나"})
-    airline_map = {
-        "OZ": "아시아나", "KE": "대한항공", "BX": "에어부산", "LJ": "진에어",
-        "TW": "티웨이항공", "7C": "제주항공", "ZE": "이스타항공", "RS": "에어서울", "WE": "파라타항공"
-    }
-    df["carDesc_official"] = df["carCode"].map(airline_map)
+    df["carDesc"] = df["carDesc"].replace(CAR_DESC_ALIASES)
+    df["carDesc_official"] = df["carCode"].map(AIRLINE_MAP)
 
-    for col in ["carDesc", "opCarDesc", "opCarCode"]:
+    for col in CAR_STR_COLUMNS:
         if col in df.columns:
             df[col] = df[col].astype(object)
             df[col] = df[col].where(df[col].notna(), "")
             df[col] = df[col].astype(str).str.strip()
             df[col] = df[col].replace({"nan": "", "None": "", "NaT": ""})
 
-    mask_we = (df["carCode"] == "WE")
+    mask_we = (df["carCode"] == WE_CODE)
 
-    mask_we_fix_from_op = mask_we & (df["carDesc"] == "") & (df["opCarDesc"] == "파라타항공")
-    df.loc[mask_we_fix_from_op, "carDesc"] = "파라타항공"
+    mask_we_fix_from_op = mask_we & (df["carDesc"] == "") & (df["opCarDesc"] == WE_DESC)
+    df.loc[mask_we_fix_from_op, "carDesc"] = WE_DESC
 
     mask_we_car_empty = mask_we & (df["carDesc"] == "")
     df.loc[mask_we_car_empty, "carDesc"] = df.loc[mask_we_car_empty, "carDesc_official"]
     df.loc[mask_we, ["opCarCode", "opCarDesc"]] = ""
 
     mismatch = (df["carDesc"] != df["carDesc_official"]) & (~mask_we)
-    df.loc[mismatch, "opCarCode"] = df.loc[mismatch, "carCode"].map({"OZ": "BX", "KE": "LJ"})
+    df.loc[mismatch, "opCarCode"] = df.loc[mismatch, "carCode"].map(OP_CAR_CODE_MAP)
     df.loc[mismatch, "opCarDesc"] = df.loc[mismatch, "carDesc"]
     df.loc[mismatch, "carDesc"] = df.loc[mismatch, "carDesc_official"]
 
-    opCarDesc_map = {"BX": "에어부산", "LJ": "진에어"}
-    mask_op = (df["opCarCode"].isin(opCarDesc_map.keys())) & (df["opCarDesc"].str.strip() == "")
-    df.loc[mask_op, "opCarDesc"] = df["opCarCode"].map(opCarDesc_map)
-
-    for col in ["seat", "fare", "fareOrigin", "airTax", "fuelChg", "tasf"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+    mask_op = (df["opCarCode"].isin(OP_CAR_DESC_MAP.keys())) & (df["opCarDesc"].str.strip() == "")
+    df.loc[mask_op, "opCarDesc"] = df["opCarCode"].map(OP_CAR_DESC_MAP)
 
-    for col in ["classDesc", "mainFlt"]:
-        df[col] = df[col].astype(str).str.strip()
+    for col in NUMERIC_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0).astype(FIELD_DTYPES[col])
 
     df["scraped_date"] = pd.to_datetime(df["scraped_date"], format="%Y-%m-%d", errors="coerce")
 
-    df["total_price"] = df["fare"] + df["fuelChg"] + df["airTax"] + df["tasf"]
+    df["total_price"] = (df["fare"] + df["fuelChg"] + df["airTax"] + df["tasf"]).astype(FIELD_DTYPES["total_price"])
 
     return df
 
 def _format_final_df(df: pd.DataFrame) -> pd.DataFrame:
-    """최종 컬럼 순서를 정리하고 불필요한 컬럼을 제거합니다."""
-    # `upload.py`와 동기화된 최종 컬럼 목록
-    final_columns = [
-        "agency_code", "code", "depDate", "depDay", "depTime", "depCity", "depDesc",
-        "arrDate", "arrDay", "arrTime", "arrCity", "arrDesc", "carCode", "carDesc",
-        "opCarCode", "opCarDesc", "mainFlt", "classCode", "classDesc", "seat",
-        "total_price", "fare", "fareOrigin", "fuelChg", "airTax", "tasf",
-        "scraped_date", "source_file"
-    ]
-
-    # 혹시 모를 누락 컬럼 추가 (결측값으로 채워짐)
-    for col in final_columns:
-        if col not in df.columns:
-            df[col] = pd.NA
-
-    return df[final_columns]
-
-
-# --- 2. 메인 함수 (감독 역할) ---
-def run_preprocess(collected_data: list = None, save_csv=True):
+    """
+    최종 컬럼(FINAL_COLUMNS, `upload.py`와 공유)만 남기고 FIELD_DTYPES 타입으로 맞춥니다.
+    날짜/시간/정수는 이미 변환되어 있어 다시 파싱하지 않고, 코드/이름은 category로 바꿉니다.
+    누락 컬럼은 결측값으로 채워집니다.
+    """
+    return apply_schema(df)
+
+
+# --- 2. 중복 제거/CSV 누적 ---
+def _normalize_for_dedup(df_in: pd.DataFrame) -> pd.DataFrame:
+    """
+    CSV/중복 키에 쓰는 문자열 표현으로 바꿉니다. (날짜 YYYY-MM-DD, 시간 HH:MM:SS, 코드 대문자, NaN류 → "")
+    타입 프레임은 그대로 포맷만 하고, CSV 등 문자열 입력은 스키마로 한 번 파싱한 뒤 포맷합니다.
+    """
+    return to_output_strings(ensure_schema(df_in))
+
+def _load_csv_key_index(output_path) -> KeyIndex:
+    """
+    CSV 옆의 키 인덱스(<이름>.keys.npy, UNIQUE_KEYS 기준)를 불러옵니다.
+    인덱스가 없고 CSV가 있으면 한 번 만들어 둡니다.
+    """
+    index = KeyIndex(os.path.splitext(str(output_path))[0] + ".keys.npy")
+    if not index.exists() and os.path.exists(output_path):
+        logger.info("키 인덱스가 없어 기존 CSV로부터 생성합니다. (최초 1회)")
+        for chunk in pd.read_csv(output_path, dtype=str, encoding="utf-8-sig",
+                                 usecols=lambda c: c in UNIQUE_KEYS, chunksize=200_000):
+            index.add(key_hashes(chunk))
+        index.save()
+        logger.info(f"키 인덱스 생성 완료: {len(index)}개")
+    return index
+
+def _rewrite_csv(output_path, replaced: np.ndarray, new_rows: pd.DataFrame, chunksize: int = 200_000):
+    """기존 CSV에서 replaced 키(UNIQUE_KEYS 해시)의 행을 빼고 new_rows를 덧붙여 임시 파일에 쓴 뒤 원자적으로 교체합니다."""
+    tmp_path = f"{output_path}.tmp"
+    header = True
+    for chunk in pd.read_csv(output_path, dtype=str, encoding="utf-8-sig", keep_default_na=False,
+                             chunksize=chunksize):
+        keep = ~np.isin(key_hashes(chunk), replaced)
+        chunk[keep].to_csv(tmp_path, mode="w" if header else "a", index=False, header=header, encoding="utf-8-sig")
+        header = False
+    new_rows.to_csv(tmp_path, mode="w" if header else "a", index=False, header=header, encoding="utf-8-sig")
+    os.replace(tmp_path, output_path)
+
+def save_processed_csv(df_final: pd.DataFrame, output_path=None):
+    """
+    전처리 결과를 누적 CSV에 저장합니다. 성공 여부를 반환합니다.
+    항공편 키(UNIQUE_KEYS)마다 마지막 관측 한 행만 유지합니다. (Parquet 저장소와 같은 규칙)
+    영속 키 인덱스로 이미 저장된 키를 확인해, 모두 새 키면 CSV 끝에 이어 쓰기만 하고
+    이미 있는 키가 섞여 있을 때만 CSV를 청크 단위로 다시 써서 기존 행을 이번 값으로 바꿉니다.
+    """
+    if output_path is None:
+        output_path = PROCESSED_DIR / "preprocessing_data.csv"
+    logger.info(f"CSV 저장/누적 작업을 시작합니다: {output_path}")
+
+    try:
+        # 신규 데이터 정규화
+        new_norm = _normalize_for_dedup(df_final)
+
+        # 진단: 신규 데이터 내부 중복
+        before = len(new_norm)
+        new_norm = new_norm.drop_duplicates(subset=UNIQUE_KEYS, keep="last")
+        if len(new_norm) != before:
+            logger.warning(f"신규 데이터 내부에서 중복 키 {before - len(new_norm)}건 발견(정규화 기준). 마지막 값만 저장합니다.")
+
+        index = _load_csv_key_index(output_path)
+        hashes = key_hashes(new_norm, normalized=True)
+        known = index.contains(hashes)
+
+        exists = os.path.exists(output_path)
+        if not exists:
+            logger.info("기존 CSV 파일이 없어 새로 생성합니다.")
+        if known.any() and exists:
+            logger.info(f"이미 저장된 키 {int(known.sum())}건을 최신 값으로 바꾸기 위해 CSV를 다시 씁니다.")
+            _rewrite_csv(output_path, hashes[known], new_norm)
+        else:
+            new_norm.to_csv(output_path, mode="a", index=False, header=not exists, encoding="utf-8-sig")
+        index.add(hashes[~known])
+        index.save()
+
+        logger.info(f"💾 {int((~known).sum())}건 신규 저장, {int(known.sum())}건 갱신 완료. (키 인덱스 {len(index)}개)")
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ CSV 저장/누적 중 오류 발생: {e}", exc_info=True)
+        return False
+
+
+def warn_stale_csv():
+    """Parquet 저장소에 저장하는 동안 누적 CSV는 갱신되지 않음을 알립니다. (upload CLI 기본 입력이 CSV, 프로세스당 1회)"""
+    global _STALE_CSV_WARNED
+    csv_path = PROCESSED_DIR / "preprocessing_data.csv"
+    if not _STALE_CSV_WARNED and os.path.exists(csv_path):
+        logger.warning(f"Parquet 저장소에 저장합니다. {csv_path}는 갱신되지 않으므로 "
+                       f"`python -m src.upload`(기본 입력 CSV)로 올리면 이전 데이터가 업로드됩니다.")
+        _STALE_CSV_WARNED = True
+
+def save_processed_store(df_final: pd.DataFrame, store_dir=None):
+    """
+    전처리 결과를 출발일 파티션 Parquet 저장소에 병합합니다.
+    이번 데이터가 속한 파티션만 읽고 쓰므로 비용이 누적 이력이 아닌 신규 데이터에 비례합니다.
+    """
+    try:
+        # 저장소는 타입 그대로 저장 (CSV에서 옮겨온 문자열 데이터는 여기서 한 번 파싱)
+        stats = write_partitions(ensure_schema(df_final), UNIQUE_KEYS, store_dir)
+        logger.info(f"💾 Parquet 저장소 병합 완료: 신규 {stats['new_rows']}건, "
+                    f"파티션 {stats['partitions']}개 갱신, 중복 {stats['removed']}건 제거")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Parquet 저장소 저장 중 오류 발생: {e}", exc_info=True)
+        return False
+
+def save_processed(df_final: pd.DataFrame, store: str = "csv"):
+    """store 설정에 따라 저장소(parquet) 또는 누적 CSV(csv)에 저장합니다. 성공 여부를 반환합니다."""
+    if store not in PROCESSED_STORES:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {store} (가능: {PROCESSED_STORES})")
+    if store == "csv":
+        return save_processed_csv(df_final)
+    warn_stale_csv()
+    return save_processed_store(df_final)
+
+def migrate_csv_to_store(csv_path=None, chunksize: int = 200_000):
+    """기존 누적 CSV를 청크 단위로 읽어 Parquet 저장소로 옮깁니다. (1회성)"""
+    if csv_path is None:
+        csv_path = PROCESSED_DIR / "preprocessing_data.csv"
+    if not os.path.exists(csv_path):
+        logger.warning(f"옮길 CSV 파일이 없습니다: {csv_path}")
+        return
+    total = 0
+    for chunk in pd.read_csv(csv_path, dtype=str, encoding="utf-8-sig", chunksize=chunksize):
+        if not save_processed_store(chunk):
+            return
+        total += len(chunk)
+    logger.info(f"📦 CSV → Parquet 저장소 이전 완료: {total}건")
+
+
+# --- 3. 메인 함수 (감독 역할) ---
+def _timed_step(step: str, func, *args):
+    """전처리 단계 하나를 실행하고 처리 행 수/시간을 지표에 기록합니다."""
+    started = time.perf_counter()
+    result = func(*args)
+    rows = len(result) if isinstance(result, pd.DataFrame) else 0
+    record_throughput("preprocess", step, rows, time.perf_counter() - started)
+    return result
+
+def preprocess_batch(collected_data: list, engine: str = None) -> pd.DataFrame:
+    """수집 결과 묶음(micro-batch)을 정제된 최종 데이터프레임으로 변환합니다. (CSV 저장 없음)"""
+    df_raw = _timed_step("parse", _create_dataframe_from_list, collected_data)
+    if df_raw.empty:
+        return df_raw
+    df_clean = _timed_step("clean", _clean_and_transform_data, df_raw, engine)
+    return _timed_step("format", _format_final_df, df_clean)
+
+def _discover_raw_inputs(since: str = None, acquisition_date: str = None):
+    """
+    RAW_DIR/<수집일(YYYY-MM-DD)> 디렉터리 단위로 입력을 찾습니다.
+    since/acquisition_date(YYYY-MM-DD)가 주어지면 해당 수집일 디렉터리만 탐색합니다.
+    반환: (세그먼트 목록, JSON 파일 목록)
+    """
+    if not os.path.isdir(RAW_DIR):
+        return [], []
+
+    segment_files, json_files = [], []
+    for entry in sorted(os.scandir(RAW_DIR), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        is_acq_dir = len(entry.name) == 10 and entry.name[4] == "-" and entry.name[7] == "-"
+        if since or acquisition_date:
+            if not is_acq_dir:
+                continue
+            if since and entry.name < since:
+                continue
+            if acquisition_date and entry.name != acquisition_date:
+                continue
+        segment_files.extend(glob.glob(os.path.join(entry.path, SEGMENT_DIRNAME, f"*{SEGMENT_SUFFIX}")))
+        json_files.extend(glob.glob(os.path.join(entry.path, "**", "*.json"), recursive=True))
+    return sorted(segment_files), sorted(json_files)
+
+def sources_of(collected_data: list) -> list:
+    """수집 결과의 source_file에서 실제 원본 파일 경로(세그먼트는 '#키' 제거)를 뽑습니다."""
+    return sorted({item["filepath"].split("#", 1)[0] for item in collected_data})
+
+def mark_ingested(source_files):
+    """run_preprocess 밖(스트리밍 모드 등)에서 저장까지 끝낸 원본 파일을 매니페스트에 기록합니다."""
+    manifest = IngestManifest(PROCESSED_DIR / "ingest_manifest.json")
+    manifest.mark(sorted(source_files))
+    manifest.save()
+
+def run_preprocess(collected_data: list = None, save_csv=True, since: str = None,
+                   acquisition_date: str = None, full_rebuild: bool = False, workers: int = None,
+                   store: str = "csv", input_files: list = None, engine: str = None):
+    """
+    - collected_data가 있으면 메모리의 수집 결과를 전처리합니다. (파이프라인 모드)
+    - 없으면 RAW_DIR의 원본 중 매니페스트에 없는(새로 생기거나 바뀐) 파일만 전처리합니다.
+      since/acquisition_date(YYYY-MM-DD)로 수집일을 제한할 수 있고,
+      full_rebuild=True면 매니페스트를 무시하고 모든 입력을 다시 처리합니다.
+    - input_files가 있으면 탐색 대신 그 원본 파일(세그먼트/JSON)만 처리합니다. (샤드 수집 결과 병합)
+    save_csv=True면 결과를 store("csv": 누적 CSV, "parquet": 출발일 파티션 저장소)에 저장하며,
+    매니페스트는 저장이 성공한 뒤에만 갱신됩니다.
+    workers: 파일/세그먼트 파싱 프로세스 수 (기본값 INGEST_WORKERS)
+    engine: 정제 엔진 "pandas" | "arrow" (기본값 TRANSFORM_ENGINE)
+    """
     logger.info("전처리 시작")
+    manifest = IngestManifest(PROCESSED_DIR / "ingest_manifest.json")
+    ingested_files = []
 
     if collected_data:
         # 1. 파이프라인 모드 (메모리에서 데이터 처리)
         logger.info(f"메모리로부터 {len(collected_data)}개 응답 데이터를 전처리합니다.")
-        df_raw = _create_dataframe_from_list(collected_data)
+        df_raw = _timed_step("parse", _create_dataframe_from_list, collected_data)
+        ingested_files = sources_of(collected_data)
     else:
         # 2. 독립 실행 모드 (파일 시스템)
         logger.info("파일 시스템으로부터 데이터를 로드하여 전처리합니다.")
-        json_files = glob.glob(os.path.join(RAW_DIR, "**", "*.json"), recursive=True)
-        if not json_files:
-            logger.warning("처리할 파일이 없습니다.")
+        if input_files is not None:
+            segment_files = sorted(f for f in input_files if str(f).endswith(SEGMENT_SUFFIX))
+            json_files = sorted(f for f in input_files if str(f).endswith(".json"))
+        else:
+            segment_files, json_files = _discover_raw_inputs(since=since, acquisition_date=acquisition_date)
+        found = len(segment_files) + len(json_files)
+        if not full_rebuild:
+            segment_files = manifest.filter_new(segment_files)
+            json_files = manifest.filter_new(json_files)
+        ingested_files = segment_files + json_files
+        if not ingested_files:
+            logger.warning(f"처리할 새 파일이 없습니다. (발견 {found}개, 매니페스트 {len(manifest)}개)")
             return pd.DataFrame()
-        df_raw = _load_data_from_files(json_files)
+        logger.info(f"세그먼트 {len(segment_files)}개, JSON 파일 {len(json_files)}개를 로드합니다. "
+                    f"(발견 {found}개 중 {'전체 재처리' if full_rebuild else '신규/변경분'})")
+        frames = [
+            df for df in (_timed_step("parse", _load_data_from_segments, segment_files, workers)
+                          if segment_files else None,
+                          _timed_step("parse", _load_data_from_files, json_files, workers) if json_files else None)
+            if df is not None and not df.empty
+        ]
+        df_raw = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
 
     if df_raw.empty:
         logger.warning("처리할 항공편 데이터가 없습니다.")
+        if save_csv and ingested_files:
+            # 항공편이 없는 응답도 다시 읽지 않도록 기록
+            manifest.mark(ingested_files)
+            manifest.save()
         return df_raw
 
-    df_clean = _clean_and_transform_data(df_raw)
-    df_final = _format_final_df(df_clean)
+    df_clean = _timed_step("clean", _clean_and_transform_data, df_raw, engine)
+    df_final = _timed_step("format", _format_final_df, df_clean)
 
     if save_csv:
-        output_path = PROCESSED_DIR / "preprocessing_data.csv"
-        logger.info(f"CSV 저장/누적 작업을 시작합니다: {output_path}")
-
-        unique_keys = [
-            "agency_code", "code",
-            "depDate", "depTime", "depCity",
-            "arrDate", "arrTime", "arrCity",
-            "carCode", "opCarCode",
-            "mainFlt", "classCode", "classDesc"
-        ]
-
-        def _normalize_for_dedup(df_in: pd.DataFrame) -> pd.DataFrame:
-            dfn = df_in.copy()
-
-            # 1) 날짜 → YYYY-MM-DD
-            for dcol in ["depDate", "arrDate", "scraped_date"]:
-                if dcol in dfn.columns:
-                    dfn[dcol] = pd.to_datetime(dfn[dcol], errors="coerce").dt.strftime("%Y-%m-%d")
-
-            # 2) 시간 → HH:MM:SS (모든 입력 포맷 허용, zero-padding 강제)
-            def _to_hms(s):
-                s = s.astype(str).str.strip()
-                # 먼저 HH:MM:SS 형태 시도
-                t1 = pd.to_datetime(s, format="%H:%M:%S", errors="coerce")
-                # HH:MM 형태 시도
-                mask_na = t1.isna()
-                if mask_na.any():
-                    t2 = pd.to_datetime(s[mask_na], format="%H:%M", errors="coerce")
-                    t1 = t1.where(~mask_na, t2)
-                # HHMM 형태 시도
-                mask_na = t1.isna()
-                if mask_na.any():
-                    t3 = pd.to_datetime(s[mask_na].str.zfill(4), format="%H%M", errors="coerce")
-                    t1 = t1.where(~mask_na, t3)
-                return t1.dt.strftime("%H:%M:%S")
-
-            for tcol in ["depTime", "arrTime"]:
-                if tcol in dfn.columns:
-                    dfn[tcol] = _to_hms(dfn[tcol])
-
-            # 3) 문자열 표준화: strip, NaN류 → ""
-            str_cols = [
-                "agency_code", "code", "depDay", "depCity", "depDesc",
-                "arrDay", "arrCity", "arrDesc",
-                "carCode", "carDesc", "opCarCode", "opCarDesc",
-                "mainFlt", "classCode", "classDesc", "source_file"
-            ]
-            for col in str_cols:
-                if col in dfn.columns:
-                    dfn[col] = dfn[col].fillna("").astype(str).str.strip()
-                    dfn[col] = dfn[col].replace({"nan": "", "None": "", "NaT": ""})
-
-            for col in str_cols:
-                if col in dfn.columns:
-                    dfn[col] = dfn[col].fillna("").astype(str).str.strip()
-                    dfn[col] = dfn[col].replace({"nan": "", "None": "", "NaT": ""})
-
-            # 4) 코드류 대문자 통일
-            for col in ["agency_code", "carCode", "opCarCode", "classCode", "mainFlt", "code"]:
-                if col in dfn.columns:
-                    dfn[col] = dfn[col].str.upper()
-
-            # 5) 중복키 누락 컬럼 보강
-            for col in unique_keys:
-                if col not in dfn.columns:
-                    dfn[col] = ""
-
-            return dfn
-
-        try:
-            # 신규 데이터 정규화
-            new_norm = _normalize_for_dedup(df_final)
-
-            # 진단: 신규 데이터 내부 중복
-            if len(new_norm) != len(new_norm.drop_duplicates(subset=unique_keys)):
-                logger.warning("신규 데이터 내부에서 중복 키 발견(정규화 기준). 중복은 CSV 병합 시 제거됩니다.")
-
-            if os.path.exists(output_path):
-                logger.info("기존 CSV 파일을 불러와 데이터를 병합합니다.")
-                # dtype=str로 읽어들여 포맷섞임 방지, 이후 정규화
-                old_df = pd.read_csv(output_path, dtype=str, encoding="utf-8-sig")
-                old_norm = _normalize_for_dedup(old_df)
-
-                before = len(old_norm) + len(new_norm)
-                combined_df = pd.concat([old_norm, new_norm], ignore_index=True)
-
-                combined_df.drop_duplicates(subset=unique_keys, keep="last", inplace=True)
-                after = len(combined_df)
-                removed = before - after
-
-                logger.info(f"중복 제거 결과: {removed}건 제거, 최종 {after}건")
-
-                combined_df.to_csv(output_path, index=False, encoding="utf-8-sig")
-                logger.info(f"💾 {len(new_norm)}건 신규 병합 완료. 총 {len(combined_df)}건 저장.")
-            else:
-                logger.info("기존 CSV 파일이 없어 새로 생성합니다.")
-                new_norm.to_csv(output_path, index=False, encoding="utf-8-sig")
-                logger.info(f"💾 {len(new_norm)}건 저장 완료.")
-
-        except Exception as e:
-            logger.error(f"❌ CSV 저장/누적 중 오류 발생: {e}", exc_info=True)
-
+        started = time.perf_counter()
+        saved = save_processed(df_final, store)
+        record_throughput("preprocess", f"save_{store}", len(df_final), time.perf_counter() - started)
+        if saved:
+            manifest.mark(ingested_files)
+            manifest.save()
+            logger.info(f"매니페스트 갱신: {len(ingested_files)}개 파일 기록 (총 {len(manifest)}개)")
 
     logger.info("전처리 완료")
     return df_final
 
+def _to_acq_date(value: str):
+    """YYYYMMDD → 수집일 디렉터리 이름(YYYY-MM-DD)"""
+    if value is None:
+        return None
+    try:
+        return datetime.strptime(value, "%Y%m%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise click.BadParameter("날짜 형식은 YYYYMMDD 이어야 합니다. 예: 20250901")
+
+@click.command(help="원본 데이터 전처리 (새로 수집된 파일만 처리)")
+@click.option("--since", "since_str", default=None, help="이 수집일(YYYYMMDD) 이후 데이터만 처리")
+@click.option("--acquisition-date", "acq_date_str", default=None, help="특정 수집일(YYYYMMDD) 데이터만 처리")
+@click.option("--full-rebuild", is_flag=True, help="매니페스트를 무시하고 모든 원본을 다시 처리")
+@click.option("--no-save-csv", is_flag=True, help="결과 저장 생략 (매니페스트도 갱신하지 않음)")
+@click.option("--pack-legacy", is_flag=True, help="처리 전에 기존 요청당 JSON 파일을 세그먼트로 묶고 원본 JSON은 삭제")
+@click.option("--workers", type=int, default=None, help="파싱 프로세스 수 (기본값: CPU 코어 수)")
+@click.option("--store", type=click.Choice(PROCESSED_STORES), default="csv", show_default=True,
+              help="전처리 결과 저장 형식 (csv: 누적 CSV, parquet: 출발일 파티션 저장소)")
+@click.option("--migrate-csv", is_flag=True, help="기존 preprocessing_data.csv를 Parquet 저장소로 옮기고 종료")
+@click.option("--engine", type=click.Choice(TRANSFORM_ENGINES), default=None,
+              help="정제 엔진 (기본값: 환경 변수 TRANSFORM_ENGINE 또는 pandas)")
+def cli_preprocess(since_str, acq_date_str, full_rebuild, no_save_csv, pack_legacy, workers, store, migrate_csv,
+                   engine):
+    if migrate_csv:
+        migrate_csv_to_store()
+        return
+    if pack_legacy:
+        pack_legacy_raw_files(remove=True)
+    try:
+        run_preprocess(save_csv=not no_save_csv, since=_to_acq_date(since_str),
+                       acquisition_date=_to_acq_date(acq_date_str), full_rebuild=full_rebuild, workers=workers,
+                       store=store, engine=engine)
+    finally:
+        export_metrics("preprocess", {"args": {"since": since_str, "acquisition_date": acq_date_str,
+                                               "full_rebuild": full_rebuild, "store": store,
+                                               "engine": engine or TRANSFORM_ENGINE}})
+
 if __name__ == "__main__":
-    run_preprocess(save_csv=True)
\ No newline at end of file
+    cli_preprocess()
\ No newline at end of file
@@ -0,0 +1,99 @@
+# processed_store.py
+import os
+import re
+import glob
+import pandas as pd
+
+from src.common.schema import apply_schema
+from src.common.logging_setup import setup_logging
+from src.common.paths import STORE_DIR
+
+logger = setup_logging(__name__)
+
+PARTITION_COL = "depDate"
+PART_FILENAME = "part-0.parquet"
+PARTITION_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+# ---------------------------------- 1. 경로 규칙 (hive 스타일: depDate=YYYY-MM-DD/part-0.parquet)
+def partition_dir(value: str, store_dir=None) -> str:
+    return os.path.join(store_dir or STORE_DIR, f"{PARTITION_COL}={value}")
+
+def list_partitions(store_dir=None) -> list:
+    """저장소에 있는 출발일 파티션 값 목록 (YYYY-MM-DD 형식이 아닌 파티션 - 이전 버전의 unknown 등 - 은 제외)"""
+    dirs = glob.glob(os.path.join(store_dir or STORE_DIR, f"{PARTITION_COL}=*"))
+    values = (os.path.basename(d).split("=", 1)[1] for d in dirs)
+    return sorted(v for v in values if PARTITION_PATTERN.fullmatch(v))
+
+
+# ---------------------------------- 2. ✨ 파티션 단위 쓰기
+def write_partitions(df_typed: pd.DataFrame, unique_keys: list, store_dir=None) -> dict:
+    """
+    스키마 타입(src.common.schema)으로 변환된 데이터를 출발일 파티션별로 병합합니다.
+    - 이번 데이터가 속한 파티션만 읽고, 그 파티션 안에서만 중복 제거 (keep="last")
+    - 파티션 파일은 임시 파일에 쓴 뒤 교체 (중간 실패 시 기존 파일 보존)
+    - 출발일이 없는(NaT) 행은 날짜 범위 조회에 섞이지 않도록 저장하지 않습니다.
+    반환: {"partitions": 수정한 파티션 수, "new_rows": 신규 행 수, "removed": 제거된 중복 수,
+           "dropped": 출발일이 없어 버린 행 수}
+    """
+    store_dir = store_dir or STORE_DIR
+    missing = df_typed[PARTITION_COL].isna()
+    if missing.any():
+        logger.warning(f"출발일({PARTITION_COL})이 없는 {int(missing.sum())}건은 저장소에 저장하지 않습니다.")
+        df_typed = df_typed[~missing]
+    stats = {"partitions": 0, "new_rows": len(df_typed), "removed": 0, "dropped": int(missing.sum())}
+
+    part_values = df_typed[PARTITION_COL].dt.strftime("%Y-%m-%d")
+    for value, part in df_typed.groupby(part_values, sort=True):
+        target_dir = partition_dir(value, store_dir)
+        target = os.path.join(target_dir, PART_FILENAME)
+        os.makedirs(target_dir, exist_ok=True)
+
+        # 파티션 값은 경로에만 둡니다. (데이터셋으로 읽을 때 경로에서 복원)
+        part = part.drop(columns=[PARTITION_COL])
+        if os.path.exists(target):
+            existing = pd.read_parquet(target)
+            # 카테고리 목록이 달라 object로 풀린 컬럼을 다시 스키마 타입으로 맞춤
+            combined = apply_schema(pd.concat([existing, part], ignore_index=True)).drop(columns=[PARTITION_COL])
+        else:
+            combined = part.reset_index(drop=True)
+
+        keys = [k for k in unique_keys if k != PARTITION_COL]
+        before = len(combined)
+        combined = combined.drop_duplicates(subset=keys, keep="last")
+        stats["removed"] += before - len(combined)
+
+        tmp_path = f"{target}.tmp"
+        combined.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, target)
+        stats["partitions"] += 1
+
+    return stats
+
+
+# ---------------------------------- 3. ✨ 읽기 (노트북용: 컬럼/파티션 가지치기)
+def read_store(columns: list = None, dep_date_from: str = None, dep_date_to: str = None,
+               filters: list = None, store_dir=None) -> pd.DataFrame:
+    """
+    저장소를 읽습니다. 출발일 범위(YYYY-MM-DD)에 해당하지 않는 파티션은 열지 않습니다.
+    filters는 pyarrow 필터 형식 그대로 전달됩니다. 예: [("carCode", "==", "OZ")]
+    """
+    store_dir = store_dir or STORE_DIR
+    partitions = [p for p in list_partitions(store_dir)
+                  if (not dep_date_from or p >= dep_date_from) and (not dep_date_to or p <= dep_date_to)]
+    if not partitions:
+        return pd.DataFrame(columns=columns)
+
+    # 날짜 범위는 파티션 목록으로 먼저 거름 (문자열 비교에 날짜가 아닌 파티션이 섞이지 않도록)
+    all_filters = list(filters or [])
+    all_filters.append((PARTITION_COL, "in", partitions))
+
+    df = pd.read_parquet(
+        store_dir,
+        columns=columns,
+        filters=all_filters,
+        partitioning="hive",
+    )
+    if PARTITION_COL in df.columns:
+        df[PARTITION_COL] = pd.to_datetime(df[PARTITION_COL].astype(str), errors="coerce")
+    return df
@@ -0,0 +1,155 @@
+# rate_control.py
+import time
+import heapq
+import random
+import asyncio
+import itertools
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from src.common.logging_setup import setup_logging
+
+logger = setup_logging(__name__)
+
+
+# ---------------------------------- 1. Retry-After 헤더 파싱
+def parse_retry_after(value) -> float:
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 초로 변환합니다. 해석 불가 시 None."""
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# ---------------------------------- 2. ✨ AIMD 동시성 제어기
+class AdaptiveLimiter:
+    """
+    관측된 지연/타임아웃/비정상 응답으로 동시 요청 수를 조절합니다. (AIMD)
+    - 성공 + 목표 지연 이하: 한도를 천천히 올림 (한도당 +increase_step)
+    - 타임아웃/오류/비정상 상태 또는 목표 지연 초과: 한도를 decrease_factor 배로 줄임
+    - Retry-After 수신 시 해당 시간 동안 신규 요청을 보내지 않음
+    """
+
+    def __init__(self, initial: int = 20, min_limit: int = 4, max_limit: int = 80,
+                 increase_step: float = 1.0, decrease_factor: float = 0.7,
+                 latency_target: float = 5.0, decrease_cooldown: float = 2.0):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.decrease_cooldown = decrease_cooldown
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.decrease_count = 0
+        self.peak_limit = self.limit
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        async with self._cond:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.current_limit:
+                    self.in_flight += 1
+                    return
+                await self._cond.wait()
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self._decrease(f"지연 {latency:.1f}초")
+            return
+        # 한도 1회 순환(limit 건 성공)마다 increase_step 만큼 증가
+        self.limit = min(self.max_limit, self.limit + self.increase_step / max(self.limit, 1.0))
+        self.peak_limit = max(self.peak_limit, self.limit)
+
+    def on_failure(self, reason: str):
+        self._decrease(reason)
+
+    def pause(self, seconds: float):
+        """Retry-After 등 서버 지시에 따라 신규 요청을 잠시 멈춥니다."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        logger.warning(f"서버 요청에 따라 {seconds:.1f}초 동안 신규 요청을 멈춥니다.")
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        # 같은 혼잡 구간에서 연속으로 여러 번 줄이지 않도록 쿨다운 적용
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        before = self.current_limit
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        self.decrease_count += 1
+        logger.warning(f"동시성 한도 감소: {before} → {self.current_limit} ({reason})")
+
+
+# ---------------------------------- 3. ✨ 지연 재시도 큐
+class RetryQueue:
+    """
+    재시도 요청을 예정 시각 순으로 보관합니다. 코루틴이 대기하며 슬롯을 잡고 있지 않도록
+    실패한 요청은 큐에 넣고, 예정 시각이 된 항목만 다시 꺼내 실행합니다.
+    """
+
+    def __init__(self, base_delay: float = 2.0, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def backoff(self, attempt: int) -> float:
+        """지수 백오프에 지터(0.5~1.5배)를 섞은 대기 시간."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def push(self, item, attempt: int, retry_after: float = None) -> float:
+        delay = self.backoff(attempt)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), item))
+        return delay
+
+    def seconds_until_next(self):
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def pop_next_due(self):
+        """예정 시각이 된 항목 하나를 꺼냅니다. 없으면 None."""
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            return heapq.heappop(self._heap)[2]
+        return None
@@ -0,0 +1,153 @@
+# raw_writer.py
+import os
+import queue
+import asyncio
+import threading
+from datetime import datetime
+
+from src.common.logging_setup import setup_logging
+from src.common.raw_archive import SegmentWriter, new_segment_path, record_key, record_source
+
+logger = setup_logging(__name__)
+
+RAW_FORMATS = ("segment", "files")
+
+_STOP = object()
+
+
+class RawWriter:
+    """
+    원본 응답을 이벤트 루프 밖에서 저장하는 전용 쓰기 스레드.
+    - 응답 바이트를 받은 그대로 기록합니다. (재직렬화 없음)
+    - raw_format="segment": 수집일별 gzip NDJSON 세그먼트 + 인덱스 (기본값)
+    - raw_format="files": 기존 방식, RAW_DIR/<수집일>/<출발일>/<키>.json (디렉터리는 한 번만 생성)
+    - 큐에 쌓인 항목을 batch_size 단위로 묶어 씁니다.
+    """
+
+    def __init__(self, root, raw_format: str = "segment", run_id: str = None,
+                 max_queue: int = 10_000, batch_size: int = 200):
+        if raw_format not in RAW_FORMATS:
+            raise ValueError(f"지원하지 않는 원본 저장 형식입니다: {raw_format} (가능: {RAW_FORMATS})")
+        self.root = root
+        self.raw_format = raw_format
+        self.run_id = run_id or f"{datetime.now().strftime('%H%M%S')}_{os.getpid()}"
+        self.batch_size = batch_size
+        self.written = 0
+        self.bytes_written = 0
+        self.failed = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._made_dirs = set()
+        self._segment_paths = {}
+        self._segments = {}
+        self._files = []
+        self._thread = threading.Thread(target=self._run, name="raw-writer", daemon=True)
+        self._thread.start()
+
+    def source_for(self, meta: dict) -> str:
+        """레코드가 저장될 위치(source_file). 실제 쓰기 전에 결정됩니다."""
+        key = record_key(meta["dep"], meta["arr"], meta["depDate"], meta["agent"])
+        if self.raw_format == "files":
+            return os.path.join(self.root, meta["acq_date"], meta["depDate"], f"{key}.json")
+        return record_source(self._segment_path(meta["acq_date"]), key)
+
+    async def submit(self, meta: dict, body: bytes) -> str:
+        """저장 요청을 큐에 넣고 source_file을 돌려줍니다. 큐가 가득 차면 루프를 막지 않고 빈자리를 기다립니다."""
+        source = self.source_for(meta)
+        item = (source, meta, body)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            await asyncio.to_thread(self._queue.put, item)
+        return source
+
+    def close(self):
+        """
+        남은 항목을 모두 기록하고 쓰기 스레드를 종료합니다. (블로킹)
+        쓰기 스레드에서 예상하지 못한 오류가 있었으면 여기서 다시 발생시킵니다.
+        """
+        self._queue.put(_STOP)
+        self._thread.join()
+        for segment in self._segments.values():
+            segment.close()
+        logger.info(f"원본 저장 완료: {self.written}건, {self.bytes_written / 1_000_000:.1f}MB "
+                    f"(형식 {self.raw_format}, 실패 {self.failed}건)")
+        if self.error is not None:
+            raise self.error
+
+    async def aclose(self):
+        await asyncio.to_thread(self.close)
+
+    def outputs(self) -> list:
+        """이번 실행에서 기록한 원본 파일 목록 (segment: 세그먼트 파일, files: 요청당 JSON 파일)"""
+        if self.raw_format == "files":
+            return list(self._files)
+        return [segment_path for acq_date, segment_path in sorted(self._segment_paths.items())
+                if acq_date in self._segments]
+
+    def _segment_path(self, acq_date: str) -> str:
+        path = self._segment_paths.get(acq_date)
+        if path is None:
+            path = new_segment_path(self.root, acq_date, self.run_id)
+            self._segment_paths[acq_date] = path
+        return path
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = _STOP in batch
+            items = [item for item in batch if item is not _STOP]
+            try:
+                if self.raw_format == "files":
+                    for source, _, body in items:
+                        self._write_file(source, body)
+                else:
+                    self._write_segments(items)
+            except Exception as e:
+                # 스레드가 죽으면 bounded 큐가 차서 submit/close가 영원히 막히므로, 기록만 하고 계속 비움
+                self.failed += len(items)
+                if self.error is None:
+                    self.error = e
+                logger.error(f"❌ 원본 쓰기 스레드 오류: {e}", exc_info=True)
+            if stop:
+                return
+
+    def _write_file(self, filepath: str, body: bytes):
+        dirname = os.path.dirname(filepath)
+        try:
+            if dirname not in self._made_dirs:
+                os.makedirs(dirname, exist_ok=True)
+                self._made_dirs.add(dirname)
+            with open(filepath, "wb") as f:
+                f.write(body)
+            self._files.append(filepath)
+            self.written += 1
+            self.bytes_written += len(body)
+        except OSError as e:
+            self.failed += 1
+            logger.error(f"원본 저장 실패: {filepath} ({e})")
+
+    def _write_segments(self, items: list):
+        by_acq_date = {}
+        for _, meta, body in items:
+            key = record_key(meta["dep"], meta["arr"], meta["depDate"], meta["agent"])
+            by_acq_date.setdefault(meta["acq_date"], []).append((key, meta, body))
+
+        for acq_date, records in by_acq_date.items():
+            segment = self._segments.get(acq_date)
+            try:
+                if segment is None:
+                    segment = SegmentWriter(self._segment_path(acq_date))
+                    self._segments[acq_date] = segment
+                segment.append_batch(records)
+                self.written += len(records)
+                self.bytes_written += sum(len(body) for _, _, body in records)
+            except OSError as e:
+                self.failed += len(records)
+                logger.error(f"세그먼트 저장 실패: {self._segment_path(acq_date)} ({e})")
@@ -0,0 +1,189 @@
+# scheduler.py
+import os
+import json
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.common.logging_setup import setup_logging
+from src.common.paths import RAW_DIR, PROCESSED_DIR
+from src.change_detect import CHANGE_COLUMNS
+from src.planner import build_request_plan, build_full_plan
+from src.common.keys import key_hashes, UNIQUE_KEYS
+
+logger = setup_logging(__name__)
+
+# ---------------------------------- 1. 설정
+SCHEDULER_STATE_PATH = PROCESSED_DIR / "scheduler_state.json"
+HORIZON_DAYS = 90               # 오늘부터 며칠 뒤 출발편까지 훑을지
+REQUESTS_PER_HOUR = 3000        # 전체 요청 예산 (토큰 버킷, 재시도 제외)
+TICK_SECONDS = 300              # 스케줄 주기 (초)
+BURST_TICKS = 2                 # 쉬는 동안 모아둘 수 있는 예산 (주기 수)
+# 출발까지 남은 일수별 갱신 간격 (남은 일수 상한, 초). 가까운 출발일일수록 자주
+REFRESH_TIERS = [
+    (3, 1 * 3600),
+    (7, 3 * 3600),
+    (30, 12 * 3600),
+    (60, 24 * 3600),
+    (None, 72 * 3600),
+]
+VOLATILITY_ALPHA = 0.3          # 노선 변동성 EWMA 가중치
+VOLATILITY_BOOST = 2.0          # 변동성 1인 노선은 간격이 1/(1+BOOST)로 줄어듦
+
+
+def refresh_interval(days_ahead: int, volatility: float = 0.0) -> float:
+    """출발까지 남은 일수와 노선 변동성(0~1)으로 갱신 간격(초)을 정합니다."""
+    for max_days, interval in REFRESH_TIERS:
+        if max_days is None or days_ahead <= max_days:
+            return interval / (1.0 + VOLATILITY_BOOST * volatility)
+
+def slot_fingerprints(df_final: pd.DataFrame) -> dict:
+    """
+    전처리 결과를 (출발지, 도착지, 출발일) 슬롯별로 묶어 요금/좌석 지문(행 해시 합)을 만듭니다.
+    반환: {"GMP-CJU-20251020": "16진수 지문"}
+    """
+    if df_final is None or df_final.empty:
+        return {}
+    h = key_hashes(df_final, UNIQUE_KEYS + CHANGE_COLUMNS)
+    slots = (df_final["depCity"].astype(str) + "-" + df_final["arrCity"].astype(str) + "-"
+             + pd.to_datetime(df_final["depDate"]).dt.strftime("%Y%m%d"))
+    sums = pd.Series(h, index=df_final.index, dtype=np.uint64).groupby(slots.to_numpy()).sum()
+    return {slot: f"{int(v):016x}" for slot, v in sums.items()}
+
+
+# ---------------------------------- 2. ✨ 연속 스윕 스케줄러
+class SweepScheduler:
+    """
+    출발일 범위(오늘 ~ HORIZON_DAYS)를 (노선, 출발일) 슬롯 단위로 계속 훑습니다.
+    - 슬롯마다 갱신 간격(출발 임박도 × 노선 변동성)을 두고, 간격 대비 경과 시간이 큰 순서로 고릅니다.
+    - 전체 요청 수는 토큰 버킷(REQUESTS_PER_HOUR)으로 제한합니다. 슬롯 비용 = 그 슬롯의 요청 수(여행사 수)
+    - 노선 변동성은 다시 조회했을 때 슬롯 지문이 바뀐 비율의 EWMA입니다.
+    - negative_cache가 있으면 최근 빈 결과였던 (노선, 출발일, 여행사) 요청은 슬롯 비용에서 빠집니다.
+    - 상태(슬롯별 최근 조회 시각/지문, 노선 변동성, 남은 예산)는 JSON으로 저장해 재시작 후에도 이어갑니다.
+    """
+
+    def __init__(self, path=SCHEDULER_STATE_PATH, horizon_days: int = HORIZON_DAYS,
+                 requests_per_hour: float = REQUESTS_PER_HOUR, tick_seconds: float = TICK_SECONDS,
+                 use_route_map: bool = True, base_output_dir=RAW_DIR, negative_cache=None):
+        self.path = path
+        self.horizon_days = horizon_days
+        self.requests_per_hour = requests_per_hour
+        self.tick_seconds = tick_seconds
+        self.use_route_map = use_route_map
+        self.base_output_dir = base_output_dir
+        self.negative_cache = negative_cache
+        self.capacity = requests_per_hour / 3600.0 * tick_seconds * BURST_TICKS
+        self.tokens = requests_per_hour / 3600.0 * tick_seconds
+        self.updated_at = time.time()
+        self.slots = {}
+        self.volatility = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"스케줄러 상태를 읽지 못해 처음부터 시작합니다: {self.path} ({e})")
+            return
+        self.slots = data.get("slots", {})
+        self.volatility = data.get("volatility", {})
+        self.tokens = min(float(data.get("tokens", self.tokens)), self.capacity)
+        self.updated_at = float(data.get("updated_at", self.updated_at))
+        logger.info(f"스케줄러 상태 불러옴: 슬롯 {len(self.slots)}개, 노선 변동성 {len(self.volatility)}개")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"tokens": self.tokens, "updated_at": self.updated_at,
+                "slots": self.slots, "volatility": self.volatility}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    # --- 예산 ---
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self.updated_at)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.requests_per_hour / 3600.0)
+        self.updated_at = now
+
+    # --- 슬롯 선택 ---
+    def _plan_by_slot(self, today: date) -> dict:
+        dep_dates = [(today + timedelta(days=i)).strftime("%Y%m%d") for i in range(self.horizon_days)]
+        if self.use_route_map:
+            plan, _ = build_request_plan(dep_dates, self.base_output_dir)
+        else:
+            plan, _ = build_full_plan(dep_dates, self.base_output_dir)
+        if self.negative_cache is not None:
+            plan = self.negative_cache.filter(plan, count=False)
+        by_slot = {}
+        for params in plan:
+            by_slot.setdefault(f"{params['pDep']}-{params['pArr']}-{params['pDepDate']}", []).append(params)
+        return by_slot
+
+    def select(self, now: float = None):
+        """
+        이번 주기에 조회할 요청을 고릅니다.
+        반환: (요청 payload 목록, 선택한 슬롯 키 목록)
+        """
+        now = time.time() if now is None else now
+        today = date.fromtimestamp(now)
+        self._refill(now)
+
+        # 출발일이 지난 슬롯은 정리
+        today_str = today.strftime("%Y%m%d")
+        self.slots = {k: v for k, v in self.slots.items() if k.rsplit("-", 1)[1] >= today_str}
+
+        candidates = []
+        for slot, params_list in self._plan_by_slot(today).items():
+            route, dep_date = slot.rsplit("-", 1)
+            days_ahead = (date(int(dep_date[:4]), int(dep_date[4:6]), int(dep_date[6:])) - today).days
+            interval = refresh_interval(days_ahead, self.volatility.get(route, 0.0))
+            last_run = self.slots.get(slot, {}).get("last_run")
+            # 한 번도 조회하지 않은 슬롯은 가장 급한 것으로 취급 (같으면 가까운 출발일 먼저)
+            urgency = float("inf") if last_run is None else (now - last_run) / interval
+            if urgency >= 1.0:
+                candidates.append((-urgency, days_ahead, slot, params_list))
+        candidates.sort(key=lambda c: (c[0], c[1]))
+
+        tasks_params, chosen = [], []
+        for _, _, slot, params_list in candidates:
+            if len(params_list) > self.tokens:
+                break
+            self.tokens -= len(params_list)
+            tasks_params.extend(params_list)
+            chosen.append(slot)
+
+        logger.info(f"⏰ 스케줄: 갱신 대상 슬롯 {len(candidates)}개 중 {len(chosen)}개 선택 "
+                    f"(요청 {len(tasks_params)}건, 남은 예산 {self.tokens:.0f}건)")
+        return tasks_params, chosen
+
+    # --- 결과 반영 ---
+    def record(self, slots: list, df_final: pd.DataFrame = None, now: float = None):
+        """
+        조회한 슬롯의 최근 조회 시각과 지문을 갱신하고, 지문 변화로 노선 변동성을 갱신한 뒤 저장합니다.
+        df_final이 None이면(파이프라인 실패) 조회 시각만 갱신합니다.
+        """
+        now = time.time() if now is None else now
+        fingerprints = slot_fingerprints(df_final) if df_final is not None else None
+        changed = 0
+        for slot in slots:
+            entry = self.slots.setdefault(slot, {})
+            entry["last_run"] = now
+            if fingerprints is None:
+                continue
+            fp = fingerprints.get(slot, "")
+            if "fp" in entry:
+                route = slot.rsplit("-", 1)[0]
+                is_changed = float(entry["fp"] != fp)
+                changed += int(is_changed)
+                prev = self.volatility.get(route, 0.0)
+                self.volatility[route] = (1 - VOLATILITY_ALPHA) * prev + VOLATILITY_ALPHA * is_changed
+            entry["fp"] = fp
+        self.save()
+        if fingerprints is not None:
+            logger.info(f"스케줄 결과: 슬롯 {len(slots)}개 중 요금/좌석 변경 {changed}개")
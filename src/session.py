@@ -0,0 +1,222 @@
+# session.py
+import os
+import json
+import time
+import asyncio
+import aiohttp
+from yarl import URL
+
+from src.common.logging_setup import setup_logging
+from src.common.paths import COOKIE_CACHE_PATH
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.edge.service import Service
+    from selenium.webdriver.edge.options import Options
+except ImportError:  # 브라우저 없는 환경(헤드리스 리눅스)에서는 HTTP 부트스트랩만 사용
+    webdriver = None
+
+logger = setup_logging(__name__)
+
+# ---------------------------------- 1. 설정
+# 로컬 모의 API(benchmarks/mock_fare_api.py) 등 다른 서버로 보낼 때는 환경 변수로 지정
+BASE_URL = os.getenv("AIRPORT_BASE_URL", "https://www.airport.co.kr").rstrip("/")
+TARGET_URL = f"{BASE_URL}/booking/cms/frCon/index.do?MENU_ID=80"
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/136.0.0.0 Safari/537.36"
+)
+# 드라이버 경로는 환경 변수로 지정 (없으면 Selenium Manager가 찾음)
+DRIVER_PATH = os.getenv("EDGE_DRIVER_PATH")
+COOKIE_TTL = 30 * 60            # 캐시한 쿠키를 믿는 시간(초)
+REFRESH_AHEAD = 0.8             # TTL의 이 비율이 지나면 백그라운드에서 미리 갱신
+STALE_FAILURE_THRESHOLD = 5     # 세션 만료로 보이는 연속 실패가 이만큼 쌓이면 즉시 갱신
+REFRESH_RETRY_DELAY = 60        # 갱신 실패 후 다시 시도하기까지 대기(초)
+BOOTSTRAP_TIMEOUT = 15
+BOOTSTRAP_METHODS = ("http", "browser")
+
+
+# ---------------------------------- 2. 쿠키 획득 (브라우저 없이 / 브라우저로)
+async def fetch_cookies_http(timeout: float = BOOTSTRAP_TIMEOUT) -> dict:
+    """예약 페이지를 직접 요청해 세션 쿠키를 받습니다. (브라우저 불필요)"""
+    jar = aiohttp.CookieJar(unsafe=True)
+    headers = {"User-Agent": USER_AGENT}
+    async with aiohttp.ClientSession(cookie_jar=jar, headers=headers) as session:
+        async with session.get(TARGET_URL, timeout=timeout) as response:
+            await response.read()
+            if response.status != 200:
+                raise RuntimeError(f"status {response.status}")
+    return {name: morsel.value for name, morsel in jar.filter_cookies(URL(BASE_URL)).items()}
+
+def create_edge_options():
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+def fetch_cookies_browser(wait_seconds: float = 3.0) -> dict:
+    """헤드리스 Edge로 예약 페이지를 열어 쿠키를 받습니다. (쿠키가 생기면 바로 반환, 최대 wait_seconds 대기)"""
+    if webdriver is None:
+        raise RuntimeError("selenium이 설치되어 있지 않습니다.")
+    service = Service(DRIVER_PATH) if DRIVER_PATH else Service()
+    driver = None
+    try:
+        driver = webdriver.Edge(service=service, options=create_edge_options())
+        driver.get(TARGET_URL)
+        deadline = time.monotonic() + wait_seconds
+        cookies = {}
+        while time.monotonic() < deadline:
+            cookies = {c["name"]: c["value"] for c in driver.get_cookies()}
+            if cookies:
+                break
+            time.sleep(0.2)
+        return cookies
+    finally:
+        if driver:
+            driver.quit()
+
+
+# ---------------------------------- 3. ✨ 쿠키 제공자 (디스크 캐시 + TTL + 자동 갱신)
+class CookieProvider:
+    """
+    세션 쿠키를 디스크에 캐시해 실행 간에 재사용하고, 필요할 때만 새로 받습니다.
+    - get(): 캐시가 TTL 안이면 그대로, 아니면 갱신 (http → browser 순서로 시도)
+    - attach(session): 수집 세션에 쿠키를 넣고, TTL의 REFRESH_AHEAD 시점마다 백그라운드로 갱신
+    - report_failure()/report_success(): 세션 만료로 보이는 연속 실패(401/403, HTML 응답 등)가
+      STALE_FAILURE_THRESHOLD에 닿으면 즉시 갱신
+    refresh_count는 attach 이후(수집 중) 갱신 횟수, bootstrapped는 get()에서 새로 받았는지입니다.
+    """
+
+    def __init__(self, cache_path=COOKIE_CACHE_PATH, ttl: float = COOKIE_TTL,
+                 bootstrap: tuple = BOOTSTRAP_METHODS, failure_threshold: int = STALE_FAILURE_THRESHOLD):
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.bootstrap = bootstrap
+        self.failure_threshold = failure_threshold
+        self.cookies = {}
+        self.fetched_at = 0.0
+        self.refresh_count = 0
+        self.bootstrapped = False
+        self._stale_failures = 0
+        self._lock = asyncio.Lock()
+        self._session = None
+        self._task = None
+        self._stale_task = None
+        self._load_cache()
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def is_fresh(self) -> bool:
+        return bool(self.cookies) and self.age < self.ttl
+
+    def _load_cache(self):
+        if not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.cookies = data.get("cookies", {})
+            self.fetched_at = float(data.get("fetched_at", 0.0))
+        except (OSError, ValueError) as e:
+            logger.warning(f"쿠키 캐시를 읽지 못했습니다: {self.cache_path} ({e})")
+
+    def _save_cache(self):
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"     # 샤드 프로세스가 동시에 저장해도 섞이지 않도록
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"cookies": self.cookies, "fetched_at": self.fetched_at}, f)
+        os.replace(tmp_path, self.cache_path)
+
+    async def get(self) -> dict:
+        if self.is_fresh():
+            logger.info(f"✅ 캐시된 쿠키 {len(self.cookies)}개 사용 ({self.age / 60:.0f}분 경과)")
+            self.bootstrapped = False
+            return self.cookies
+        fetched_at = self.fetched_at
+        cookies = await self.refresh("캐시 없음/만료")
+        self.bootstrapped = self.fetched_at != fetched_at
+        return cookies
+
+    async def refresh(self, reason: str) -> dict:
+        """쿠키를 새로 받습니다. 동시에 여러 번 요청돼도 한 번만 갱신합니다. 실패 시 기존 쿠키를 유지합니다."""
+        requested_at = time.time()
+        async with self._lock:
+            if self.fetched_at >= requested_at:    # 기다리는 동안 다른 코루틴이 이미 갱신
+                return self.cookies
+            logger.info(f"🍪 쿠키 갱신 시작 ({reason})")
+            for method in self.bootstrap:
+                try:
+                    if method == "http":
+                        cookies = await fetch_cookies_http()
+                    else:
+                        cookies = await asyncio.to_thread(fetch_cookies_browser)
+                except Exception as e:
+                    logger.warning(f"쿠키 획득 실패 ({method}): {e}")
+                    continue
+                if not cookies:
+                    logger.warning(f"쿠키 획득 실패 ({method}): 받은 쿠키가 없습니다.")
+                    continue
+                self.cookies = cookies
+                self.fetched_at = time.time()
+                if self._session is not None:     # 시작 시 획득(get)은 수집 중 갱신으로 세지 않음
+                    self.refresh_count += 1
+                self._stale_failures = 0
+                self._save_cache()
+                self._apply_to_session()
+                logger.info(f"✅ 쿠키 {len(cookies)}개 획득 완료 ({method})")
+                return self.cookies
+            logger.error("❌ 쿠키 갱신 실패, 기존 쿠키를 계속 사용합니다.")
+            return self.cookies
+
+    # --- 수집 세션 연동 ---
+    def attach(self, session: aiohttp.ClientSession):
+        """세션에 쿠키를 넣고 백그라운드 갱신을 시작합니다. (이벤트 루프 안에서 호출)"""
+        self._session = session
+        self.refresh_count = 0
+        self._apply_to_session()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self):
+        # 주기 갱신과 만료 의심 갱신 모두 세션이 닫히기 전에 정리 (닫힌 세션에 쿠키를 넣지 않도록)
+        for task in (self._task, self._stale_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._stale_task = None
+        self._session = None
+
+    def _apply_to_session(self):
+        if self._session is None:
+            return
+        self._session.cookie_jar.clear()
+        self._session.cookie_jar.update_cookies(self.cookies, response_url=URL(BASE_URL))
+
+    async def _refresh_loop(self):
+        while True:
+            # 갱신에 실패해 쿠키가 오래된 상태면 REFRESH_RETRY_DELAY 간격으로 다시 시도
+            wait = max(REFRESH_RETRY_DELAY if self.age >= self.ttl * REFRESH_AHEAD else 1.0,
+                       self.ttl * REFRESH_AHEAD - self.age)
+            await asyncio.sleep(wait)
+            await self.refresh("TTL 도래")
+
+    def report_failure(self, reason: str):
+        """세션 만료로 보이는 응답을 기록합니다. 연속으로 임계치에 닿으면 백그라운드로 갱신합니다."""
+        self._stale_failures += 1
+        if self._stale_failures >= self.failure_threshold and not self._lock.locked():
+            logger.warning(f"세션 만료 의심 응답 {self._stale_failures}회 연속 ({reason}), 쿠키를 갱신합니다.")
+            self._stale_failures = 0
+            self._stale_task = asyncio.get_running_loop().create_task(self.refresh(f"세션 만료 의심: {reason}"))
+
+    def report_success(self):
+        self._stale_failures = 0
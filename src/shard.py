@@ -0,0 +1,149 @@
+# shard.py
+import os
+import json
+import socket
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+
+from src.common.logging_setup import setup_logging
+from src.common.paths import PROCESSED_DIR
+from src.session import CookieProvider
+
+logger = setup_logging(__name__)
+
+# ---------------------------------- 1. 설정
+SHARD_DIR = PROCESSED_DIR / "shards"
+SUM_FIELDS = ("requests", "succeeded", "failed", "retries", "saved", "cookie_refreshes")
+
+
+def shard_run_dir(start_date, end_date, shard_count: int):
+    """같은 날짜 범위/샤드 수의 실행은 (머신이 달라도) 같은 디렉터리에 샤드별 요약을 남깁니다."""
+    return SHARD_DIR / f"{start_date:%Y%m%d}_{end_date:%Y%m%d}_n{shard_count}"
+
+def save_shard_summary(summary: dict, run_dir) -> str:
+    os.makedirs(run_dir, exist_ok=True)
+    path = os.path.join(run_dir, f"shard_{summary['shard_index']}of{summary['shard_count']}.json")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ---------------------------------- 2. ✨ 샤드 1개 수집 (이 프로세스의 이벤트 루프/세션/쿠키 사용)
+async def collect_shard(start_date, end_date, shard_index: int, shard_count: int, use_route_map: bool = True,
+                        raw_format: str = "segment", keep_results: bool = True, negative_cache=None):
+    """
+    계획 중 shard_index번째 조각만 수집하고 요약을 SHARD_DIR에 저장합니다.
+    반환: (수집 결과 목록 또는 None, 요약 dict)
+    """
+    from src.collect import run_collect_async
+
+    summary = {"shard_index": shard_index, "shard_count": shard_count, "host": socket.gethostname(),
+               "pid": os.getpid(), "start_date": str(start_date), "end_date": str(end_date)}
+    collected_data = await run_collect_async(start_date, end_date, use_route_map=use_route_map, raw_format=raw_format,
+                                             shard=(shard_index, shard_count), keep_results=keep_results,
+                                             summary=summary, negative_cache=negative_cache)
+    try:
+        save_shard_summary(summary, shard_run_dir(start_date, end_date, shard_count))
+    except OSError as e:
+        logger.warning(f"샤드 요약을 저장하지 못했습니다: {e}")
+    return collected_data, summary
+
+def _shard_worker(start_date, end_date, shard_index, shard_count, use_route_map, raw_format, request_log_rate):
+    # 자식 프로세스마다 새 이벤트 루프와 aiohttp 세션을 만들고, 결과는 원본 파일로만 남김 (부모로 전달하지 않음)
+    if request_log_rate is not None:
+        from src.collect import REQUEST_LOG
+        REQUEST_LOG.rate = request_log_rate
+    _, summary = asyncio.run(collect_shard(start_date, end_date, shard_index, shard_count,
+                                           use_route_map=use_route_map, raw_format=raw_format, keep_results=False))
+    return summary
+
+
+# ---------------------------------- 3. 로컬 멀티 프로세스 실행 + 요약 병합
+def launch_local_shards(start_date, end_date, shard_count: int, use_route_map: bool = True,
+                        raw_format: str = "segment", request_log_rate: float = None) -> dict:
+    """
+    이 머신에서 shard_count개 프로세스로 나눠 수집합니다. (수집만 하며, 전처리/업로드는 호출한 쪽에서 원본 파일로 수행)
+    반환: merge_summaries 결과 (raw_files에 모든 샤드의 원본 파일 목록)
+    """
+    # 모든 샤드가 동시에 쿠키를 새로 받지 않도록 부모가 먼저 캐시를 채워 둠
+    asyncio.run(CookieProvider().get())
+
+    logger.info(f"🧩 로컬 샤드 {shard_count}개로 수집을 시작합니다.")
+    summaries = []
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=shard_count, mp_context=ctx) as pool:
+        futures = [pool.submit(_shard_worker, start_date, end_date, i, shard_count, use_route_map, raw_format,
+                               request_log_rate) for i in range(shard_count)]
+        for i, future in enumerate(futures):
+            try:
+                summaries.append(future.result())
+            except Exception as e:
+                logger.error(f"샤드 {i + 1}/{shard_count} 실행 실패: {e}")
+    merged = merge_summaries(summaries, shard_count)
+    log_merged_summary(merged)
+    return merged
+
+def load_shard_summaries(run_dir) -> list:
+    summaries = []
+    if not os.path.isdir(run_dir):
+        return summaries
+    for name in sorted(os.listdir(run_dir)):
+        if not (name.startswith("shard_") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(run_dir, name), "r", encoding="utf-8") as f:
+                summaries.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"샤드 요약을 읽지 못했습니다: {name} ({e})")
+    return summaries
+
+def merge_summaries(summaries: list, shard_count: int = None) -> dict:
+    """샤드별 요약을 합칩니다. 요약이 없는 샤드 번호는 missing_shards에 남깁니다."""
+    if shard_count is None:
+        shard_count = max((s["shard_count"] for s in summaries), default=0)
+    merged = {field: sum(s.get(field, 0) for s in summaries) for field in SUM_FIELDS}
+    merged.update({
+        "shard_count": shard_count,
+        "shards": len(summaries),
+        "missing_shards": sorted(set(range(shard_count)) - {s["shard_index"] for s in summaries}),
+        "hosts": sorted({s.get("host", "") for s in summaries}),
+        "elapsed_max": max((s.get("elapsed", 0.0) for s in summaries), default=0.0),
+        "raw_files": sorted(f for s in summaries for f in s.get("raw_files", [])),
+    })
+    return merged
+
+def log_merged_summary(merged: dict):
+    logger.info("=" * 50)
+    logger.info(f"🧩 샤드 수집 요약 ({merged['shards']}/{merged['shard_count']}개 샤드, 호스트 {len(merged['hosts'])}대)")
+    logger.info(f"  - 총 요청: {merged['requests']}건 (성공 {merged['succeeded']}, 실패 {merged['failed']}, "
+                f"재시도 {merged['retries']})")
+    logger.info(f"  - 저장한 원본 응답: {merged['saved']}건 (파일 {len(merged['raw_files'])}개)")
+    logger.info(f"  - 가장 느린 샤드 소요 시간: {merged['elapsed_max']:.2f} 초")
+    if merged["missing_shards"]:
+        logger.warning(f"  - ⚠️ 요약이 없는 샤드: {[i + 1 for i in merged['missing_shards']]}")
+    logger.info("=" * 50)
+
+
+@click.command(help="샤드별 수집 요약 병합 (여러 머신의 요약 파일을 한 디렉터리에 모은 뒤 실행)")
+@click.option("--run-dir", type=click.Path(exists=True, file_okay=False), required=True,
+              help="샤드 요약 디렉터리 (예: data/processed/shards/20251001_20251031_n4)")
+def cli_merge(run_dir):
+    summaries = load_shard_summaries(run_dir)
+    if not summaries:
+        logger.warning(f"샤드 요약이 없습니다: {run_dir}")
+        return
+    merged = merge_summaries(summaries)
+    log_merged_summary(merged)
+    path = os.path.join(run_dir, "merged.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(merged, f, ensure_ascii=False, indent=2)
+    logger.info(f"병합 요약 저장: {path}")
+
+
+if __name__ == "__main__":
+    cli_merge()
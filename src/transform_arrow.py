@@ -0,0 +1,188 @@
+# transform_arrow.py
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow as pa                # 선택 의존성: 없으면 preprocess가 pandas 엔진으로 처리
+    import pyarrow.compute as pc
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+from requirements.fields import FIELD_DTYPES
+from src.preprocess import (
+    DESC_MAP, CAR_DESC_ALIASES, AIRLINE_MAP, WE_CODE, WE_DESC, OP_CAR_CODE_MAP, OP_CAR_DESC_MAP,
+    CAR_STR_COLUMNS, NUMERIC_COLUMNS,
+)
+
+# ---------------------------------- 1. 설정
+ARROW_BATCH_ROWS = 131_072      # 스레드 하나가 처리할 행 수 (테이블 조각은 복사 없이 나눔)
+ARROW_THREADS = pa.cpu_count() if ARROW_AVAILABLE else 1
+STRING_INPUTS = ["depDesc", "arrDesc", "depCity", "arrCity", "depDate", "arrDate", "depTime", "arrTime",
+                 "carCode", "scraped_date"] + CAR_STR_COLUMNS
+NUMBER_PATTERN = r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$"     # pd.to_numeric이 받는 10진수 표기
+NULL_STRINGS = {"nan": "", "None": "", "NaT": ""}
+_INT_TYPES = {"int16": "int16", "int32": "int32"}
+
+
+# ---------------------------------- 2. 도우미 함수 (pandas 엔진의 한 줄 한 줄과 같은 의미)
+def _strings(s: pd.Series):
+    """pandas 컬럼 → arrow 문자열 배열 (결측은 null, 문자열이 아닌 값은 str()로 변환)"""
+    try:
+        arr = pa.array(s, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        arr = None
+    if arr is not None and (pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)):
+        return arr
+    if arr is not None and pa.types.is_null(arr.type):
+        return pa.nulls(len(s), pa.string())
+    return pa.array([None if v is None or v is pd.NA or v != v else str(v) for v in s], pa.string())
+
+def _numbers(s: pd.Series):
+    """숫자 컬럼은 그대로, 문자열/혼합 컬럼은 문자열 배열로"""
+    try:
+        arr = pa.array(s, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return _strings(s)
+    if pa.types.is_integer(arr.type) or pa.types.is_floating(arr.type) or pa.types.is_boolean(arr.type):
+        return arr
+    return _strings(s)
+
+def _lookup(arr, mapping: dict):
+    """Series.map(dict): 없는 값은 null"""
+    keys = pa.array(list(mapping.keys()), pa.string())
+    values = pa.array(list(mapping.values()), pa.string())
+    return pc.take(values, pc.index_in(arr, value_set=keys))
+
+def _replace(arr, mapping: dict):
+    """Series.replace(dict): 없는 값은 그대로"""
+    return pc.coalesce(_lookup(arr, mapping), arr)
+
+def _is_blank(arr):
+    return pc.fill_null(pc.equal(pc.utf8_trim_whitespace(arr), ""), False)
+
+def _clean(arr):
+    """결측 → "", strip, "nan"/"None"/"NaT" → "" """
+    return _replace(pc.utf8_trim_whitespace(pc.fill_null(arr, "")), NULL_STRINGS)
+
+def _parse_yyyymmdd(arr):
+    s = pc.replace_substring_regex(pc.utf8_trim_whitespace(arr), r"\.0$", "")
+    s = pc.if_else(pc.fill_null(pc.match_substring_regex(s, r"^\d{8}$"), False), s, pa.scalar(None, pa.string()))
+    return pc.strptime(s, format="%Y%m%d", unit="ns", error_is_null=True)
+
+def _day_names(ts):
+    return pc.utf8_upper(pc.strftime(ts, format="%a"))
+
+def _parse_minutes(arr):
+    """
+    schema.parse_minutes와 같은 규칙: "HH:MM:SS"/"HH:MM"/"HHMM"/"HMM" → 자정부터 지난 분 (잘못된 값은 null)
+    int16(스키마의 Int16 분)만 그대로 두고, 숫자로 온 HHMM은 _strings에서 이미 문자열로 바뀌어 들어옵니다.
+    """
+    if arr.type == pa.int16():
+        return arr
+    s = pc.replace_substring_regex(pc.utf8_trim_whitespace(arr), r"\.0$", "")
+    s = pc.replace_substring(s, ":", "")
+    s = pc.if_else(pc.equal(pc.utf8_length(s), 6), pc.utf8_slice_codeunits(s, 0, 4), s)
+    s = pc.utf8_lpad(s, 4, "0")
+    valid = pc.fill_null(pc.match_substring_regex(s, r"^\d{4}$"), False)
+    s = pc.if_else(valid, s, pa.scalar(None, pa.string()))
+    hh = pc.cast(pc.utf8_slice_codeunits(s, 0, 2), pa.int16())
+    mm = pc.cast(pc.utf8_slice_codeunits(s, 2, 4), pa.int16())
+    in_range = pc.and_(pc.less(hh, 24), pc.less(mm, 60))
+    minutes = pc.cast(pc.add(pc.multiply(hh, 60), mm), pa.int16())
+    return pc.if_else(in_range, minutes, pa.scalar(None, pa.int16()))
+
+def _to_int(arr, dtype: str):
+    """pd.to_numeric(errors="coerce").fillna(0).astype(dtype)"""
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        s = pc.utf8_trim_whitespace(arr)
+        valid = pc.fill_null(pc.match_substring_regex(s, NUMBER_PATTERN), False)
+        values = pc.cast(pc.if_else(valid, s, pa.scalar(None, pa.string())), pa.float64())
+    else:
+        values = pc.cast(arr, pa.float64())
+    return pc.cast(pc.fill_null(values, 0.0), _INT_TYPES[dtype], safe=False)
+
+
+# ---------------------------------- 3. ✨ 행 묶음 하나 정제 (pyarrow.compute 커널은 GIL을 놓으므로 스레드로 병렬 처리)
+def _transform_batch(t) -> dict:
+    out = {}
+    for col in ("depDesc", "arrDesc"):
+        city = "depCity" if col == "depDesc" else "arrCity"
+        desc = _replace(t[col], DESC_MAP)
+        out[col] = pc.if_else(_is_blank(desc), _lookup(t[city], DESC_MAP), desc)
+
+    for col, day_col in (("depDate", "depDay"), ("arrDate", "arrDay")):
+        out[col] = _parse_yyyymmdd(t[col])
+        out[day_col] = _day_names(out[col])
+
+    for col in ("depTime", "arrTime"):
+        out[col] = _parse_minutes(t[col])
+
+    car_code = t["carCode"]
+    official = _lookup(car_code, AIRLINE_MAP)
+    car_desc = _clean(_replace(t["carDesc"], CAR_DESC_ALIASES))
+    op_desc = _clean(t["opCarDesc"])
+    op_code = _clean(t["opCarCode"])
+
+    # 파라타항공(WE): 항공사 이름 보정, 운항 항공사 없음
+    we = pc.fill_null(pc.equal(car_code, WE_CODE), False)
+    fix_from_op = pc.and_(pc.and_(we, pc.equal(car_desc, "")), pc.equal(op_desc, WE_DESC))
+    car_desc = pc.if_else(fix_from_op, WE_DESC, car_desc)
+    car_desc = pc.if_else(pc.and_(we, pc.equal(car_desc, "")), official, car_desc)
+    op_code = pc.if_else(we, "", op_code)
+    op_desc = pc.if_else(we, "", op_desc)
+
+    # 표시 이름이 공식 이름과 다르면 공동운항 (OZ → BX, KE → LJ)
+    mismatch = pc.and_(pc.fill_null(pc.not_equal(car_desc, official), True), pc.invert(we))
+    op_code = pc.if_else(mismatch, _lookup(car_code, OP_CAR_CODE_MAP), op_code)
+    op_desc = pc.if_else(mismatch, car_desc, op_desc)
+    car_desc = pc.if_else(mismatch, official, car_desc)
+
+    op_keys = pa.array(list(OP_CAR_DESC_MAP.keys()), pa.string())
+    mask_op = pc.and_(pc.fill_null(pc.is_in(op_code, value_set=op_keys), False), _is_blank(op_desc))
+    op_desc = pc.if_else(mask_op, _lookup(op_code, OP_CAR_DESC_MAP), op_desc)
+    out.update({"carDesc": car_desc, "carDesc_official": official, "opCarCode": op_code, "opCarDesc": op_desc})
+
+    for col in NUMERIC_COLUMNS:
+        out[col] = _to_int(t[col], FIELD_DTYPES[col])
+
+    out["scraped_date"] = pc.strptime(t["scraped_date"], format="%Y-%m-%d", unit="ns", error_is_null=True)
+    total = pc.add(pc.add(pc.add(out["fare"], out["fuelChg"]), out["airTax"]), out["tasf"])
+    out["total_price"] = pc.cast(total, _INT_TYPES[FIELD_DTYPES["total_price"]], safe=False)
+    return out
+
+
+def clean_and_transform_arrow(df: pd.DataFrame, threads: int = None, batch_rows: int = ARROW_BATCH_ROWS):
+    """
+    preprocess._clean_and_transform_pandas와 같은 규칙을 pyarrow.compute로 적용합니다.
+    필요한 컬럼만 arrow로 한 번 옮기고, 행 묶음(복사 없는 조각)별로 threads개 스레드에서 처리한 뒤
+    바뀐 컬럼만 원래 데이터프레임에 돌려 넣습니다. (나머지 컬럼은 그대로)
+    """
+    n = len(df)
+    columns = {col: _strings(df[col]) if col in df.columns else pa.nulls(n, pa.string()) for col in STRING_INPUTS}
+    for col in ("depTime", "arrTime"):
+        if col in df.columns and isinstance(df[col].dtype, pd.Int16Dtype):
+            columns[col] = pa.array(df[col], type=pa.int16(), from_pandas=True)
+    for col in NUMERIC_COLUMNS:
+        columns[col] = _numbers(df[col])
+    table = pa.table(columns)
+
+    slices = [table.slice(start, batch_rows) for start in range(0, n, batch_rows)] or [table]
+    threads = min(threads or ARROW_THREADS, len(slices))
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            parts = list(pool.map(_transform_batch, slices))
+    else:
+        parts = [_transform_batch(t) for t in slices]
+
+    # 조각별 결과는 ChunkedArray이므로 테이블로 이어 붙임 (pa.chunked_array에 넘기면 값 단위로 다시 변환해 느림)
+    result = pa.concat_tables([pa.table(part) for part in parts])
+    frame = result.to_pandas(types_mapper={pa.int16(): pd.Int16Dtype()}.get, split_blocks=True, self_destruct=True)
+    # Int16 매핑은 결측이 있는 시간 컬럼에만 필요 (좌석 등 정수 컬럼은 원래 dtype으로)
+    for col in NUMERIC_COLUMNS:
+        frame[col] = frame[col].astype(FIELD_DTYPES[col])
+    frame.index = df.index
+    for col in frame.columns:
+        df[col] = frame[col]
+    return df
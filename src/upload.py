@@ -1,152 +1,480 @@
 # upload.py
+import io
 import os
+import time
+import random
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, Iterable, List
+import click
+import numpy as np
 import pandas as pd
+import psycopg2
 from sqlalchemy import create_engine
+from sqlalchemy import exc as sa_exc
 from psycopg2.extras import execute_values
 
 
 from src.common.logging_setup import setup_logging
 from src.common.paths import PROCESSED_DIR
 from src.common.config import DB_CONFIG
+from src.common.key_index import KeyIndex
+from src.common.checkpoint import LoadCheckpoint
+from src.common.metrics import METRICS, record_throughput, export_metrics
+from src.common.schema import (
+    FINAL_COLUMNS, DATE_COLUMNS, TIME_COLUMNS, CATEGORY_COLUMNS, STR_COLUMNS,
+    ensure_schema, minutes_to_time, to_output_strings,
+)
+from src.common.keys import key_hashes, UNIQUE_KEYS
 
 logger = setup_logging(__name__)
 
-TARGET_COLUMNS: List[str] = [
-    "agency_code", "code",
-    "depDate", "depDay", "depTime", "depCity", "depDesc",
-    "arrDate", "arrDay", "arrTime", "arrCity", "arrDesc",
-    "carCode", "carDesc", "opCarCode", "opCarDesc",
-    "mainFlt", "classCode", "classDesc", "seat",
-    "total_price", "fare", "fareOrigin", "fuelChg", "airTax", "tasf",
-    "scraped_date", "source_file"
-]
+# 업로드 완료 키 인덱스: 같은 날 같은 항공편을 두 번 보내지 않도록 scraped_date까지 키에 포함
+UPLOAD_KEYS: List[str] = UNIQUE_KEYS + ["scraped_date"]
+UPLOADED_KEYS_PATH = PROCESSED_DIR / "uploaded_keys.npy"
+
+TARGET_COLUMNS: List[str] = FINAL_COLUMNS
 
 DROP_COLUMNS = ["fareRecKey", "jejucomId", "itinInfo", "itinInfo2"]
 
+# 업로드 방식: copy = COPY로 스테이징 테이블에 적재 후 한 번에 병합, insert = 기존 execute_values
+UPLOAD_METHODS = ("copy", "insert")
+STAGING_TABLE = "flight_info_staging"   # UNLOGGED, 업로드 스레드별로 만들고 업로드가 끝나면 삭제
+
+# 병렬 업로드: 배치를 연결 풀 크기만큼의 스레드에 나눠 보내고, 실패한 배치는 격리
+UPLOAD_WORKERS = 4              # 동시 업로드 배치 수 (= 연결 풀 크기)
+UPLOAD_MAX_RETRIES = 3          # 일시적 오류(연결 끊김, 교착 등) 재시도 횟수
+UPLOAD_RETRY_DELAY = 2          # 재시도 기본 대기(초), 지수 백오프 + 지터
+QUARANTINE_DIR = PROCESSED_DIR / "quarantine"
+CHECKPOINT_DIR = PROCESSED_DIR / "upload_checkpoints"   # load_id별 커밋 구간 기록 (--resume)
+CSV_CHUNK_ROWS = 200_000        # CSV 업로드 시 한 번에 읽는 행 수
+
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+# 업로드 지표 (method: copy/insert)
+UPLOAD_ROWS = METRICS.counter("airline_upload_rows_total",
+                              "업로드 행 결과 (inserted: 신규, conflict: DB 중복, known: 키 인덱스로 생략, failed: 격리)",
+                              ("method", "result"))
+UPLOAD_RETRIES = METRICS.counter("airline_upload_retries_total", "배치 재시도 횟수", ("method",))
+UPLOAD_BATCH_SECONDS = METRICS.histogram("airline_upload_batch_seconds", "배치 하나의 전송/커밋 시간(초, 성공 배치)",
+                                         ("method",))
 
-def get_engine(db_config: Dict):
+
+def get_engine(db_config: Dict, pool_size: int = UPLOAD_WORKERS):
+    """
+    프로세스 전체에서 같은 연결 정보의 엔진(연결 풀)을 하나만 만들어 재사용합니다.
+    """
     url = (
         f"postgresql+psycopg2://{db_config['user']}:{db_config['password']}"
         f"@{db_config['host']}:{db_config['port']}/{db_config['database']}"
     )
-    return create_engine(url, pool_pre_ping=True)
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(url)
+        if engine is None:
+            engine = create_engine(url, pool_pre_ping=True, pool_size=pool_size, max_overflow=2)
+            _ENGINES[url] = engine
+    return engine
 
 def prepare_df_for_upload(df: pd.DataFrame) -> pd.DataFrame:
     """
     - 불필요 컬럼 삭제
-    - 날짜/시간/정수 컬럼 타입 정리
+    - 스키마 타입으로 정리 (preprocess 결과는 이미 타입이 맞아 다시 파싱하지 않음, CSV 입력은 한 번 변환)
     - 컬럼 순서 TARGET_COLUMNS로 정렬
+    DB 값(date/time/None)으로의 변환은 배치 단위로 upload_to_db에서 합니다.
     """
-    df = df.copy()
-
     # 1) 드롭
     existing_drop = [c for c in DROP_COLUMNS if c in df.columns]
     if existing_drop:
         df = df.drop(columns=existing_drop)
         logger.info(f"✅ 불필요 컬럼 제거: {existing_drop}")
 
-    # 2) 타입 정리 (preprocess에서 이미 처리했어도 안전망으로 한 번 더)
-    # 날짜
-    for dcol in ["depDate", "arrDate", "scraped_date"]:
-        if dcol in df.columns:
-            df[dcol] = pd.to_datetime(df[dcol], errors="coerce").dt.date
-
-    # 시간
-    for tcol in ["depTime", "arrTime"]:
-        if tcol in df.columns:
-            # 이미 datetime.time 이면 그대로, 문자열이면 변환
-            df[tcol] = pd.to_datetime(df[tcol].astype(str), errors="coerce", format="%H:%M:%S").dt.time
-
-    # 정수
-    for icol in ["seat", "total_price", "fare", "fareOrigin", "fuelChg", "airTax", "tasf"]:
-        if icol in df.columns:
-            df[icol] = pd.to_numeric(df[icol], errors="coerce").fillna(0).astype(int)
-
-    # 문자열 트림
-    str_cols = [
-        "agency_code", "code", "depDay", "depCity", "depDesc",
-        "arrDay", "arrCity", "arrDesc",
-        "carCode", "carDesc", "opCarCode", "opCarDesc",
-        "mainFlt", "classCode", "classDesc", "source_file"
-    ]
-    for scol in str_cols:
-        if scol in df.columns:
-            df[scol] = df[scol].astype(str).str.strip()
-            df[scol] = df[scol].replace({'': None})
-
-    # 3) 컬럼 순서 강제
+    # 2) 필수 컬럼 확인
     missing = [c for c in TARGET_COLUMNS if c not in df.columns]
     if missing:
         raise ValueError(f"업로드에 필요한 컬럼이 없습니다: {missing}")
 
-    df = df[TARGET_COLUMNS]
+    # 3) 타입 정리 + 컬럼 순서 강제
+    df = ensure_schema(df)[TARGET_COLUMNS]
     logger.info(f"✅ 업로드 준비 완료: {len(df)}행, 컬럼 {len(df.columns)}개")
     return df
 
+def to_db_values(batch: pd.DataFrame) -> pd.DataFrame:
+    """타입 프레임 → DB 전달 값 (날짜 date, 시간 time, 빈 문자열 None, 정수는 그대로)"""
+    out = batch.copy()
+    for col in DATE_COLUMNS:
+        out[col] = out[col].dt.date.astype(object).where(out[col].notna(), None)
+    for col in TIME_COLUMNS:
+        out[col] = minutes_to_time(out[col])
+    for col in CATEGORY_COLUMNS + STR_COLUMNS:
+        s = out[col].astype(object)
+        out[col] = s.where(s != "", None)
+    return out
+
 def to_tuples(df: pd.DataFrame) -> Iterable[tuple]:
     # 행 → 튜플 변환 (NaN → None)
     return (tuple(None if pd.isna(x) else x for x in row) for row in df.to_numpy())
 
-def upload_to_db(df: pd.DataFrame, engine, batch_size: int = 5000):
+def _quoted_columns() -> str:
+    return ", ".join(f'"{c}"' for c in TARGET_COLUMNS)
+
+def _new_stats() -> dict:
+    return {"inserted": 0, "skipped": 0, "failed": 0, "retries": 0, "quarantined": []}
+
+def _is_transient(e: Exception) -> bool:
+    """재시도할 만한 오류인지 (연결 끊김/타임아웃, 교착·직렬화 실패). 데이터 오류는 재시도하지 않습니다."""
+    if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+        return True
+    if isinstance(e, sa_exc.DBAPIError):
+        return e.connection_invalidated or isinstance(e.orig, (psycopg2.OperationalError, psycopg2.InterfaceError))
+    return False
+
+def _quarantine_batch(batch: pd.DataFrame, start: int, error: Exception) -> str:
     """
-    ON CONFLICT로 안전 삽입, 배치 처리, 실패 시 롤백
+    재시도해도 실패한 배치를 CSV로 격리합니다. (업로드 CSV와 같은 형식이라 run_upload_from_csv로 다시 보낼 수 있음)
+    """
+    QUARANTINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = QUARANTINE_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.getpid()}_{start}.csv"
+    to_output_strings(batch, TARGET_COLUMNS).to_csv(path, index=False, encoding="utf-8-sig")
+    logger.error(f"🚧 배치 격리 @ {start}: {len(batch)}행 → {path} ({type(error).__name__}: {error})")
+    return str(path)
+
+def _send_with_retries(send_batch, engine, batch: pd.DataFrame, start: int):
+    """한 배치를 보내고 (inserted, 재시도 횟수, 실패 예외 또는 None)을 반환합니다. (업로드 스레드에서 실행)"""
+    method = send_batch.__name__.strip("_").replace("_batch", "")
+    for attempt in range(UPLOAD_MAX_RETRIES + 1):
+        started = time.perf_counter()
+        try:
+            inserted = send_batch(engine, batch)
+            UPLOAD_BATCH_SECONDS.observe(time.perf_counter() - started, method=method)
+            return inserted, attempt, None
+        except Exception as e:
+            if not _is_transient(e) or attempt == UPLOAD_MAX_RETRIES:
+                return 0, attempt, e
+            delay = UPLOAD_RETRY_DELAY * (2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.warning(f"⚠️ 배치 업로드 일시 오류 @ {start} (재시도 {attempt + 1}/{UPLOAD_MAX_RETRIES}, "
+                           f"{delay:.1f}초 후): {e}")
+            time.sleep(delay)
+
+def _upload_batches(df: pd.DataFrame, engine, send_batch, batch_size: int, workers: int,
+                    on_batch_committed=None) -> dict:
+    """
+    배치를 workers개 스레드(연결 풀)에 나눠 보냅니다.
+    - 일시적 오류는 배치 단위로 재시도하고, 끝내 실패한 배치는 격리(QUARANTINE_DIR)한 뒤 나머지를 계속 진행
+    - on_batch_committed(start, end)는 커밋된 배치마다 호출 스레드에서 차례로 호출
+    반환: {"inserted", "skipped", "failed": 격리된 행 수, "retries", "quarantined": 격리 파일 목록}
+    """
+    stats = _new_stats()
+    total_rows = len(df)
+    done_rows = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="upload") as pool:
+        futures = {}
+        for start in range(0, total_rows, batch_size):
+            batch = df.iloc[start:start + batch_size]
+            futures[pool.submit(_send_with_retries, send_batch, engine, batch, start)] = (start, batch)
+
+        handled = set()
+        try:
+            for future in as_completed(futures):
+                handled.add(future)
+                start, batch = futures[future]
+                inserted, retries, error = future.result()
+                stats["retries"] += retries
+                done_rows += len(batch)
+                if error is not None:
+                    stats["failed"] += len(batch)
+                    stats["quarantined"].append(_quarantine_batch(batch, start, error))
+                    continue
+                stats["inserted"] += inserted
+                stats["skipped"] += len(batch) - inserted
+                logger.info(f"✅ {done_rows}/{total_rows}행 처리 (배치 @ {start}: 신규 {inserted}건)")
+                if on_batch_committed is not None:
+                    on_batch_committed(start, start + len(batch))
+        except BaseException:
+            # 중단 시 아직 시작하지 않은 배치는 보내지 않고, 이미 보내던 배치는 끝난 뒤 커밋 여부를 기록
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future, (start, batch) in futures.items():
+                if future in handled or future.cancelled() or future.exception() is not None:
+                    continue
+                if future.result()[2] is None and on_batch_committed is not None:
+                    on_batch_committed(start, start + len(batch))
+            raise
+
+    return stats
+
+def _insert_batch(engine, batch: pd.DataFrame) -> int:
+    """execute_values로 배치 하나를 삽입하고 신규 삽입 수를 반환합니다. (실패 시 롤백 후 예외)"""
+    insert_sql = f"""
+    INSERT INTO "flight_info" ({_quoted_columns()}) VALUES %s
+    ON CONFLICT ON CONSTRAINT "unique_flight" DO NOTHING;
+    """
+    tuples = list(to_tuples(to_db_values(batch)))
+    with engine.begin() as conn:
+        raw_conn = conn.connection
+        cursor = raw_conn.cursor()
+        try:
+            # page_size=배치 크기라 배치당 INSERT 한 번 → rowcount가 배치의 신규 삽입 수
+            execute_values(cursor, insert_sql, tuples, page_size=len(tuples))
+            inserted = max(cursor.rowcount, 0)
+            raw_conn.commit()
+            return inserted
+        except Exception:
+            raw_conn.rollback()
+            raise
+
+def upload_to_db(df: pd.DataFrame, engine, batch_size: int = 5000, on_batch_committed=None,
+                 workers: int = UPLOAD_WORKERS) -> dict:
+    """
+    ON CONFLICT로 안전 삽입, 배치 처리(workers개 연결로 병렬), 실패 배치는 롤백 후 재시도/격리
+    on_batch_committed(start, end): 배치 커밋 직후 호출 (df 기준 행 범위)
+    반환: {"inserted", "skipped", "failed", "retries", "quarantined"}
     """
     if df.empty:
         logger.warning("⚠️ 업로드할 데이터가 없습니다.")
-        return
+        return _new_stats()
 
-    insert_sql = """
-    INSERT INTO "flight_info" (
-        "agency_code", "code", "depDate", "depDay", "depTime", "depCity", "depDesc",
-        "arrDate", "arrDay", "arrTime", "arrCity", "arrDesc",
-        "carCode", "carDesc", "opCarCode", "opCarDesc",
-        "mainFlt", "classCode", "classDesc", "seat",
-        "total_price", "fare", "fareOrigin", "fuelChg", "airTax", "tasf",
-        "scraped_date", "source_file"
-    ) VALUES %s
-    ON CONFLICT ON CONSTRAINT "unique_flight" DO NOTHING;
+    logger.info(f"📤 업로드 시작: {len(df)}건 (배치 {batch_size}, 동시 {workers})")
+    stats = _upload_batches(df, engine, _insert_batch, batch_size, workers, on_batch_committed)
+    logger.info("🎉 전체 업로드 완료")
+    return stats
+
+def _to_copy_buffer(batch: pd.DataFrame) -> io.StringIO:
+    """
+    타입 프레임 → COPY용 CSV 텍스트 (날짜 YYYY-MM-DD, 시간 HH:MM:SS)
+    빈 문자열/결측은 따옴표 없는 빈 칸으로 쓰여 NULL로 적재됩니다. (insert 방식의 ""→None과 동일)
     """
+    buf = io.StringIO()
+    to_output_strings(batch, TARGET_COLUMNS).to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    return buf
 
-    total_rows = len(df)
-    logger.info(f"📤 업로드 시작: {total_rows}건 (배치 {batch_size})")
+def _staging_table_name() -> str:
+    """프로세스/업로드 스레드별 스테이징 테이블 이름 (스레드끼리 TRUNCATE가 겹치지 않도록)"""
+    worker = threading.current_thread().name.rsplit("_", 1)[-1]
+    return f"{STAGING_TABLE}_{os.getpid()}_{worker}"
 
-    for start in range(0, total_rows, batch_size):
-        batch = df.iloc[start:start + batch_size]
-        tuples = list(to_tuples(batch))
+def _copy_batch(engine, batch: pd.DataFrame) -> int:
+    """
+    COPY FROM STDIN으로 UNLOGGED 스테이징 테이블에 적재한 뒤,
+    INSERT ... SELECT ... ON CONFLICT DO NOTHING 한 번으로 flight_info에 병합합니다.
+    (생성 → TRUNCATE → COPY → 병합)을 한 트랜잭션으로 처리하고 신규 삽입 수를 반환합니다. (실패 시 롤백 후 예외)
+    """
+    staging_table = _staging_table_name()
+    columns = _quoted_columns()
+    create_sql = (f'CREATE UNLOGGED TABLE IF NOT EXISTS "{staging_table}" AS '
+                  f'SELECT {columns} FROM "flight_info" WITH NO DATA;')
+    copy_sql = f'COPY "{staging_table}" ({columns}) FROM STDIN WITH (FORMAT csv);'
+    merge_sql = f"""
+    INSERT INTO "flight_info" ({columns})
+    SELECT {columns} FROM "{staging_table}"
+    ON CONFLICT ON CONSTRAINT "unique_flight" DO NOTHING;
+    """
+    buf = _to_copy_buffer(batch)
+    with engine.begin() as conn:
+        raw_conn = conn.connection
+        cursor = raw_conn.cursor()
+        try:
+            cursor.execute(create_sql)
+            cursor.execute(f'TRUNCATE "{staging_table}";')
+            cursor.copy_expert(copy_sql, buf)
+            cursor.execute(merge_sql)
+            inserted = max(cursor.rowcount, 0)
+            raw_conn.commit()
+            return inserted
+        except Exception:
+            raw_conn.rollback()
+            raise
 
+def _drop_staging_tables(engine):
+    """이 프로세스가 만든 스테이징 테이블 삭제"""
+    pattern = f"{STAGING_TABLE}_{os.getpid()}_%"
+    try:
         with engine.begin() as conn:
             raw_conn = conn.connection
             cursor = raw_conn.cursor()
-            try:
-                execute_values(cursor, insert_sql, tuples, page_size=batch_size)
-                raw_conn.commit()
-                logger.info(f"✅ {start + len(batch)}/{total_rows}행 업로드 완료")
-            except Exception as e:
-                raw_conn.rollback()
-                logger.error(f"❌ 배치 업로드 실패 @ {start}: {e}", exc_info=True)
-                raise
+            cursor.execute("SELECT tablename FROM pg_tables WHERE tablename LIKE %s;", (pattern,))
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'DROP TABLE IF EXISTS "{name}";')
+            raw_conn.commit()
+    except Exception as e:
+        logger.warning(f"⚠️ 스테이징 테이블 삭제 실패: {pattern} ({e})")
 
+def upload_to_db_copy(df: pd.DataFrame, engine, batch_size: int = 50000, on_batch_committed=None,
+                      workers: int = UPLOAD_WORKERS) -> dict:
+    """
+    배치마다 스테이징 테이블 COPY + 병합(_copy_batch)을 workers개 연결로 병렬 실행합니다.
+    실패 배치는 롤백 후 재시도/격리하고, 끝나면 스테이징 테이블을 삭제합니다.
+    on_batch_committed(start, end): 배치 커밋 직후 호출 (df 기준 행 범위)
+    반환: {"inserted", "skipped", "failed", "retries", "quarantined"}
+    """
+    if df.empty:
+        logger.warning("⚠️ 업로드할 데이터가 없습니다.")
+        return _new_stats()
+
+    logger.info(f"📤 COPY 업로드 시작: {len(df)}건 (배치 {batch_size}, 동시 {workers})")
+    try:
+        stats = _upload_batches(df, engine, _copy_batch, batch_size, workers, on_batch_committed)
+    finally:
+        _drop_staging_tables(engine)
     logger.info("🎉 전체 업로드 완료")
+    return stats
 
-def run_upload(df: pd.DataFrame, batch_size: int = 5000):
+UPLOADERS = {"copy": upload_to_db_copy, "insert": upload_to_db}
+
+def _log_upload_stats(stats: dict, known: int = 0):
+    logger.info(f"📊 업로드 결과: 신규 {stats['inserted']}건, DB 중복 {stats['skipped']}건, "
+                f"키 인덱스로 건너뜀 {known}건, 재시도 {stats['retries']}회")
+    if stats["failed"]:
+        logger.error(f"🚧 실패 배치 {len(stats['quarantined'])}개({stats['failed']}행)를 {QUARANTINE_DIR}에 격리했습니다. "
+                     f"원인 해결 후 run_upload_from_csv로 다시 업로드하세요.")
+
+def upload_prepared(df_prepared: pd.DataFrame, engine, batch_size: int = 5000, skip_uploaded: bool = True,
+                    method: str = "insert", workers: int = UPLOAD_WORKERS, checkpoint: LoadCheckpoint = None,
+                    row_offset: int = 0, key_index: KeyIndex = None) -> dict:
+    """
+    업로드 완료 키 인덱스로 이미 보낸 행을 ON CONFLICT에 닿기 전에 걸러내고 업로드합니다.
+    커밋된 배치의 키는 인덱스에 바로 반영합니다.
+    (DB를 비우는 등 인덱스와 DB가 어긋나면 UPLOADED_KEYS_PATH 파일을 지우면 됩니다)
+    격리된 배치의 키는 인덱스에 넣지 않으므로 다시 업로드할 수 있습니다.
+    checkpoint를 주면 이미 커밋된 행(입력 행 번호 기준)은 보내지 않고, 커밋된 배치마다 체크포인트에 기록합니다.
+    (청크 업로드는 row_offset으로 청크의 시작 행 번호를, key_index로 청크 간에 공유할 인덱스를 넘깁니다)
+    method: "copy"(스테이징 COPY + 병합) 또는 "insert"(execute_values), workers: 동시 업로드 배치 수
+    반환: {"inserted", "skipped", "failed", "retries", "quarantined"}
+    """
+    if method not in UPLOADERS:
+        raise ValueError(f"지원하지 않는 업로드 방식입니다: {method} (가능: {UPLOAD_METHODS})")
+    uploader = UPLOADERS[method]
+    positions = np.arange(row_offset, row_offset + len(df_prepared))
+
+    if checkpoint is not None:
+        done = checkpoint.committed_mask(len(df_prepared), row_offset)
+        if done.any():
+            logger.info(f"⏭️ 체크포인트({checkpoint.load_id})에 커밋된 {int(done.sum())}건을 건너뜁니다.")
+            df_prepared = df_prepared[~done].reset_index(drop=True)
+            positions = positions[~done]
+
+    index, hashes, known_count = None, None, 0
+    if skip_uploaded:
+        index = key_index if key_index is not None else KeyIndex(UPLOADED_KEYS_PATH)
+        hashes = key_hashes(df_prepared, UPLOAD_KEYS)
+        known = index.contains(hashes)
+        known_count = int(known.sum())
+        if known.any():
+            logger.info(f"⏭️ 이미 업로드된 {known_count}건을 건너뜁니다.")
+            if checkpoint is not None:
+                checkpoint.mark_rows(positions[known])
+            df_prepared = df_prepared[~known].reset_index(drop=True)
+            hashes = hashes[~known]
+            positions = positions[~known]
+
+    def _mark(start, end):
+        if index is not None:
+            index.add(hashes[start:end])
+        if checkpoint is not None:
+            checkpoint.mark_rows(positions[start:end])
+
+    started = time.perf_counter()
+    try:
+        stats = uploader(df_prepared, engine, batch_size=batch_size, on_batch_committed=_mark, workers=workers)
+    finally:
+        if index is not None:
+            index.save()
+    record_throughput("upload", method, len(df_prepared), time.perf_counter() - started)
+    for result, count in (("inserted", stats["inserted"]), ("conflict", stats["skipped"]),
+                          ("known", known_count), ("failed", stats["failed"])):
+        UPLOAD_ROWS.inc(count, method=method, result=result)
+    UPLOAD_RETRIES.inc(stats["retries"], method=method)
+    _log_upload_stats(stats, known_count)
+    return stats
+
+def run_upload(df: pd.DataFrame, batch_size: int = 5000, skip_uploaded: bool = True, method: str = "insert",
+               workers: int = UPLOAD_WORKERS, checkpoint: LoadCheckpoint = None):
     logger.info("DB 업로드 시작")
     if df is None or df.empty:
         logger.warning("⚠️ 입력 DataFrame이 비어있습니다. 업로드 중단.")
         return
 
     df_prepared = prepare_df_for_upload(df)
-    engine = get_engine(DB_CONFIG)
+    engine = get_engine(DB_CONFIG, pool_size=workers)
     logger.info("✅ DB 연결 성공")
-    upload_to_db(df_prepared, engine, batch_size=batch_size)
+    stats = upload_prepared(df_prepared, engine, batch_size=batch_size, skip_uploaded=skip_uploaded, method=method,
+                            workers=workers, checkpoint=checkpoint)
     logger.info("DB 업로드 완료")
+    return stats
+
+def _csv_fingerprint(csv_path) -> dict:
+    stat = os.stat(csv_path)
+    return {"size": stat.st_size, "mtime": int(stat.st_mtime)}
+
+def _open_checkpoint(csv_path, method: str, resume: bool, load_id: str = None) -> LoadCheckpoint:
+    """--resume이면 같은 CSV의 미완료 체크포인트를 이어 쓰고, 없으면 새 load_id로 시작합니다."""
+    source = os.path.abspath(str(csv_path))
+    fingerprint = _csv_fingerprint(csv_path)
+    if resume or load_id:
+        checkpoint = LoadCheckpoint.find_resumable(CHECKPOINT_DIR, source, fingerprint, load_id)
+        if checkpoint is not None:
+            logger.info(f"🔁 업로드 재개: load_id={checkpoint.load_id}, 커밋된 행 {checkpoint.committed_rows}건")
+            return checkpoint
+        logger.warning("⚠️ 재개할 체크포인트가 없거나 CSV가 바뀌었습니다. 처음부터 업로드합니다.")
+    checkpoint = LoadCheckpoint.create(CHECKPOINT_DIR, source, fingerprint, method)
+    logger.info(f"🆔 load_id={checkpoint.load_id} (체크포인트: {checkpoint.path})")
+    return checkpoint
+
+def run_upload_from_csv(csv_path: str, batch_size: int = 5000, method: str = "insert",
+                        workers: int = UPLOAD_WORKERS, resume: bool = False, load_id: str = None,
+                        chunk_rows: int = CSV_CHUNK_ROWS):
+    """
+    CSV를 chunk_rows행씩 읽어 청크마다 준비/업로드합니다. 메모리는 파일 크기와 무관하게 청크 크기에만 비례합니다.
+    엔진, 업로드 완료 키 인덱스, 체크포인트는 청크 간에 공유합니다. (체크포인트 행 번호는 파일 기준)
+    """
+    checkpoint = _open_checkpoint(csv_path, method, resume, load_id)
+    engine = get_engine(DB_CONFIG, pool_size=workers)
+    key_index = KeyIndex(UPLOADED_KEYS_PATH)
+    totals = _new_stats()
+    row_offset = 0
+    logger.info(f"📄 CSV 청크 업로드 시작: {csv_path} (청크 {chunk_rows}행)")
+
+    reader = pd.read_csv(csv_path, encoding="utf-8-sig", keep_default_na=False, dtype=str, chunksize=chunk_rows)
+    for chunk in reader:
+        n = len(chunk)
+        if checkpoint.committed_mask(n, row_offset).all():
+            logger.info(f"⏭️ {row_offset}~{row_offset + n}행: 체크포인트에 모두 커밋되어 건너뜁니다.")
+        else:
+            df_prepared = prepare_df_for_upload(chunk)
+            stats = upload_prepared(df_prepared, engine, batch_size=batch_size, method=method, workers=workers,
+                                    checkpoint=checkpoint, row_offset=row_offset, key_index=key_index)
+            for key in ("inserted", "skipped", "failed", "retries", "quarantined"):
+                totals[key] += stats[key]
+        row_offset += n
+        logger.info(f"✅ CSV {row_offset}행까지 처리")
+
+    checkpoint.finish("partial" if totals["failed"] else "done")
+    logger.info(f"🏁 load_id={checkpoint.load_id} 상태: {checkpoint.status} "
+                f"(전체 {row_offset}행, 신규 {totals['inserted']}건, 격리 {totals['failed']}행)")
+    return totals
+
 
-def run_upload_from_csv(csv_path: str, batch_size: int = 5000):
-    df = pd.read_csv(csv_path, encoding="utf-8-sig", keep_default_na=False)
-    logger.info(f"✅ CSV 로드 완료: {len(df)}행 from {csv_path}")
-    run_upload(df, batch_size=batch_size)
+@click.command(help="전처리 CSV를 DB에 업로드 (중단된 업로드는 --resume으로 이어서)")
+@click.option("--csv", "csv_path", type=click.Path(exists=True, dir_okay=False),
+              default=str(PROCESSED_DIR / "preprocessing_data.csv"), show_default=True, help="업로드할 CSV")
+@click.option("--method", type=click.Choice(list(UPLOAD_METHODS)), default="insert", show_default=True,
+              help="업로드 방식 (copy: 스테이징 COPY + 병합, insert: execute_values)")
+@click.option("--workers", default=UPLOAD_WORKERS, show_default=True, help="동시에 업로드할 배치 수")
+@click.option("--batch-size", default=5000, show_default=True, help="배치 크기 (행 수)")
+@click.option("--chunk-rows", default=CSV_CHUNK_ROWS, show_default=True,
+              help="CSV를 한 번에 읽어 업로드할 행 수 (메모리 사용량 상한)")
+@click.option("--resume", is_flag=True, help="같은 CSV의 마지막 미완료 업로드를 커밋되지 않은 행부터 이어서 실행")
+@click.option("--load-id", default=None, help="이어서 실행할 업로드의 load_id (기본: 가장 최근 미완료)")
+def cli_upload(csv_path, method, workers, batch_size, chunk_rows, resume, load_id):
+    try:
+        run_upload_from_csv(csv_path, batch_size=batch_size, method=method, workers=workers,
+                            resume=resume, load_id=load_id, chunk_rows=chunk_rows)
+    finally:
+        export_metrics("upload", {"args": {"csv": csv_path, "method": method, "workers": workers,
+                                           "batch_size": batch_size}})
 
 
 if __name__ == "__main__":
-    run_upload_from_csv(PROCESSED_DIR/"preprocessing_data.csv")
-    pass
\ No newline at end of file
+    cli_upload()
@@ -0,0 +1,19 @@
+# tests/test_cli.py
+import pytest
+from click.testing import CliRunner
+
+from main import cli_main
+
+
+@pytest.mark.parametrize("extra", [
+    ["--stream"],
+    ["--shard-index", "0", "--shard-count", "2"],
+    ["--local-shards", "2"],
+    ["--start-date", "20991001", "--end-date", "20991002"],
+])
+def test_daemon_rejects_ignored_options(extra, monkeypatch):
+    # 검증에 걸리지 않으면 데몬이 실제로 돌지 않도록 막아 둠
+    monkeypatch.setattr("main.run_daemon", lambda *a, **k: pytest.fail("run_daemon이 호출되면 안 됩니다."))
+    result = CliRunner().invoke(cli_main, ["--daemon", *extra])
+    assert result.exit_code == 2
+    assert "--daemon과 함께 쓸 수 없는 옵션" in result.output
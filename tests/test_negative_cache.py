@@ -0,0 +1,33 @@
+# tests/test_negative_cache.py
+import pytest
+
+from src.negative_cache import NegativeCache, header_status
+
+PARAMS = {"pDep": "GMP", "pArr": "CJU", "pDepDate": "20991001", "comp": "LT"}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ({"errorCode": "0", "cnt": 0}, True),
+    ({"errorCode": "0", "cnt": "0"}, True),
+    ({"errorCode": "0", "cnt": 3}, False),
+    ({"errorCode": "E999", "cnt": 0}, None),        # 서버 오류 (일시적일 수 있음)
+    ({"errorCode": "0"}, None),                      # 편수 없음
+    ({"errorCode": "0", "cnt": "x"}, None),
+    ({}, None),
+    (None, None),
+])
+def test_header_status(header, expected):
+    assert header_status(header) is expected
+
+def test_observe_ignores_undecidable_responses(tmp_path):
+    cache = NegativeCache(path=tmp_path / "negative_cache.json")
+    cache.observe(PARAMS, None, now=0.0)
+    cache.observe(PARAMS, {"errorCode": "E999", "cnt": 0}, now=0.0)
+    assert len(cache) == 0
+
+    cache.observe(PARAMS, {"errorCode": "0", "cnt": 0}, now=0.0)
+    assert len(cache) == 1
+    cache.observe(PARAMS, {"errorCode": "E999", "cnt": 0}, now=1.0)     # 오류 응답은 기존 기록도 바꾸지 않음
+    assert cache.entries["GMP-CJU-20991001-LT"] == [0.0, 1]
+    cache.observe(PARAMS, {"errorCode": "0", "cnt": 2}, now=2.0)
+    assert len(cache) == 0
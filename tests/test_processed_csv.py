@@ -0,0 +1,41 @@
+# tests/test_processed_csv.py
+import pandas as pd
+
+from src.preprocess import preprocess_batch, save_processed_csv
+
+FLIGHT = {"code": "OZ1001", "mainFlt": "OZ1001", "depDesc": "김포", "depCity": "GMP", "depDate": "20251001",
+          "depTime": "0730", "arrDesc": "제주", "arrCity": "CJU", "arrDate": "20251001", "arrTime": "0835",
+          "carCode": "OZ", "carDesc": "아시아나항공", "opCarCode": "", "opCarDesc": "", "classDesc": "할인석",
+          "classCode": "S", "fareOrigin": "60000", "fare": "50000", "fuelChg": "7700", "airTax": "4000", "tasf": "0",
+          "seat": "9"}
+
+
+def batch(scraped_date: str, fares: dict) -> pd.DataFrame:
+    """fares: {편명: 요금} → 수집일 하나의 전처리 결과"""
+    flights = [dict(FLIGHT, code=code, mainFlt=code, fare=str(fare)) for code, fare in fares.items()]
+    return preprocess_batch([{"filepath": f"data/raw/{scraped_date}/x.json", "raw_data": {"data": {"data": flights}},
+                              "agency_code": "LT", "scraped_date": scraped_date}])
+
+def read(path) -> pd.DataFrame:
+    return pd.read_csv(path, dtype=str, encoding="utf-8-sig").set_index("code").sort_index()
+
+
+def test_csv_keeps_last_observation_per_flight(tmp_path):
+    path = tmp_path / "preprocessing_data.csv"
+    assert save_processed_csv(batch("2025-09-29", {"OZ1001": 50000, "OZ1002": 60000}), path)
+    assert save_processed_csv(batch("2025-09-30", {"OZ1003": 70000}), path)              # 새 키만: 이어 쓰기
+    assert save_processed_csv(batch("2025-09-30", {"OZ1001": 55000, "OZ1004": 80000}), path)
+
+    df = read(path)
+    assert list(df.index) == ["OZ1001", "OZ1002", "OZ1003", "OZ1004"]
+    assert df.loc["OZ1001", "fare"] == "55000"
+    assert df.loc["OZ1001", "scraped_date"] == "2025-09-30"
+    assert df.loc["OZ1002", "fare"] == "60000"
+
+def test_csv_key_index_rebuilt_from_existing_csv(tmp_path):
+    path = tmp_path / "preprocessing_data.csv"
+    assert save_processed_csv(batch("2025-09-29", {"OZ1001": 50000}), path)
+    (tmp_path / "preprocessing_data.keys.npy").unlink()
+    assert save_processed_csv(batch("2025-09-30", {"OZ1001": 51000}), path)
+    df = read(path)
+    assert len(df) == 1 and df.loc["OZ1001", "fare"] == "51000"
@@ -0,0 +1,28 @@
+# tests/test_processed_store.py
+import os
+
+import pandas as pd
+
+from src.common.keys import UNIQUE_KEYS
+from src.processed_store import write_partitions, read_store, list_partitions, PARTITION_COL
+from tests.test_processed_csv import batch
+
+
+def test_rows_without_dep_date_are_not_stored(tmp_path):
+    df = batch("2025-09-30", {"OZ1001": 50000, "OZ1002": 60000, "OZ1003": 70000})
+    df.loc[df["code"] == "OZ1003", PARTITION_COL] = pd.NaT
+    stats = write_partitions(df, UNIQUE_KEYS, tmp_path)
+    assert stats["dropped"] == 1 and stats["new_rows"] == 2
+    assert list_partitions(tmp_path) == ["2025-10-01"]
+
+def test_read_store_date_range_ignores_non_date_partitions(tmp_path):
+    write_partitions(batch("2025-09-30", {"OZ1001": 50000}), UNIQUE_KEYS, tmp_path)
+    # 이전 버전이 남긴 출발일 없는 파티션
+    legacy = tmp_path / f"{PARTITION_COL}=unknown"
+    os.makedirs(legacy)
+    pd.read_parquet(tmp_path / f"{PARTITION_COL}=2025-10-01").assign(code="LEGACY").to_parquet(legacy / "part-0.parquet")
+
+    assert list(read_store(dep_date_from="2025-10-01", store_dir=tmp_path)["code"]) == ["OZ1001"]
+    assert read_store(dep_date_from="2025-10-02", store_dir=tmp_path).empty
+    assert list(read_store(store_dir=tmp_path)["code"]) == ["OZ1001"]
+    assert read_store(dep_date_to="2025-10-01", store_dir=tmp_path)[PARTITION_COL].dt.day.tolist() == [1]
@@ -0,0 +1,29 @@
+# tests/test_raw_writer.py
+import asyncio
+
+import pytest
+
+from src.raw_writer import RawWriter
+
+
+def _meta(i):
+    return {"dep": "GMP", "arr": "CJU", "depDate": "20991001", "agent": f"A{i}", "acq_date": "2099-09-01"}
+
+
+def test_unexpected_error_is_raised_from_close(tmp_path, monkeypatch):
+    def broken(self, items):
+        raise RuntimeError("disk exploded")
+
+    monkeypatch.setattr(RawWriter, "_write_segments", broken)
+    writer = RawWriter(str(tmp_path), max_queue=2, batch_size=1)
+
+    async def scenario():
+        # 큐보다 많이 넣어도 쓰기 스레드가 계속 비우므로 막히지 않아야 함
+        for i in range(10):
+            await asyncio.wait_for(writer.submit(_meta(i), b'{"data": {}}'), timeout=5)
+        await asyncio.wait_for(writer.aclose(), timeout=5)
+
+    with pytest.raises(RuntimeError, match="disk exploded"):
+        asyncio.run(scenario())
+    assert writer.failed == 10
+    assert writer.written == 0
@@ -0,0 +1,42 @@
+# tests/test_schema.py
+import pandas as pd
+import pytest
+
+from src.common.schema import parse_minutes, apply_schema
+from src.preprocess import _create_dataframe_from_list, _clean_and_transform_data
+
+
+def _minutes(values):
+    return [None if v is pd.NA else int(v) for v in values]
+
+
+@pytest.mark.parametrize("series", [
+    pd.Series([730, 905, 1405, 5]),                                 # int64 (JSON 숫자)
+    pd.Series([730, 905, 1405, 5], dtype="Int64"),
+    pd.Series([730.0, 905.0, 1405.0, 5.0]),
+    pd.Series([730, "0905", "14:05", "0005"], dtype=object),        # 숫자/문자열 혼합
+    pd.Series(["730", "0905", "14:05:00", "5"]),
+])
+def test_parse_minutes_reads_numbers_as_hhmm(series):
+    assert _minutes(parse_minutes(series)) == [450, 545, 845, 5]
+
+def test_parse_minutes_keeps_schema_minutes():
+    s = pd.Series([450, pd.NA, 1439], dtype="Int16")
+    assert parse_minutes(s) is s
+    assert _minutes(apply_schema(pd.DataFrame({"depTime": s}))["depTime"]) == [450, None, 1439]
+
+def test_parse_minutes_invalid_values():
+    s = pd.Series([2460, 1299, None, "abc", 12345], dtype=object)
+    assert parse_minutes(s).isna().all()
+
+def test_clean_integer_hhmm_times():
+    flight = {"code": "OZ1001", "depCity": "GMP", "arrCity": "CJU", "depDesc": "김포", "arrDesc": "제주",
+              "depDate": "20251001", "arrDate": "20251001", "depTime": 730, "arrTime": 905,
+              "carCode": "OZ", "carDesc": "아시아나항공", "opCarCode": "", "opCarDesc": "", "mainFlt": "OZ1001",
+              "classCode": "S", "classDesc": "할인석", "fare": 50000, "fareOrigin": 60000, "fuelChg": 7700,
+              "airTax": 4000, "tasf": 0, "seat": 9}
+    data = [{"filepath": "data/raw/2025-10-01/x.json", "raw_data": {"data": {"data": [flight]}},
+             "agency_code": "LT", "scraped_date": "2025-10-01"}]
+    df = _clean_and_transform_data(_create_dataframe_from_list(data), engine="pandas")
+    assert _minutes(df["depTime"]) == [450]
+    assert _minutes(df["arrTime"]) == [545]
@@ -0,0 +1,30 @@
+# tests/test_session.py
+import asyncio
+
+import aiohttp
+
+from src.session import CookieProvider
+
+
+def test_aclose_cancels_stale_refresh(tmp_path):
+    async def scenario():
+        provider = CookieProvider(cache_path=str(tmp_path / "cookies.json"))
+        started = asyncio.Event()
+
+        async def slow_refresh(reason):
+            started.set()
+            await asyncio.sleep(60)
+
+        provider.refresh = slow_refresh
+        async with aiohttp.ClientSession() as session:
+            provider.attach(session)
+            for _ in range(provider.failure_threshold):
+                provider.report_failure("HTTP 401")
+            await started.wait()
+            stale = provider._stale_task
+            await asyncio.wait_for(provider.aclose(), timeout=5)
+        return stale, provider._stale_task
+
+    stale, after = asyncio.run(scenario())
+    assert stale.cancelled()
+    assert after is None
@@ -0,0 +1,69 @@
+# tests/test_transform_parity.py
+"""정제 엔진(pandas/arrow) 동일성: 고정 픽스처(경계값 응답, 기록된 원본 세그먼트)로 _format_final_df 결과를 비교"""
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.common.raw_archive import find_segments
+from src.preprocess import (_create_dataframe_from_list, _load_data_from_segments, _clean_and_transform_data,
+                            _format_final_df, TRANSFORM_ENGINES)
+from src.transform_arrow import ARROW_AVAILABLE
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CASES = json.loads((FIXTURES / "transform_cases.json").read_text(encoding="utf-8"))
+
+pytestmark = pytest.mark.skipif(not ARROW_AVAILABLE, reason="pyarrow가 없으면 arrow 엔진을 비교할 수 없음")
+
+
+def case_frame(name: str) -> pd.DataFrame:
+    """base 항공편에 케이스별 컬럼 값을 덮어써 응답 하나로 만듭니다. (컬럼 전체가 같은 타입이 되도록)"""
+    overrides = CASES["cases"][name]
+    n = len(next(iter(overrides.values())))
+    flights = [dict(CASES["base"], **{col: values[i] for col, values in overrides.items()}) for i in range(n)]
+    data = [{"filepath": "data/raw/2025-10-01/fixture.json", "raw_data": {"data": {"data": flights}},
+             "agency_code": "LT", "scraped_date": "2025-10-01"}]
+    return _create_dataframe_from_list(data)
+
+def recorded_frame() -> pd.DataFrame:
+    return _load_data_from_segments(find_segments(FIXTURES / "raw"), workers=1)
+
+def run_engine(df_raw: pd.DataFrame, engine: str) -> pd.DataFrame:
+    return _format_final_df(_clean_and_transform_data(df_raw.copy(), engine=engine))
+
+def minutes(s: pd.Series) -> list:
+    return [None if v is pd.NA else int(v) for v in s]
+
+
+@pytest.mark.parametrize("name", sorted(CASES["cases"]))
+def test_engines_match_on_cases(name):
+    df_raw = case_frame(name)
+    pd.testing.assert_frame_equal(run_engine(df_raw, "arrow"), run_engine(df_raw, "pandas"))
+
+def test_engines_match_on_recorded_segments():
+    df_raw = recorded_frame()
+    assert len(df_raw) > 0
+    pd.testing.assert_frame_equal(run_engine(df_raw, "arrow"), run_engine(df_raw, "pandas"))
+
+def test_fixture_column_types():
+    """픽스처가 의도한 입력 타입(정수/실수/혼합 컬럼)을 그대로 만드는지"""
+    assert pd.api.types.is_integer_dtype(case_frame("int_times")["depTime"])
+    assert pd.api.types.is_float_dtype(case_frame("float_times")["depTime"])
+    assert case_frame("mixed_times")["depTime"].dtype == object
+    assert pd.api.types.is_integer_dtype(case_frame("int_numbers")["fare"])
+    assert pd.api.types.is_float_dtype(case_frame("float_numbers")["fare"])
+
+@pytest.mark.parametrize("engine", TRANSFORM_ENGINES)
+def test_numeric_times_are_hhmm(engine):
+    assert minutes(run_engine(case_frame("int_times"), engine)["depTime"]) == [450, 545, 845, 0, 1439, None]
+    assert minutes(run_engine(case_frame("float_times"), engine)["arrTime"]) == [515, 610, 910, 55, None, None]
+
+def test_engines_match_on_schema_minutes():
+    """이미 스키마 타입(Int16 분)인 시간 컬럼은 두 엔진 모두 다시 파싱하지 않음"""
+    df_raw = case_frame("int_times")
+    for col in ("depTime", "arrTime"):
+        df_raw[col] = pd.Series([450, 545, pd.NA, 0, 1439, 5], dtype="Int16", index=df_raw.index)
+    expected = run_engine(df_raw, "pandas")
+    pd.testing.assert_frame_equal(run_engine(df_raw, "arrow"), expected)
+    assert minutes(expected["depTime"]) == [450, 545, None, 0, 1439, 5]